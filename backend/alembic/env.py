@@ -1,10 +1,19 @@
 from logging.config import fileConfig
+from pathlib import Path
+import re
+import sys
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
 
+# alembic runs from backend/, the models are imported as the backend package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.database import Base, DATABASE_URL  # noqa: E402
+import backend.models  # noqa: E402,F401 - registers the tables on Base.metadata
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +23,25 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+# Same database as the app; % is escaped for configparser interpolation
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
+# Model metadata for 'autogenerate' support
+target_metadata = Base.metadata
+
+# Full-text search columns, indexes and (SQLite) FTS5 tables are created by
+# DDL events rather than mapped (see backend/models.py), so autogenerate
+# must not drop them
+SEARCH_OBJECTS = {"search_vector", "IDX_notes_search", "IDX_tasks_search"}
+FTS_TABLES = re.compile(r"^(notes|tasks)_fts(_\w+)?$")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if not reflected or compare_to is not None:
+        return True
+    if type_ == "table":
+        return not FTS_TABLES.match(name)
+    return name not in SEARCH_OBJECTS
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -42,6 +65,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -65,7 +89,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,255 @@
+"""Initial schema
+
+Revision ID: 1a0d6c3e5b27
+Revises:
+Create Date: 2026-10-16 23:40:00.000000
+
+The tables as they were before the index suite, generated from the models.
+Databases created earlier with create_all already have them: mark them as
+migrated to this revision with `alembic stamp 1a0d6c3e5b27`, then run
+`alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1a0d6c3e5b27"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feature_flags',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('scope_type', sa.Text(), nullable=False),
+    sa.Column('scope_id', sa.String(), nullable=False),
+    sa.Column('key', sa.Text(), nullable=False),
+    sa.Column('value', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('recurrence_rules',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('series_id', sa.String(), nullable=False),
+    sa.Column('pattern', sa.Text(), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.JSON(), nullable=True),
+    sa.Column('month_day', sa.Integer(), nullable=True),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('max_occurrences', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sessions',
+    sa.Column('sid', sa.String(), nullable=False),
+    sa.Column('sess', sa.JSON(), nullable=False),
+    sa.Column('expire', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sid')
+    )
+    op.create_index('IDX_session_expire', 'sessions', ['expire'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('first_name', sa.String(), nullable=True),
+    sa.Column('last_name', sa.String(), nullable=True),
+    sa.Column('profile_image_url', sa.String(), nullable=True),
+    sa.Column('password', sa.Text(), nullable=True),
+    sa.Column('subscription_plan', sa.Text(), nullable=False),
+    sa.Column('subscription_status', sa.Text(), nullable=False),
+    sa.Column('stripe_customer_id', sa.String(), nullable=True),
+    sa.Column('stripe_subscription_id', sa.String(), nullable=True),
+    sa.Column('personal_key_ref', sa.Text(), nullable=True),
+    sa.Column('daily_task_extraction_count', sa.Integer(), nullable=False),
+    sa.Column('last_task_extraction_reset', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('spaces',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.String(), nullable=False),
+    sa.Column('type', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('workspaces',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('space_id', sa.String(), nullable=False),
+    sa.Column('name', sa.Text(), nullable=False),
+    sa.Column('policy_manager_note_access', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['space_id'], ['spaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('audit_logs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('workspace_id', sa.String(), nullable=True),
+    sa.Column('actor_id', sa.String(), nullable=False),
+    sa.Column('action', sa.Text(), nullable=False),
+    sa.Column('target_type', sa.Text(), nullable=False),
+    sa.Column('target_id', sa.String(), nullable=False),
+    sa.Column('diff_json', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('memberships',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('workspace_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('role', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('projects',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.Text(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('color', sa.Text(), nullable=False),
+    sa.Column('space_id', sa.String(), nullable=True),
+    sa.Column('workspace_id', sa.String(), nullable=True),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['space_id'], ['spaces.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('board_columns',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('name', sa.Text(), nullable=False),
+    sa.Column('order', sa.Integer(), nullable=False),
+    sa.Column('color', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('notes',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('space_id', sa.String(), nullable=True),
+    sa.Column('workspace_id', sa.String(), nullable=True),
+    sa.Column('project_id', sa.String(), nullable=True),
+    sa.Column('author_id', sa.String(), nullable=True),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('backlinks', sa.JSON(), nullable=True),
+    sa.Column('visibility_scope', sa.Text(), nullable=False),
+    sa.Column('last_processed_length', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['space_id'], ['spaces.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tasks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('note_id', sa.String(), nullable=True),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('priority', sa.Text(), nullable=False),
+    sa.Column('assignee_id', sa.String(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('series_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['assignee_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('active_timers',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('attachments',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('file_name', sa.Text(), nullable=False),
+    sa.Column('original_name', sa.Text(), nullable=False),
+    sa.Column('mime_type', sa.Text(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('storage_path', sa.Text(), nullable=False),
+    sa.Column('note_id', sa.String(), nullable=True),
+    sa.Column('task_id', sa.String(), nullable=True),
+    sa.Column('uploaded_by', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('subtasks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('parent_task_id', sa.String(), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('order', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['parent_task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('task_board_positions',
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('column_id', sa.String(), nullable=False),
+    sa.Column('order', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['column_id'], ['board_columns.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('task_id', 'column_id')
+    )
+    op.create_table('time_entries',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=True),
+    sa.Column('duration', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('time_entries')
+    op.drop_table('task_board_positions')
+    op.drop_table('subtasks')
+    op.drop_table('attachments')
+    op.drop_table('active_timers')
+    op.drop_table('tasks')
+    op.drop_table('notes')
+    op.drop_table('board_columns')
+    op.drop_table('projects')
+    op.drop_table('memberships')
+    op.drop_table('audit_logs')
+    op.drop_table('workspaces')
+    op.drop_table('spaces')
+    op.drop_table('users')
+    op.drop_index('IDX_session_expire', table_name='sessions')
+    op.drop_table('sessions')
+    op.drop_table('recurrence_rules')
+    op.drop_table('feature_flags')
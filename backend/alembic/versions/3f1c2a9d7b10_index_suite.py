@@ -0,0 +1,83 @@
+"""Index suite for foreign keys, list orders and hot filters
+
+Revision ID: 3f1c2a9d7b10
+Revises: 1a0d6c3e5b27
+Create Date: 2026-10-16 23:55:00.000000
+
+Indexes are created CONCURRENTLY on Postgres so tables stay writable, and
+with IF NOT EXISTS so databases that already have some of them (e.g. from
+create_all) can be upgraded.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9d7b10"
+down_revision: Union[str, Sequence[str], None] = "1a0d6c3e5b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns)
+INDEXES = [
+    ("IDX_spaces_owner", "spaces", ["owner_id"]),
+    ("IDX_workspaces_space", "workspaces", ["space_id"]),
+    ("IDX_memberships_workspace_created", "memberships", ["workspace_id", "created_at", "id"]),
+    ("IDX_memberships_user_workspace", "memberships", ["user_id", "workspace_id", "role"]),
+    ("IDX_projects_workspace", "projects", ["workspace_id"]),
+    ("IDX_projects_space", "projects", ["space_id"]),
+    ("IDX_notes_project_created", "notes", ["project_id", "created_at", "id"]),
+    ("IDX_notes_author", "notes", ["author_id"]),
+    ("IDX_notes_workspace", "notes", ["workspace_id"]),
+    ("IDX_notes_space", "notes", ["space_id"]),
+    ("IDX_tasks_project_created", "tasks", ["project_id", "created_at", "id"]),
+    ("IDX_tasks_project_updated", "tasks", ["project_id", "updated_at", "id"]),
+    ("IDX_tasks_project_due", "tasks", ["project_id", "due_date", "id"]),
+    ("IDX_tasks_project_status", "tasks", ["project_id", "status"]),
+    ("IDX_tasks_assignee", "tasks", ["assignee_id"]),
+    ("IDX_tasks_note", "tasks", ["note_id"]),
+    ("IDX_time_entries_task_created", "time_entries", ["task_id", "created_at", "id"]),
+    ("IDX_time_entries_task_start", "time_entries", ["task_id", "start_time"]),
+    ("IDX_active_timers_task", "active_timers", ["task_id"]),
+    ("IDX_attachments_task", "attachments", ["task_id"]),
+    ("IDX_attachments_note", "attachments", ["note_id"]),
+    ("IDX_subtasks_parent", "subtasks", ["parent_task_id"]),
+    ("IDX_board_columns_project", "board_columns", ["project_id"]),
+    ("IDX_task_board_positions_column", "task_board_positions", ["column_id"]),
+    ("IDX_audit_logs_workspace_created", "audit_logs", ["workspace_id", "created_at"]),
+]
+
+# (index, table, columns) restricted to active projects
+ACTIVE_PROJECT_INDEXES = [
+    ("IDX_projects_workspace_active", "projects", ["workspace_id", "updated_at"]),
+    ("IDX_projects_space_active", "projects", ["space_id", "updated_at"]),
+]
+ACTIVE = sa.text("status = 'active'")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, columns in ACTIVE_PROJECT_INDEXES:
+            op.create_index(
+                name, table, columns, if_not_exists=True, postgresql_concurrently=True,
+                postgresql_where=ACTIVE, sqlite_where=ACTIVE
+            )
+        if op.get_bind().dialect.name == "postgresql":
+            op.create_index(
+                "IDX_tasks_tags", "tasks", [sa.text("CAST(tags AS JSONB)")],
+                if_not_exists=True, postgresql_using="gin", postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == "postgresql":
+            op.drop_index("IDX_tasks_tags", table_name="tasks", if_exists=True, postgresql_concurrently=True)
+        for name, table, _ in [*INDEXES, *ACTIVE_PROJECT_INDEXES]:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""Full-text search columns and GIN indexes for notes and tasks
+
+Revision ID: 8b2e4d1c6a55
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 00:20:00.000000
+
+Postgres only: the tsvector columns are generated, so Postgres keeps them
+current on every write. Adding a stored generated column rewrites the
+table, so run this in a maintenance window on large installs. SQLite test
+databases get FTS5 tables from create_all instead.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2e4d1c6a55"
+down_revision: Union[str, Sequence[str], None] = "3f1c2a9d7b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (title column, body column)
+SEARCH_COLUMNS = {"notes": ("title", "content"), "tasks": ("title", "description")}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, (title, body) in SEARCH_COLUMNS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('english', coalesce({title}, '')), 'A') || "
+            f"setweight(to_tsvector('english', coalesce({body}, '')), 'B')) STORED"
+        )
+    with op.get_context().autocommit_block():
+        for table in SEARCH_COLUMNS:
+            op.create_index(
+                f"IDX_{table}_search", table, ["search_vector"],
+                if_not_exists=True, postgresql_using="gin", postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in SEARCH_COLUMNS:
+        op.drop_index(f"IDX_{table}_search", table_name=table, if_exists=True)
+        op.drop_column(table, "search_vector")
@@ -0,0 +1,40 @@
+"""Daily time rollups
+
+Revision ID: c4d9e7a21f03
+Revises: 8b2e4d1c6a55
+Create Date: 2026-10-17 00:45:00.000000
+
+Creates an empty table. Fill it by running the
+backend.tasks.report_tasks.rebuild_time_rollups Celery task once after
+upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d9e7a21f03"
+down_revision: Union[str, Sequence[str], None] = "8b2e4d1c6a55"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "time_rollups",
+        sa.Column("task_id", sa.String(), sa.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("project_id", sa.String(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("seconds", sa.BigInteger(), nullable=False),
+        sa.Column("entries", sa.Integer(), nullable=False),
+    )
+    op.create_index("IDX_time_rollups_project_day", "time_rollups", ["project_id", "day", "seconds"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("IDX_time_rollups_project_day", table_name="time_rollups")
+    op.drop_table("time_rollups")
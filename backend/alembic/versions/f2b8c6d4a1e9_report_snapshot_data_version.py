@@ -0,0 +1,29 @@
+"""Report snapshot data version
+
+Revision ID: f2b8c6d4a1e9
+Revises: e7a3b5c9d2f4
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b8c6d4a1e9"
+down_revision: Union[str, Sequence[str], None] = "e7a3b5c9d2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing snapshots have no version and are never served again
+    op.add_column("report_snapshots", sa.Column("data_version", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("report_snapshots", "data_version")
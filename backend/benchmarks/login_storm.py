@@ -0,0 +1,107 @@
+"""
+Latency of an unrelated endpoint while a burst of logins is in flight.
+
+Runs the app in-process on a throwaway SQLite database, fires concurrent
+logins and meanwhile probes ``GET /health`` at a fixed interval, reporting
+p50/p99/max latency of the probes. Compare the hashing executors with:
+
+    PASSWORD_HASH_EXECUTOR=inline python -m backend.benchmarks.login_storm
+    PASSWORD_HASH_EXECUTOR=thread python -m backend.benchmarks.login_storm
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from backend.main import app
+from backend.database import Base, get_db
+from backend.models import User
+from backend.utils.passwords import pwd_context, PASSWORD_HASH_EXECUTOR
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run(logins: int, concurrency: int, probe_interval: float):
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    # NullPool: a bounded pool would make concurrent logins wait on checkout,
+    # which is a different bottleneck than the one measured here
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        db.add(User(email="bench@example.com", password=pwd_context.hash("benchpassword")))
+        db.commit()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: dict[int, int] = {}
+    probes: list[float] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login():
+            async with semaphore:
+                response = await client.post(
+                    "/api/auth/login",
+                    json={"email": "bench@example.com", "password": "benchpassword"},
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe(done: asyncio.Event):
+            # Latency is measured from when the probe was due, not from when
+            # the loop got around to sending it, so a blocked loop shows up
+            due = time.perf_counter()
+            while not done.is_set():
+                await client.get("/health")
+                probes.append((time.perf_counter() - due) * 1000)
+                due += probe_interval
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+        done = asyncio.Event()
+        prober = asyncio.create_task(probe(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    app.dependency_overrides.clear()
+
+    print(f"executor={PASSWORD_HASH_EXECUTOR} logins={logins} concurrency={concurrency}")
+    print(f"login storm took {elapsed:.2f}s, statuses={statuses}")
+    print(
+        f"/health probes={len(probes)} "
+        f"p50={statistics.median(probes):.1f}ms "
+        f"p99={percentile(probes, 99):.1f}ms "
+        f"max={max(probes):.1f}ms"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency, args.probe_interval))
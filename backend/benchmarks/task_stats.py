@@ -0,0 +1,111 @@
+"""
+Task statistics: hydrating every task in Python vs one grouped query.
+
+Seeds a throwaway database with N tasks spread over a user's projects and
+times both ways of building the TaskStats payload: the old
+``select(Task)`` + list comprehensions and the ``GROUP BY status,
+priority`` query the endpoint runs now. Prints the best of ``--repeat``
+runs for each size:
+
+    python -m backend.benchmarks.task_stats --sizes 10000 100000 1000000
+    DATABASE_URL=postgresql://localhost/bench python -m backend.benchmarks.task_stats
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Project, Space, Task, User
+from backend.routes.reports import fold_task_counts, task_counts_query
+
+STATUSES = ("todo", "in_progress", "done", "blocked")
+PRIORITIES = ("low", "medium", "high", "urgent")
+
+def seed(db, size: int, projects: int = 20) -> str:
+    """A user owning a space with `size` tasks; returns the space id"""
+    user = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(user)
+    db.flush()
+    space = Space(owner_id=user.id, type="personal")
+    db.add(space)
+    db.flush()
+    project_ids = [str(uuid.uuid4()) for _ in range(projects)]
+    db.execute(insert(Project), [
+        {"id": project_id, "name": f"Project {i}", "space_id": space.id}
+        for i, project_id in enumerate(project_ids)
+    ])
+    rng = random.Random(size)
+    for start in range(0, size, 10000):
+        db.execute(insert(Task), [
+            {"project_id": rng.choice(project_ids), "title": f"Task {i}",
+             "status": rng.choice(STATUSES), "priority": rng.choice(PRIORITIES), "tags": []}
+            for i in range(start, min(size, start + 10000))
+        ])
+    db.commit()
+    return space.id
+
+def hydrated_stats(db, space_id: str) -> dict:
+    """The previous implementation: every task as an ORM object"""
+    tasks = db.execute(select(Task).join(Project).where(Project.space_id.in_([space_id]))).scalars().all()
+    return {
+        "total": len(tasks),
+        "completed": len([t for t in tasks if t.status == 'done']),
+        "inProgress": len([t for t in tasks if t.status == 'in_progress']),
+        "todo": len([t for t in tasks if t.status == 'todo']),
+        "byPriority": {
+            "high": len([t for t in tasks if t.priority == 'high']),
+            "medium": len([t for t in tasks if t.priority == 'medium']),
+            "low": len([t for t in tasks if t.priority == 'low'])
+        }
+    }
+
+def grouped_stats(db, space_id: str) -> dict:
+    return fold_task_counts(db.execute(task_counts_query([], [space_id])).all())
+
+def best_of(repeat: int, fn, *args) -> tuple[float, dict]:
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), result
+
+def run(sizes: list[int], repeat: int):
+    url = os.getenv("DATABASE_URL", "")
+    if not url:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autoflush=False, bind=engine)
+
+    print(f"database={engine.dialect.name}")
+    print(f"{'tasks':>9} {'hydrated':>12} {'grouped':>12} {'speedup':>8}")
+    for size in sizes:
+        with SessionLocal() as db:
+            space_id = seed(db, size)
+            hydrated_ms, hydrated = best_of(repeat, hydrated_stats, db, space_id)
+            db.expunge_all()
+            grouped_ms, grouped = best_of(repeat, grouped_stats, db, space_id)
+            # Same numbers for the fields both versions report
+            assert all(grouped[key] == value for key, value in hydrated.items() if key != "byPriority")
+            assert all(grouped["byPriority"][key] == value for key, value in hydrated["byPriority"].items())
+            print(f"{size:>9} {hydrated_ms:>10.1f}ms {grouped_ms:>10.1f}ms {hydrated_ms / grouped_ms:>7.1f}x")
+
+            project_ids = select(Project.id).where(Project.space_id == space_id)
+            db.execute(delete(Task).where(Task.project_id.in_(project_ids)))
+            db.execute(delete(Project).where(Project.space_id == space_id))
+            db.commit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
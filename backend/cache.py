@@ -1,11 +1,37 @@
 import redis
+import redis.asyncio as aioredis
+import asyncio
+import hashlib
 import json
+import logging
+import math
 import os
-from typing import Any, Optional
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
 from functools import wraps
+from backend.cache_codec import encode, decode
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/1")
 
+logger = logging.getLogger("backend.cache")
+
+# In-process tier. Entries live at most LOCAL_CACHE_TTL seconds so a missed
+# invalidation message can only serve stale data briefly.
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "10000"))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", "30"))
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Async pool used by request handlers. Callers wait up to REDIS_POOL_TIMEOUT
+# for a free connection instead of opening unbounded new ones.
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+
+# The sync client remains for invalidation outside the event loop: Celery
+# tasks, maintenance commands and sync sessions.
 try:
     redis_client = redis.from_url(REDIS_URL, decode_responses=True)
     redis_client.ping()
@@ -15,65 +41,589 @@ except Exception:
     REDIS_AVAILABLE = False
     print("Warning: Redis not available. Caching disabled.")
 
+# Local entries are dropped on other workers through Redis pub/sub. Without
+# Redis that can't happen, so ACL sets skip the local tier, and principals
+# keep only a short-lived local copy, unless the deployment runs a single
+# process (CACHE_SINGLE_PROCESS=1).
+CACHE_SINGLE_PROCESS = os.getenv("CACHE_SINGLE_PROCESS", "0") == "1"
+LOCAL_TIER_COHERENT = REDIS_AVAILABLE or CACHE_SINGLE_PROCESS
+
+if REDIS_AVAILABLE:
+    async_redis_pool = aioredis.BlockingConnectionPool.from_url(
+        REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT
+    )
+    async_redis_client = aioredis.Redis(connection_pool=async_redis_pool)
+else:
+    async_redis_pool = None
+    async_redis_client = None
+
+_MISSING = object()
+
+class LocalCache:
+    """Size-bounded LRU with per-entry TTL; values are shared, treat them as read-only"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int):
+        ttl = min(ttl, LOCAL_CACHE_TTL)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+local_cache = LocalCache(LOCAL_CACHE_MAX_ENTRIES)
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+def _count(outcome: str):
+    # Plain increments; an occasional lost update only skews the metrics
+    _redis_stats[outcome] += 1
+
 def cache_key(*args, **kwargs) -> str:
     """Generate a cache key from function arguments"""
     key_parts = [str(arg) for arg in args]
     key_parts.extend([f"{k}:{v}" for k, v in sorted(kwargs.items())])
     return ":".join(key_parts)
 
-def get_cached(key: str) -> Optional[Any]:
-    """Get value from cache"""
-    if not REDIS_AVAILABLE or not redis_client:
+def _decode(raw: bytes) -> Any:
+    try:
+        return decode(raw)
+    except Exception:
+        # Written by an incompatible codec or for a model that no longer exists
+        _count("errors")
+        return _MISSING
+
+async def get_cached(key: str, local: bool = False) -> Optional[Any]:
+    """
+    Get value from cache.
+    With local=True the in-process tier is checked first and filled on a
+    Redis hit; use it for small, hot values.
+    """
+    if local:
+        value = local_cache.get(key)
+        if value is not _MISSING:
+            return value
+    if not REDIS_AVAILABLE:
         return None
     try:
-        value = redis_client.get(key)
-        return json.loads(value) if value else None
+        raw = await async_redis_client.get(key)
     except Exception:
+        _count("errors")
+        return None
+    value = _decode(raw) if raw else _MISSING
+    if value is _MISSING:
+        _count("misses")
         return None
+    _count("hits")
+    if local:
+        local_cache.set(key, value, LOCAL_CACHE_TTL)
+    return value
 
-def set_cached(key: str, value: Any, ttl: int = 300):
+async def set_cached(key: str, value: Any, ttl: int = 300, local: bool = False):
     """Set value in cache with TTL in seconds"""
+    if local:
+        local_cache.set(key, value, ttl)
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        await async_redis_client.set(key, encode(value), ex=ttl)
+    except Exception:
+        _count("errors")
+
+async def get_many_cached(keys: list[str]) -> list[Optional[Any]]:
+    """Read several keys with one MGET; missing or unreadable values are None"""
+    if not keys or not REDIS_AVAILABLE:
+        return [None] * len(keys)
+    try:
+        raws = await async_redis_client.mget(keys)
+    except Exception:
+        _count("errors")
+        return [None] * len(keys)
+    values = []
+    for raw in raws:
+        value = _decode(raw) if raw else _MISSING
+        _count("misses" if value is _MISSING else "hits")
+        values.append(None if value is _MISSING else value)
+    return values
+
+async def set_many_cached(values: dict[str, Any], ttl: int = 300):
+    """Write several keys with a TTL in seconds in one pipelined round trip"""
+    if not values or not REDIS_AVAILABLE:
+        return
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, encode(value), ex=ttl)
+            await pipe.execute()
+    except Exception:
+        _count("errors")
+
+# Redis drops empty SETs, so every cached set carries this member to tell an
+# empty set apart from a missing key
+SET_SENTINEL = ""
+
+async def get_cached_sets(keys: list[str], local: bool = False) -> Optional[list[frozenset[str]]]:
+    """Read several Redis SETs in one round trip; None if any of them is missing"""
+    if local:
+        values = [local_cache.get(key) for key in keys]
+        if all(value is not _MISSING for value in values):
+            return values
+    if not REDIS_AVAILABLE:
+        return None
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.smembers(key)
+            results = await pipe.execute()
+    except Exception:
+        _count("errors")
+        return None
+    if any(not members for members in results):
+        _count("misses")
+        return None
+    _count("hits")
+    sets = [
+        frozenset(member.decode() for member in members) - {SET_SENTINEL}
+        for members in results
+    ]
+    if local:
+        for key, members in zip(keys, sets):
+            local_cache.set(key, members, LOCAL_CACHE_TTL)
+    return sets
+
+async def set_cached_sets(sets: dict[str, Iterable[str]], ttl: int = 300, local: bool = False):
+    """Replace several Redis SETs atomically, each with a TTL in seconds"""
+    sets = {key: frozenset(members) for key, members in sets.items()}
+    if local:
+        for key, members in sets.items():
+            local_cache.set(key, members, ttl)
+    if not REDIS_AVAILABLE:
+        return
+    try:
+        async with async_redis_client.pipeline(transaction=True) as pipe:
+            for key, members in sets.items():
+                pipe.delete(key)
+                pipe.sadd(key, SET_SENTINEL, *members)
+                pipe.expire(key, ttl)
+            await pipe.execute()
+    except Exception:
+        _count("errors")
+
+# Invalidations scheduled on the event loop; referenced until done so they
+# aren't garbage collected mid-flight
+_background_invalidations: set[asyncio.Task] = set()
+
+def _on_event_loop(coroutine_fn) -> bool:
+    """
+    Run coroutine_fn() as a task when called on a running event loop (e.g.
+    from an ORM commit hook in an async route), so the loop never waits on
+    the sync client. False when no loop is running: Celery, CLI.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    task = loop.create_task(coroutine_fn())
+    _background_invalidations.add(task)
+    task.add_done_callback(_background_invalidations.discard)
+    return True
+
+async def _delete_and_broadcast(keys: list[str]):
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+            await pipe.execute()
+    except Exception:
+        _count("errors")
+
+def delete_cached(*keys: str):
+    """
+    Delete specific cache keys from both tiers, on every process. The local
+    tier is cleared immediately; on an event loop the Redis DELETE and
+    broadcast are sent asynchronously right after.
+    """
+    if not keys:
+        return
+    local_cache.delete(*keys)
     if not REDIS_AVAILABLE or not redis_client:
         return
+    keys = list(keys)
+    if _on_event_loop(lambda: _delete_and_broadcast(keys)):
+        return
     try:
-        redis_client.setex(key, ttl, json.dumps(value))
+        redis_client.delete(*keys)
     except Exception:
-        pass
+        _count("errors")
+    _broadcast_invalidation(keys)
 
-def invalidate_cache(pattern: str):
-    """Invalidate cache keys matching pattern"""
+def _broadcast_invalidation(keys: Iterable[str]):
+    try:
+        redis_client.publish(INVALIDATION_CHANNEL, json.dumps(list(keys)))
+    except Exception:
+        _count("errors")
+
+def _listen_for_invalidations():
+    """Drop local copies of keys invalidated by other workers and nodes"""
+    while True:
+        try:
+            pubsub = redis.from_url(REDIS_URL, decode_responses=True).pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                local_cache.delete(*json.loads(message["data"]))
+        except Exception:
+            # Messages may have been missed while disconnected
+            local_cache.clear()
+            time.sleep(1)
+
+if REDIS_AVAILABLE:
+    threading.Thread(
+        target=_listen_for_invalidations, name="cache-invalidation", daemon=True
+    ).start()
+
+def cache_stats() -> dict:
+    """Hit ratios and eviction counts per cache tier"""
+    redis_lookups = _redis_stats["hits"] + _redis_stats["misses"]
+    return {
+        "local": local_cache.stats(),
+        "redis": {
+            "available": REDIS_AVAILABLE,
+            **_redis_stats,
+            "hitRatio": _redis_stats["hits"] / redis_lookups if redis_lookups else 0.0,
+        },
+    }
+
+async def namespace_generations(namespaces: list[str]) -> list[int]:
+    """Current generation of each namespace, in order; 0 until it is first invalidated"""
+    keys = [f"gen:{namespace}" for namespace in namespaces]
+    generations = [local_cache.get(key) for key in keys]
+    missing = [index for index, generation in enumerate(generations) if generation is _MISSING]
+    if not missing:
+        return generations
+    if not REDIS_AVAILABLE:
+        return [0 if generation is _MISSING else generation for generation in generations]
+    try:
+        values = await async_redis_client.mget([keys[index] for index in missing])
+    except Exception:
+        return [0 if generation is _MISSING else generation for generation in generations]
+    for index, value in zip(missing, values):
+        generations[index] = int(value or 0)
+        local_cache.set(keys[index], generations[index], LOCAL_CACHE_TTL)
+    return generations
+
+async def namespace_generation(namespace: str) -> int:
+    """Current generation of a namespace; 0 until it is first invalidated"""
+    return (await namespace_generations([namespace]))[0]
+
+def namespace_generations_sync(namespaces: list[str]) -> list[int] | None:
+    """namespace_generations for code outside the event loop; None when Redis can't be read"""
+    if not REDIS_AVAILABLE or not redis_client:
+        return None
+    try:
+        return [int(value or 0) for value in redis_client.mget([f"gen:{namespace}" for namespace in namespaces])]
+    except Exception:
+        _count("errors")
+        return None
+
+def scoped_version(generation: int, scope_generations: dict[str, int]) -> str:
+    """A namespace's generation combined with those of some of its scopes, as a short string"""
+    if not scope_generations:
+        return f"g{generation}"
+    digest = hashlib.sha1(
+        json.dumps(sorted(scope_generations.items()), separators=(",", ":")).encode()
+    ).hexdigest()[:16]
+    return f"g{generation}:s{digest}"
+
+async def namespace_version(namespace: str, scopes: Iterable[str] = ()) -> str:
+    """
+    Current version of a namespace. With scopes, the generations of the
+    "<namespace>:<scope>" sub-namespaces are mixed in too, so invalidating
+    any one of them changes the version.
+    """
+    scopes = sorted(set(scopes))
+    generations = await namespace_generations([namespace] + [f"{namespace}:{scope}" for scope in scopes])
+    return scoped_version(generations[0], dict(zip(scopes, generations[1:])))
+
+async def namespaced_key(namespace: str, key: str, scopes: Iterable[str] = ()) -> str:
+    """Embed the namespace's current version, see namespace_version, in a cache key"""
+    return f"{namespace}:{await namespace_version(namespace, scopes)}:{key}"
+
+async def _incr_and_broadcast(keys: list[str]):
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+            await pipe.execute()
+    except Exception:
+        _count("errors")
+
+def invalidate_namespace(*namespaces: str):
+    """
+    Invalidate every key in the given namespaces with one INCR each, sent
+    in a single round trip. Keys from older generations are never read
+    again and expire via their TTL.
+    """
+    keys = [f"gen:{namespace}" for namespace in namespaces]
+    if not keys:
+        return
+    for key in keys:
+        local_cache.delete(key)
     if not REDIS_AVAILABLE or not redis_client:
         return
+    if _on_event_loop(lambda: _incr_and_broadcast(keys)):
+        return
     try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            redis_client.delete(*keys)
+        with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+            pipe.execute()
+    except Exception:
+        _count("errors")
+        return
+    _broadcast_invalidation(keys)
+
+def purge_keys(pattern: str, batch_size: int = 500, dry_run: bool = False) -> int:
+    """
+    Delete keys matching pattern using SCAN + UNLINK in batches, so Redis is
+    never blocked walking the whole keyspace. Meant for maintenance; request
+    paths should use invalidate_namespace instead. Returns the number of keys.
+    """
+    if not REDIS_AVAILABLE or not redis_client:
+        return 0
+    purged = 0
+    batch = []
+    for key in redis_client.scan_iter(match=pattern, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            if not dry_run:
+                redis_client.unlink(*batch)
+            purged += len(batch)
+            batch = []
+    if batch:
+        if not dry_run:
+            redis_client.unlink(*batch)
+        purged += len(batch)
+    return purged
+
+def invalidate_cache(pattern: str):
+    """Invalidate cache keys matching pattern"""
+    try:
+        purge_keys(pattern)
     except Exception:
         pass
 
-def cached(ttl: int = 300, key_prefix: str = ""):
+# Stampede protection for @cached. Entries are stored as
+# {"v": value, "x": fresh-until epoch seconds, "d": compute seconds}.
+
+_inflight: dict[str, asyncio.Future] = {}
+
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+def _single_flight(key: str, compute) -> asyncio.Future:
+    """Start compute() for a key unless it is already running in this process"""
+    future = _inflight.get(key)
+    if future is None or future.done():
+        future = asyncio.ensure_future(compute())
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return future
+
+def _log_refresh_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("background cache refresh failed", exc_info=future.exception())
+
+async def _acquire_lock(key: str, timeout: float) -> Optional[str]:
+    """Take the cross-process recompute lock for a key; None if someone else holds it"""
+    token = uuid.uuid4().hex
+    try:
+        if await async_redis_client.set(f"lock:{key}", token, nx=True, px=int(timeout * 1000)):
+            return token
+        return None
+    except Exception:
+        # Without a working lock, recomputing is better than not answering
+        _count("errors")
+        return token
+
+async def _release_lock(key: str, token: str):
+    try:
+        await async_redis_client.eval(_RELEASE_LOCK, 1, f"lock:{key}", token)
+    except Exception:
+        _count("errors")
+
+async def _wait_for_fresh_entry(key: str, timeout: float) -> Optional[dict]:
+    """Poll for the value another process is computing, until its lock goes away"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await get_cached(key)
+        if entry is not None and entry["x"] > time.time():
+            return entry
+        try:
+            if not await async_redis_client.exists(f"lock:{key}"):
+                return None
+        except Exception:
+            _count("errors")
+            return None
+    return None
+
+def refresh_early(entry: dict, beta: float) -> bool:
+    """
+    Probabilistic early expiration (XFetch): the closer an entry is to
+    expiring, and the longer it took to compute, the likelier a caller is
+    to refresh it ahead of time, so refreshes of a hot key spread out
+    instead of all landing on the expiry instant.
+    """
+    if beta <= 0:
+        return False
+    return time.time() - entry["d"] * beta * math.log(random.random() or 1e-12) >= entry["x"]
+
+def cached(
+    ttl: int = 300,
+    key_prefix: str = "",
+    namespace: Optional[str] = None,
+    stale_ttl: int = 0,
+    beta: float = 1.0,
+    lock_timeout: float = 30,
+    exclude: tuple[str, ...] = (),
+):
     """
     Decorator to cache function results
-    Usage: @cached(ttl=600, key_prefix="user_data")
+    Usage: @cached(ttl=600, key_prefix="user_data", namespace="reports")
+    With a namespace, invalidate_namespace(namespace) drops every cached result.
+    Callers may also pass cache_scopes=[...]: the result is then dropped as
+    well by invalidate_namespace(f"{namespace}:{scope}") for any of them.
+    cache_scopes is not passed on to the function.
+
+    Concurrent misses for a key run the function once per process, and a
+    Redis lock keeps other processes from recomputing at the same time.
+    For stale_ttl seconds after expiry the old value is still served while
+    one caller refreshes it in the background. beta tunes probabilistic
+    early refresh (0 disables it). Keyword arguments named in exclude are
+    passed through but left out of the cache key.
     """
     def decorator(func):
         @wraps(func)
-        async def wrapper(*args, **kwargs):
+        async def wrapper(*args, cache_scopes: Iterable[str] = (), **kwargs):
+            key_kwargs = {k: v for k, v in kwargs.items() if k not in exclude}
+            key = f"{key_prefix}:{func.__name__}:{cache_key(*args, **key_kwargs)}"
+
             if not REDIS_AVAILABLE:
-                return await func(*args, **kwargs)
-            
-            # Generate cache key
-            key = f"{key_prefix}:{func.__name__}:{cache_key(*args, **kwargs)}"
-            
-            # Try to get from cache
-            cached_value = get_cached(key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            set_cached(key, result, ttl)
-            return result
-        
+                # Nothing to cache in, but identical concurrent calls still coalesce
+                return await asyncio.shield(_single_flight(key, lambda: func(*args, **kwargs)))
+
+            if namespace:
+                key = await namespaced_key(namespace, key, cache_scopes)
+
+            async def refresh(stale: Optional[dict]):
+                token = await _acquire_lock(key, lock_timeout)
+                if token is None:
+                    # Another process is already recomputing
+                    if stale is not None:
+                        return stale["v"]
+                    entry = await _wait_for_fresh_entry(key, lock_timeout)
+                    if entry is not None:
+                        return entry["v"]
+                try:
+                    started = time.monotonic()
+                    result = await func(*args, **kwargs)
+                    entry = {"v": result, "x": time.time() + ttl, "d": time.monotonic() - started}
+                    await set_cached(key, entry, ttl + stale_ttl)
+                    return result
+                finally:
+                    if token is not None:
+                        await _release_lock(key, token)
+
+            entry = await get_cached(key)
+            if entry is not None:
+                now = time.time()
+                fresh = now < entry["x"]
+                if (fresh and refresh_early(entry, beta)) or (not fresh and now < entry["x"] + stale_ttl):
+                    if key not in _inflight:
+                        _single_flight(key, lambda: refresh(entry)).add_done_callback(_log_refresh_failure)
+                    return entry["v"]
+                if fresh:
+                    return entry["v"]
+
+            return await asyncio.shield(_single_flight(key, lambda: refresh(None)))
+
         return wrapper
     return decorator
+
+if __name__ == "__main__":
+    # Maintenance: python -m backend.cache purge "reports:*" [--batch-size N] [--dry-run]
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Redis cache maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    purge = subcommands.add_parser("purge", help="SCAN-based batched delete of keys matching a pattern")
+    purge.add_argument("pattern")
+    purge.add_argument("--batch-size", type=int, default=500)
+    purge.add_argument("--dry-run", action="store_true")
+    bump = subcommands.add_parser("invalidate", help="Bump a namespace generation")
+    bump.add_argument("namespace")
+    args = parser.parse_args()
+
+    if not REDIS_AVAILABLE:
+        sys.exit(f"Redis not reachable at {REDIS_URL}")
+    if args.command == "purge":
+        count = purge_keys(args.pattern, args.batch_size, args.dry_run)
+        print(f"{'Would purge' if args.dry_run else 'Purged'} {count} keys matching {args.pattern!r}")
+    else:
+        invalidate_namespace(args.namespace)
+        generation = asyncio.run(namespace_generation(args.namespace))
+        print(f"Namespace {args.namespace!r} now at generation {generation}")
@@ -0,0 +1,143 @@
+"""
+Serialization for cached values.
+
+Values are encoded with a pluggable codec (``CACHE_CODEC``: orjson, msgpack
+or the stdlib json fallback) and zlib-compressed once the encoded payload
+reaches ``CACHE_COMPRESS_MIN_BYTES``. Datetimes, dates and Pydantic models
+are tagged on the way in and rebuilt on the way out, so cached response
+models come back as the same types.
+
+Every payload starts with one header byte recording whether it was
+compressed; anything that fails to decode is treated as a cache miss.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from pydantic import BaseModel
+from typing import Any
+import importlib
+import json
+import os
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson")
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+
+_PLAIN = b"\x00"
+_ZLIB = b"\x01"
+
+def _tag(obj: Any) -> dict:
+    """Turn values the codecs can't represent natively into tagged dicts"""
+    if isinstance(obj, BaseModel):
+        cls = type(obj)
+        # Field values as-is (not model_dump) so nested models stay tagged
+        fields = {name: getattr(obj, name) for name in cls.model_fields}
+        return {"__t": "model", "c": f"{cls.__module__}:{cls.__qualname__}", "v": fields}
+    if isinstance(obj, datetime):
+        return {"__t": "datetime", "v": obj.isoformat()}
+    if isinstance(obj, date):
+        return {"__t": "date", "v": obj.isoformat()}
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Cannot cache value of type {type(obj).__name__}")
+
+@lru_cache(maxsize=256)
+def _model_class(path: str) -> type[BaseModel]:
+    module_name, _, qualname = path.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    if not (isinstance(target, type) and issubclass(target, BaseModel)):
+        raise ValueError(f"{path} is not a Pydantic model")
+    return target
+
+def _untag(obj: dict) -> Any:
+    tag = obj.get("__t")
+    if tag == "model":
+        # The values were validated before they were cached
+        return _model_class(obj["c"]).model_construct(**obj["v"])
+    if tag == "datetime":
+        return datetime.fromisoformat(obj["v"])
+    if tag == "date":
+        return date.fromisoformat(obj["v"])
+    return obj
+
+def _revive(obj: Any) -> Any:
+    """Rebuild tagged values bottom-up, for codecs without an object hook"""
+    if isinstance(obj, list):
+        return [_revive(item) for item in obj]
+    if isinstance(obj, dict):
+        return _untag({key: _revive(value) for key, value in obj.items()})
+    return obj
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        # Passthrough makes orjson hand datetimes to _tag instead of
+        # writing plain strings that would come back as str
+        return orjson.dumps(
+            value, default=_tag, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return _revive(orjson.loads(data))
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_tag, use_bin_type=True, datetime=False)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, object_hook=_untag, raw=False, strict_map_key=False)
+
+class JsonCodec:
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_tag, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=_untag)
+
+def get_codec(name: str):
+    """Codec by name, falling back to stdlib json when its package is missing"""
+    if name == "orjson" and orjson is not None:
+        return OrjsonCodec()
+    if name == "msgpack" and msgpack is not None:
+        return MsgpackCodec()
+    if name not in ("json", "orjson", "msgpack"):
+        raise ValueError(f"Unknown CACHE_CODEC {name!r}")
+    if name != "json":
+        print(f"Warning: {name} not installed. Cache values are encoded as JSON.")
+    return JsonCodec()
+
+codec = get_codec(CACHE_CODEC)
+
+def encode(value: Any) -> bytes:
+    """Serialize a value for Redis, compressing large payloads"""
+    data = codec.dumps(value)
+    if CACHE_COMPRESS_MIN_BYTES and len(data) >= CACHE_COMPRESS_MIN_BYTES:
+        # Level 1: most of the size win for a fraction of the CPU
+        return _ZLIB + zlib.compress(data, 1)
+    return _PLAIN + data
+
+def decode(payload: bytes) -> Any:
+    """Inverse of encode; raises ValueError on payloads it can't read"""
+    header, data = payload[:1], payload[1:]
+    if header == _ZLIB:
+        data = zlib.decompress(data)
+    elif header != _PLAIN:
+        raise ValueError("Unknown cache payload header")
+    return codec.loads(data)
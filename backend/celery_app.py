@@ -7,7 +7,7 @@ celery_app = Celery(
     "productivity_platform",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["backend.tasks.ai_tasks", "backend.tasks.report_tasks"]
+    include=["backend.tasks.ai_tasks", "backend.tasks.report_tasks", "backend.tasks.import_tasks"]
 )
 
 celery_app.conf.update(
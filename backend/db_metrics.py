@@ -0,0 +1,134 @@
+"""
+Connection pool and query instrumentation.
+
+Latency spikes come either from waiting on a pool checkout (starvation) or
+from the queries themselves. The instrumented pools time every checkout
+and the engine listeners time every statement, so ``/metrics`` can show
+both side by side. Statements slower than ``DB_SLOW_QUERY_MS`` are logged,
+sampled at ``DB_SLOW_QUERY_SAMPLE_RATE``.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger("backend.db")
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+DB_SLOW_QUERY_SAMPLE_RATE = float(os.getenv("DB_SLOW_QUERY_SAMPLE_RATE", "1.0"))
+
+# Upper bounds in milliseconds; the last bucket catches everything above
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class Histogram:
+    """Fixed-bucket latency histogram, safe to update from several threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(BUCKETS_MS) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+
+    def observe(self, value_ms: float):
+        index = bisect.bisect_left(BUCKETS_MS, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value_ms
+            self._count += 1
+            self._max = max(self._max, value_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{b}" for b in BUCKETS_MS] + ["le_inf"]
+            return {
+                "count": self._count,
+                "sumMs": round(self._sum, 3),
+                "maxMs": round(self._max, 3),
+                "buckets": dict(zip(labels, self._counts)),
+            }
+
+class _TimedCheckoutMixin:
+    """Records how long each checkout waited for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = Histogram()
+        self.checkout_timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            self.wait_histogram.observe((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        # Keep the counters when the pool is recreated (e.g. engine.dispose)
+        new_pool = super().recreate()
+        new_pool.wait_histogram = self.wait_histogram
+        new_pool.checkout_timeouts = self.checkout_timeouts
+        return new_pool
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+query_histogram = Histogram()
+_slow_queries = 0
+
+def instrument_engine(sync_engine):
+    """Attach statement timing and sampled slow-query logging to an engine"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        global _slow_queries
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        query_histogram.observe(elapsed_ms)
+        if elapsed_ms >= DB_SLOW_QUERY_MS:
+            _slow_queries += 1
+            if random.random() < DB_SLOW_QUERY_SAMPLE_RATE:
+                logger.warning("slow query (%.1f ms): %s", elapsed_ms, statement[:2000])
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _discard_timer(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+def pool_stats(pool) -> dict:
+    """Live statistics for a pool; counters are omitted for pools without them"""
+    stats = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checkedOut": pool.checkedout(),
+            "checkedIn": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    if isinstance(pool, _TimedCheckoutMixin):
+        stats["checkoutTimeouts"] = pool.checkout_timeouts
+        stats["waitMs"] = pool.wait_histogram.snapshot()
+    return stats
+
+def query_stats() -> dict:
+    return {
+        "slowQueries": _slow_queries,
+        "slowQueryThresholdMs": DB_SLOW_QUERY_MS,
+        "durationMs": query_histogram.snapshot(),
+    }
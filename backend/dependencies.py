@@ -1,9 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from backend.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
 from backend.models import User
+from backend.principal_cache import Principal, get_principal, store_principal
+from backend.utils.permissions import AccessContext
 import os
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -13,8 +15,8 @@ ALGORITHM = "HS256"
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,21 +30,34 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    principal = await get_principal(user_id)
+    if principal is not None:
+        return principal
+    
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.model_validate(user)
+    await store_principal(principal)
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     if current_user.subscription_status != 'active':
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_access_context(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> AccessContext:
+    """Request-scoped access context; memberships load once per request"""
+    return AccessContext(current_user.id, db)
+
 def require_role(required_role: str):
     """Dependency for role-based access control"""
-    async def role_checker(current_user: User = Depends(get_current_active_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_active_user)):
         # This is a simplified RBAC - extend based on your needs
         if required_role == "admin" and current_user.subscription_plan != "enterprise":
             raise HTTPException(
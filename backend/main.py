@@ -6,18 +6,36 @@ FastAPI backend server for Notify App.
 - Provides session-based authentication via cookies
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
-from backend.routes import auth, projects, notes, tasks, ai, workspaces, timer, reports
+import secrets
+from backend.routes import auth, projects, notes, tasks, ai, workspaces, timer, reports, imports, search
+from backend.cache import cache_stats
+from backend.database import database_stats
+from backend.principal_cache import principal_cache_stats
+from backend.tasks.import_tasks import check_upload_dir
+from backend.utils.passwords import password_hash_stats
 
 load_dotenv()
 
+# /metrics is only served to callers sending "Authorization: Bearer <token>";
+# without a token configured it is disabled
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Task imports hand uploads to Celery workers through this directory
+    check_upload_dir()
+    yield
+
 app = FastAPI(
     title="Notify App API",
     description="Backend API for task management, notes, and project tracking",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for Next.js frontend
@@ -29,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
@@ -40,6 +59,8 @@ app.include_router(ai.router)
 app.include_router(workspaces.router)
 app.include_router(timer.router)
 app.include_router(reports.router)
+app.include_router(imports.router)
+app.include_router(search.router)
 
 @app.get("/")
 async def root():
@@ -49,6 +70,23 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+def require_metrics_token(authorization: str | None = Header(None)):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Runtime counters for caches and connection pools"""
+    return {
+        "cache": cache_stats(),
+        "principalCache": principal_cache_stats(),
+        "passwordHashing": password_hash_stats(),
+        "database": database_stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     # Development server settings
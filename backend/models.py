@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, JSON, ForeignKey, Index
+from sqlalchemy import Column, String, Text, Integer, BigInteger, Boolean, Date, DateTime, JSON, ForeignKey, Index, DDL, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from backend.database import Base
@@ -39,6 +39,8 @@ class Space(Base):
     owner_id = Column(String, ForeignKey('users.id'), nullable=False, name="owner_id")
     type = Column(Text, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (Index('IDX_spaces_owner', 'owner_id'),)
 
 class Workspace(Base):
     __tablename__ = "workspaces"
@@ -49,6 +51,8 @@ class Workspace(Base):
     policy_manager_note_access = Column(Boolean, nullable=False, default=False, name="policy_manager_note_access")
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, name="updated_at")
+    
+    __table_args__ = (Index('IDX_workspaces_space', 'space_id'),)
 
 class Membership(Base):
     __tablename__ = "memberships"
@@ -58,6 +62,12 @@ class Membership(Base):
     user_id = Column(String, ForeignKey('users.id'), nullable=False, name="user_id")
     role = Column(Text, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (
+        Index('IDX_memberships_workspace_created', 'workspace_id', 'created_at', 'id'),
+        # ACL loads and EXISTS checks look memberships up by user
+        Index('IDX_memberships_user_workspace', 'user_id', 'workspace_id', 'role'),
+    )
 
 class Project(Base):
     __tablename__ = "projects"
@@ -71,6 +81,16 @@ class Project(Base):
     status = Column(Text, nullable=False, default='active')
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, name="updated_at")
+    
+    __table_args__ = (
+        Index('IDX_projects_workspace', 'workspace_id'),
+        Index('IDX_projects_space', 'space_id'),
+        # Project lists and dashboards only show active projects
+        Index('IDX_projects_workspace_active', 'workspace_id', 'updated_at',
+              postgresql_where=text("status = 'active'"), sqlite_where=text("status = 'active'")),
+        Index('IDX_projects_space_active', 'space_id', 'updated_at',
+              postgresql_where=text("status = 'active'"), sqlite_where=text("status = 'active'")),
+    )
 
 class Note(Base):
     __tablename__ = "notes"
@@ -88,6 +108,14 @@ class Note(Base):
     last_processed_length = Column(Integer, nullable=False, default=0, name="last_processed_length")
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, name="updated_at")
+    
+    __table_args__ = (
+        Index('IDX_notes_project_created', 'project_id', 'created_at', 'id'),
+        # Columns of the note visibility predicate
+        Index('IDX_notes_author', 'author_id'),
+        Index('IDX_notes_workspace', 'workspace_id'),
+        Index('IDX_notes_space', 'space_id'),
+    )
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -105,6 +133,19 @@ class Task(Base):
     series_id = Column(String, name="series_id")
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, name="updated_at")
+    
+    __table_args__ = (
+        Index('IDX_tasks_project_created', 'project_id', 'created_at', 'id'),
+        # Sort orders offered by GET /api/projects/{id}/tasks
+        Index('IDX_tasks_project_updated', 'project_id', 'updated_at', 'id'),
+        Index('IDX_tasks_project_due', 'project_id', 'due_date', 'id'),
+        Index('IDX_tasks_project_status', 'project_id', 'status'),
+        Index('IDX_tasks_assignee', 'assignee_id'),
+        Index('IDX_tasks_note', 'note_id'),
+        # Tag containment filter (tags @> '["x"]'); tags is plain JSON, so the
+        # index is on the JSONB cast the filter compiles to
+        Index('IDX_tasks_tags', text('CAST(tags AS JSONB)'), postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
 
 class TimeEntry(Base):
     __tablename__ = "time_entries"
@@ -116,6 +157,51 @@ class TimeEntry(Base):
     duration = Column(Integer, nullable=False, default=0)
     description = Column(Text)
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (
+        Index('IDX_time_entries_task_created', 'task_id', 'created_at', 'id'),
+        # Time reports filter a task's entries by start_time
+        Index('IDX_time_entries_task_start', 'task_id', 'start_time'),
+    )
+
+class TimeRollup(Base):
+    """
+    Seconds tracked per task and UTC day, maintained alongside time_entries
+    (see backend/time_rollups.py). An entry crossing midnight is split
+    between days; `entries` counts the entries that started on the day.
+    """
+    __tablename__ = "time_rollups"
+    
+    task_id = Column(String, ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True, name="task_id")
+    day = Column(Date, primary_key=True)
+    project_id = Column(String, ForeignKey('projects.id'), nullable=False, name="project_id")
+    seconds = Column(BigInteger, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (Index('IDX_time_rollups_project_day', 'project_id', 'day', 'seconds'),)
+
+class ReportSnapshot(Base):
+    """
+    A report precomputed for a user over [period_start, period_end), stored
+    as its compact JSON payload (see backend/report_snapshots.py).
+    """
+    __tablename__ = "report_snapshots"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey('users.id'), nullable=False, name="user_id")
+    kind = Column(Text, nullable=False)
+    days = Column(Integer, nullable=False)
+    period_start = Column(DateTime, nullable=False, name="period_start")
+    period_end = Column(DateTime, nullable=False, name="period_end")
+    data = Column(JSON, nullable=False)
+    # report_version of the user's scopes when computed; NULL if untracked
+    data_version = Column(Text, name="data_version")
+    created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (
+        # One snapshot per report and period; lookups take the latest period_end
+        Index('IDX_report_snapshots_user_period', 'user_id', 'kind', 'days', 'period_end', unique=True),
+    )
 
 class ActiveTimer(Base):
     __tablename__ = "active_timers"
@@ -124,6 +210,8 @@ class ActiveTimer(Base):
     task_id = Column(String, ForeignKey('tasks.id'), nullable=False, name="task_id")
     start_time = Column(DateTime, nullable=False, name="start_time")
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (Index('IDX_active_timers_task', 'task_id'),)
 
 class Attachment(Base):
     __tablename__ = "attachments"
@@ -138,6 +226,11 @@ class Attachment(Base):
     task_id = Column(String, ForeignKey('tasks.id'), name="task_id")
     uploaded_by = Column(String, ForeignKey('users.id'), name="uploaded_by")
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (
+        Index('IDX_attachments_task', 'task_id'),
+        Index('IDX_attachments_note', 'note_id'),
+    )
 
 class RecurrenceRule(Base):
     __tablename__ = "recurrence_rules"
@@ -163,6 +256,8 @@ class Subtask(Base):
     order = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, name="updated_at")
+    
+    __table_args__ = (Index('IDX_subtasks_parent', 'parent_task_id'),)
 
 class BoardColumn(Base):
     __tablename__ = "board_columns"
@@ -173,6 +268,8 @@ class BoardColumn(Base):
     order = Column(Integer, nullable=False)
     color = Column(Text)
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (Index('IDX_board_columns_project', 'project_id'),)
 
 class TaskBoardPosition(Base):
     __tablename__ = "task_board_positions"
@@ -180,6 +277,8 @@ class TaskBoardPosition(Base):
     task_id = Column(String, ForeignKey('tasks.id'), nullable=False, name="task_id", primary_key=True)
     column_id = Column(String, ForeignKey('board_columns.id'), nullable=False, name="column_id", primary_key=True)
     order = Column(Integer, nullable=False)
+    
+    __table_args__ = (Index('IDX_task_board_positions_column', 'column_id'),)
 
 class FeatureFlag(Base):
     __tablename__ = "feature_flags"
@@ -203,3 +302,51 @@ class AuditLog(Base):
     target_id = Column(String, nullable=False, name="target_id")
     diff_json = Column(JSON, name="diff_json")
     created_at = Column(DateTime, default=func.now(), nullable=False, name="created_at")
+    
+    __table_args__ = (Index('IDX_audit_logs_workspace_created', 'workspace_id', 'created_at'),)
+
+# Full-text search (see backend/search.py). The index lives outside the
+# mapped columns: a generated tsvector column with a GIN index on Postgres,
+# an external-content FTS5 table kept in sync by triggers on SQLite. Both
+# are maintained by the database on every write.
+SEARCH_CONFIG = "english"
+SEARCH_COLUMNS = {"notes": ("title", "content"), "tasks": ("title", "description")}
+
+def _search_ddl(table: str, title: str, body: str) -> tuple[list[DDL], list[DDL]]:
+    postgresql = [
+        DDL(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({title}, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({body}, '')), 'B')) STORED"
+        ),
+        DDL(f'CREATE INDEX IF NOT EXISTS "IDX_{table}_search" ON {table} USING gin (search_vector)'),
+    ]
+    fts = f"{table}_fts"
+    sqlite = [
+        DDL(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({title}, {body}, content='{table}')"),
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {title}, {body}) VALUES (new.rowid, new.{title}, new.{body}); END"
+        ),
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {title}, {body}) VALUES ('delete', old.rowid, old.{title}, old.{body}); END"
+        ),
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {title}, {body} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {title}, {body}) VALUES ('delete', old.rowid, old.{title}, old.{body}); "
+            f"INSERT INTO {fts}(rowid, {title}, {body}) VALUES (new.rowid, new.{title}, new.{body}); END"
+        ),
+    ]
+    return postgresql, sqlite
+
+for _model in (Note, Task):
+    _postgresql, _sqlite = _search_ddl(_model.__tablename__, *SEARCH_COLUMNS[_model.__tablename__])
+    for _ddl in _postgresql:
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
+    for _ddl in _sqlite:
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="sqlite"))
+    event.listen(
+        _model.__table__, "after_drop",
+        DDL(f"DROP TABLE IF EXISTS {_model.__tablename__}_fts").execute_if(dialect="sqlite")
+    )
@@ -0,0 +1,91 @@
+"""
+Principal cache for authenticated requests.
+
+Every authenticated call used to load the full ``User`` row just to read a
+handful of fields. The principal cache keeps those fields per user id in
+the two-tier cache (in-process LRU in front of Redis), so most requests
+skip both the users table and the Redis round trip.
+
+Entries are dropped whenever a ``User`` row is updated or deleted, after
+the surrounding transaction commits. That keeps requests starting after
+the commit from seeing the old row, but it is not a fence: a request that
+read the user before the commit can still store its stale principal after
+the delete. Staleness is therefore bounded by PRINCIPAL_CACHE_TTL (and
+LOCAL_CACHE_TTL for the in-process copy), not eliminated.
+
+Without Redis there is no pub/sub to drop the copies held by other
+workers, so principals are kept in process for only PRINCIPAL_LOCAL_TTL
+seconds (unless CACHE_SINGLE_PROCESS=1): a change committed through one
+worker is seen by the others within that bound.
+"""
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from backend.cache import LOCAL_TIER_COHERENT, get_cached, set_cached, delete_cached
+from backend.models import User
+import os
+
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_LOCAL_TTL = int(os.getenv("PRINCIPAL_LOCAL_TTL", "5"))
+
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+class Principal(BaseModel):
+    """The subset of ``User`` that routes read for the authenticated caller"""
+    id: str
+    email: str | None
+    first_name: str | None
+    last_name: str | None
+    profile_image_url: str | None
+    subscription_plan: str
+    subscription_status: str
+
+    class Config:
+        from_attributes = True
+
+def principal_key(user_id: str) -> str:
+    return f"principal:{user_id}"
+
+async def get_principal(user_id: str) -> Principal | None:
+    """Return the cached principal for a user, or None on a miss"""
+    principal = await get_cached(principal_key(user_id), local=True)
+    if principal is None:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return principal
+
+async def store_principal(principal: Principal):
+    """Cache a principal in process and in Redis; only briefly when other workers can't be told to drop it"""
+    ttl = PRINCIPAL_CACHE_TTL if LOCAL_TIER_COHERENT else min(PRINCIPAL_LOCAL_TTL, PRINCIPAL_CACHE_TTL)
+    await set_cached(principal_key(principal.id), principal, ttl, local=True)
+
+def invalidate_principal(user_id: str):
+    """Drop a user's principal from both cache tiers on every worker"""
+    _stats["invalidations"] += 1
+    delete_cached(principal_key(user_id))
+
+def principal_cache_stats() -> dict:
+    stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+# Invalidation: collect touched user ids during flush, drop them after commit
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_dirty(mapper, connection, target):
+    session = OrmSession.object_session(target)
+    if session is not None:
+        session.info.setdefault("dirty_principals", set()).add(target.id)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_dirty_principals(session):
+    for user_id in session.info.pop("dirty_principals", ()):
+        invalidate_principal(user_id)
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_dirty_principals(session):
+    session.info.pop("dirty_principals", None)
@@ -0,0 +1,183 @@
+"""
+Report cache.
+
+Report functions are cached with ``@report_cache`` in the ``reports``
+namespace, and callers pass ``cache_scopes=await report_scopes(access)``:
+the workspaces and spaces the report is computed over. A committed write
+bumps only the generations of the workspaces and spaces it touched, so
+reports covering them are recomputed on the next request while every
+other user's cached reports stay valid. Membership and space ownership
+changes alter a user's scopes, and with them the cache key. The same
+version (``report_version``) is stored with report snapshots, so a snapshot
+is only served while nothing it covers has been written since.
+
+Unit-of-work writes are noticed through mapper events. Bulk ``insert()`` /
+``update()`` / ``delete()`` statements bypass those, so code running them
+on a report source table calls ``mark_reports_dirty`` with the projects it
+wrote to. Project and task ids are resolved to scopes just before commit,
+from the session's identity map where possible and otherwise with one
+query; like the ACL invalidation, the bump happens after commit.
+"""
+
+from typing import Iterable
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm.util import identity_key
+from backend.cache import (
+    REDIS_AVAILABLE, cached, invalidate_namespace, namespace_generations_sync, namespace_version, scoped_version
+)
+from backend.models import Project, Task, TimeEntry, TimeRollup
+from backend.utils.permissions import AccessContext
+import os
+
+# Reports are fresh for REPORT_CACHE_TTL seconds, then served stale for up to
+# REPORT_CACHE_STALE_TTL more while a single caller recomputes them
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", "60"))
+REPORT_CACHE_STALE_TTL = int(os.getenv("REPORT_CACHE_STALE_TTL", "300"))
+
+REPORTS_NAMESPACE = "reports"
+
+def report_cache(func):
+    return cached(
+        ttl=REPORT_CACHE_TTL,
+        key_prefix="reports",
+        namespace=REPORTS_NAMESPACE,
+        stale_ttl=REPORT_CACHE_STALE_TTL,
+        exclude=("sessions",),
+    )(func)
+
+def project_scopes(workspace_id: str | None, space_id: str | None) -> set[str]:
+    """Scopes of a project: its workspace and its space"""
+    scopes = set()
+    if workspace_id:
+        scopes.add(f"workspace:{workspace_id}")
+    if space_id:
+        scopes.add(f"space:{space_id}")
+    return scopes
+
+async def report_scopes(access: AccessContext) -> list[str]:
+    """Scopes of the reports a user sees: every workspace they belong to and space they own"""
+    return (
+        [f"workspace:{workspace_id}" for workspace_id in await access.workspace_ids()]
+        + [f"space:{space_id}" for space_id in await access.space_ids()]
+    )
+
+async def report_version(scopes: Iterable[str]) -> str | None:
+    """
+    Version of the report data in the scopes; it changes with every write
+    invalidating them. None when writes can't be tracked (no Redis).
+    """
+    if not REDIS_AVAILABLE:
+        return None
+    return await namespace_version(REPORTS_NAMESPACE, scopes)
+
+def report_versions(scopes_by_user: dict[str, list[str]]) -> dict[str, str]:
+    """report_version of each user's scopes with one MGET, for Celery tasks; empty when untracked"""
+    scopes = sorted({scope for user_scopes in scopes_by_user.values() for scope in user_scopes})
+    generations = namespace_generations_sync(
+        [REPORTS_NAMESPACE] + [f"{REPORTS_NAMESPACE}:{scope}" for scope in scopes]
+    )
+    if generations is None:
+        return {}
+    by_scope = dict(zip(scopes, generations[1:]))
+    return {
+        user_id: scoped_version(generations[0], {scope: by_scope[scope] for scope in user_scopes})
+        for user_id, user_scopes in scopes_by_user.items()
+    }
+
+def invalidate_reports(scopes: Iterable[str] | None = None):
+    """Drop cached reports covering any of the scopes on every worker; every cached report without scopes"""
+    if scopes is None:
+        invalidate_namespace(REPORTS_NAMESPACE)
+    else:
+        invalidate_namespace(*(f"{REPORTS_NAMESPACE}:{scope}" for scope in scopes))
+
+def mark_reports_dirty(session, project_ids: Iterable[str] = (), task_ids: Iterable[str] = (), scopes: Iterable[str] = ()):
+    """Record a write to report data; reports covering it are dropped once the session commits"""
+    if session is None:
+        return
+    session.info.setdefault("report_projects", set()).update(project_ids)
+    session.info.setdefault("report_tasks", set()).update(task_ids)
+    session.info.setdefault("report_scopes", set()).update(scopes)
+
+def _current_and_old(target, name: str) -> set:
+    """Value of an attribute plus the one it replaced in this flush"""
+    values = {getattr(target, name), *inspect(target).attrs[name].history.deleted}
+    values.discard(None)
+    return values
+
+def _project_written(mapper, connection, target):
+    scopes = set()
+    for workspace_id in _current_and_old(target, "workspace_id"):
+        scopes |= project_scopes(workspace_id, None)
+    for space_id in _current_and_old(target, "space_id"):
+        scopes |= project_scopes(None, space_id)
+    mark_reports_dirty(OrmSession.object_session(target), scopes=scopes)
+
+def _project_rows_written(mapper, connection, target):
+    mark_reports_dirty(OrmSession.object_session(target), project_ids=_current_and_old(target, "project_id"))
+
+def _time_entry_written(mapper, connection, target):
+    mark_reports_dirty(OrmSession.object_session(target), task_ids=_current_and_old(target, "task_id"))
+
+for model, listener in (
+    (Project, _project_written),
+    (Task, _project_rows_written),
+    (TimeRollup, _project_rows_written),
+    (TimeEntry, _time_entry_written),
+):
+    for name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, name, listener)
+
+def _loaded(session, model, ident, *names) -> list | None:
+    """Column values of an instance already in the session, or None when a query would be needed"""
+    instance = session.identity_map.get(identity_key(model, ident))
+    if instance is None:
+        return None
+    values = inspect(instance).dict
+    if not all(name in values for name in names):
+        return None
+    return [values[name] for name in names]
+
+@event.listens_for(OrmSession, "before_commit")
+def _resolve_report_scopes(session):
+    # before_commit runs ahead of the final flush; flush now so its writes are marked too
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    project_ids = set(session.info.pop("report_projects", ()))
+    task_ids = set()
+    for task_id in session.info.pop("report_tasks", ()):
+        loaded = _loaded(session, Task, task_id, "project_id")
+        if loaded is None:
+            task_ids.add(task_id)
+        else:
+            project_ids.add(loaded[0])
+    
+    # Projects the request already loaded need no query
+    scopes = session.info.setdefault("report_scopes", set())
+    for project_id in list(project_ids):
+        loaded = _loaded(session, Project, project_id, "workspace_id", "space_id")
+        if loaded is not None:
+            scopes |= project_scopes(*loaded)
+            project_ids.discard(project_id)
+    
+    criteria = []
+    if project_ids:
+        criteria.append(Project.id.in_(project_ids))
+    if task_ids:
+        criteria.append(Project.id.in_(select(Task.project_id).where(Task.id.in_(task_ids))))
+    if not criteria:
+        return
+    for workspace_id, space_id in session.execute(select(Project.workspace_id, Project.space_id).where(or_(*criteria))):
+        scopes |= project_scopes(workspace_id, space_id)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_dirty_reports(session):
+    scopes = session.info.pop("report_scopes", None)
+    if scopes:
+        invalidate_reports(scopes)
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_dirty_reports(session):
+    for key in ("report_projects", "report_tasks", "report_scopes"):
+        session.info.pop(key, None)
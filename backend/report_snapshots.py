@@ -0,0 +1,75 @@
+"""
+Report snapshots.
+
+Reports computed in the background (the weekly Celery job) are stored in
+``report_snapshots``, one row per user, report kind and period, holding
+the numbers of the report payload as compact JSON together with the
+``report_version`` of the user's workspaces and spaces, read before the
+report was computed. The reports router serves a snapshot instead of
+computing the report live when one covers the requested number of days,
+ended less than ``REPORT_SNAPSHOT_MAX_AGE`` seconds ago and still has the
+current version, i.e. nothing it covers was written since. The response
+says when it was generated and where its period ends.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.models import ReportSnapshot
+import os
+
+REPORT_SNAPSHOT_MAX_AGE = int(os.getenv("REPORT_SNAPSHOT_MAX_AGE", "86400"))
+
+PRODUCTIVITY = "productivity"
+
+def save_snapshots(
+    db: Session,
+    kind: str,
+    period_start: datetime,
+    period_end: datetime,
+    reports: dict[str, dict],
+    versions: dict[str, str] | None = None,
+):
+    """
+    Store one snapshot per user id in reports, with that user's data
+    version from versions; rerunning a period replaces it. The caller commits
+    """
+    if not reports:
+        return
+    versions = versions or {}
+    days = (period_end - period_start).days
+    stmt = (postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert)(ReportSnapshot)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReportSnapshot.user_id, ReportSnapshot.kind, ReportSnapshot.days, ReportSnapshot.period_end],
+        set_={
+            "data": stmt.excluded.data,
+            "data_version": stmt.excluded.data_version,
+            "period_start": stmt.excluded.period_start,
+            "created_at": stmt.excluded.created_at,
+        },
+    )
+    now = datetime.utcnow()
+    db.execute(stmt, [
+        {"user_id": user_id, "kind": kind, "days": days, "period_start": period_start,
+         "period_end": period_end, "data": data, "data_version": versions.get(user_id), "created_at": now}
+        for user_id, data in reports.items()
+    ])
+
+async def load_snapshot(db: AsyncSession, user_id: str, kind: str, days: int, version: str | None) -> ReportSnapshot | None:
+    """The latest fresh snapshot covering `days` if its data is at `version`, or None to compute the report live"""
+    if version is None:
+        return None
+    fresh_after = datetime.utcnow() - timedelta(seconds=REPORT_SNAPSHOT_MAX_AGE)
+    snapshot = (await db.execute(
+        select(ReportSnapshot).where(
+            ReportSnapshot.user_id == user_id,
+            ReportSnapshot.kind == kind,
+            ReportSnapshot.days == days,
+            ReportSnapshot.period_end >= fresh_after
+        ).order_by(ReportSnapshot.period_end.desc()).limit(1)
+    )).scalar()
+    if snapshot is None or snapshot.data_version != version:
+        return None
+    return snapshot
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend.models import User
-from pydantic import BaseModel
-from passlib.context import CryptContext
+from backend.principal_cache import Principal, get_principal, store_principal
+from backend.utils.passwords import hash_password, verify_password
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import os
@@ -11,7 +12,6 @@ import secrets
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("SECRET_KEY") or secrets.token_urlsafe(32)
 if not os.getenv("SECRET_KEY"):
     print("WARNING: SECRET_KEY not set in environment. Using generated key for development only!")
@@ -31,14 +31,15 @@ class UserRegister(BaseModel):
 class UserResponse(BaseModel):
     id: str
     email: str
-    firstName: str | None
-    lastName: str | None
-    profileImageUrl: str | None
-    subscriptionPlan: str
-    subscriptionStatus: str
+    firstName: str | None = Field(validation_alias="first_name")
+    lastName: str | None = Field(validation_alias="last_name")
+    profileImageUrl: str | None = Field(validation_alias="profile_image_url")
+    subscriptionPlan: str = Field(validation_alias="subscription_plan")
+    subscriptionStatus: str = Field(validation_alias="subscription_status")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -55,7 +56,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     
     # Create user
     new_user = User(
@@ -73,9 +74,18 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
 @router.post("/login")
 async def login(user_data: UserLogin, response: Response, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == user_data.email).first()
-    if not user or not pwd_context.verify(user_data.password, user.password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    valid, new_hash = await verify_password(user_data.password, user.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Rehash on login when the stored hash uses an outdated cost
+    if new_hash:
+        user.password = new_hash
+        db.commit()
+    
     # Create access token
     access_token = create_access_token(data={"sub": user.id, "email": user.email})
     
@@ -127,8 +137,14 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
+    principal = await get_principal(user_id)
+    if principal is not None:
+        return principal
+    
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return user
+    principal = Principal.model_validate(user)
+    await store_principal(principal)
+    return principal
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from celery.result import AsyncResult
+from backend.celery_app import celery_app
+from backend.dependencies import get_access_context
+from backend.utils.permissions import AccessContext, verify_project_access
+from backend.tasks.import_tasks import (
+    IMPORT_UPLOAD_DIR, import_tasks, read_checkpoint, read_manifest, upload_path, write_manifest
+)
+import os
+import shutil
+import uuid
+
+router = APIRouter(prefix="/api", tags=["imports"])
+
+IMPORT_FORMATS = {".csv": "csv", ".json": "json", ".jsonl": "json", ".ndjson": "json"}
+
+def _save_upload(file: UploadFile, path: str):
+    # Copied in 1 MiB blocks, the upload is never held in memory as a whole
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file.file, out, 1 << 20)
+
+async def _load_import(import_id: str, access: AccessContext) -> dict:
+    manifest = read_manifest(import_id)
+    if manifest is None or manifest["userId"] != access.user_id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    if not await verify_project_access(manifest["projectId"], access):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return manifest
+
+@router.post("/projects/{project_id}/tasks/import", status_code=202)
+async def import_project_tasks(
+    project_id: str,
+    file: UploadFile,
+    access: AccessContext = Depends(get_access_context)
+):
+    """
+    Queue a CSV, JSON array or JSON Lines file of tasks for import.
+    Columns / keys are TaskCreate fields; poll GET /api/imports/{importId}.
+    """
+    if not await verify_project_access(project_id, access):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    file_format = IMPORT_FORMATS.get(os.path.splitext(file.filename or "")[1].lower())
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Upload a .csv, .json, .jsonl or .ndjson file")
+    
+    import_id = str(uuid.uuid4())
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+    await run_in_threadpool(_save_upload, file, upload_path(import_id, file_format))
+    write_manifest(import_id, {
+        "projectId": project_id,
+        "userId": access.user_id,
+        "format": file_format,
+        "filename": file.filename,
+        "jobId": import_id,
+    })
+    
+    await run_in_threadpool(
+        import_tasks.apply_async, (import_id, project_id, file_format), task_id=import_id
+    )
+    return {"importId": import_id, "state": "PENDING"}
+
+@router.get("/imports/{import_id}")
+async def get_import_status(
+    import_id: str,
+    access: AccessContext = Depends(get_access_context)
+):
+    manifest = await _load_import(import_id, access)
+    result = AsyncResult(manifest["jobId"], app=celery_app)
+    state = await run_in_threadpool(lambda: result.state)
+    
+    status = {"importId": import_id, "state": state, "progress": read_checkpoint(import_id)}
+    if state == "PROGRESS":
+        status["progress"] = result.info
+    elif state == "SUCCESS":
+        status["progress"] = None
+        status["result"] = result.result
+    elif state == "FAILURE":
+        status["error"] = str(result.info)
+    return status
+
+@router.post("/imports/{import_id}/resume", status_code=202)
+async def resume_import(
+    import_id: str,
+    access: AccessContext = Depends(get_access_context)
+):
+    """Restart a failed import from its last committed chunk"""
+    manifest = await _load_import(import_id, access)
+    state = await run_in_threadpool(lambda: AsyncResult(manifest["jobId"], app=celery_app).state)
+    if state not in ("FAILURE", "REVOKED"):
+        raise HTTPException(status_code=409, detail=f"Import is {state.lower()}")
+    if not os.path.exists(upload_path(import_id, manifest["format"])):
+        raise HTTPException(status_code=409, detail="Import has already completed")
+    
+    manifest["jobId"] = str(uuid.uuid4())
+    write_manifest(import_id, manifest)
+    await run_in_threadpool(
+        import_tasks.apply_async,
+        (import_id, manifest["projectId"], manifest["format"]),
+        task_id=manifest["jobId"]
+    )
+    return {"importId": import_id, "state": "PENDING", "resumeFrom": read_checkpoint(import_id)["row"]}
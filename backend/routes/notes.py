@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from backend.database import get_db
-from backend.models import Note, User
-from backend.dependencies import get_current_active_user
-from backend.utils.permissions import verify_project_access, verify_note_access
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Literal
+from backend.database import get_async_db
+from backend.models import Note
+from backend.dependencies import get_access_context
+from backend.utils.permissions import AccessContext, verify_project_access, load_note
+from backend.utils.etag import (
+    collection_etag, collection_version, etag_matches, is_conditional, item_etag,
+    not_modified, set_etag
+)
+from backend.utils.pagination import PageParams, fetch_page
+from backend.utils.fieldsets import load_columns, parse_fields, select_fields
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 router = APIRouter(prefix="/api", tags=["notes"])
@@ -29,49 +36,113 @@ class NoteUpdate(BaseModel):
 
 class NoteResponse(BaseModel):
     id: str
-    spaceId: str | None
-    workspaceId: str | None
-    projectId: str | None
-    authorId: str | None
+    spaceId: str | None = Field(validation_alias="space_id")
+    workspaceId: str | None = Field(validation_alias="workspace_id")
+    projectId: str | None = Field(validation_alias="project_id")
+    authorId: str | None = Field(validation_alias="author_id")
     title: str
     content: str
     tags: List[str]
     backlinks: List[str]
-    visibilityScope: str
-    lastProcessedLength: int
-    createdAt: datetime
-    updatedAt: datetime
+    visibilityScope: str = Field(validation_alias="visibility_scope")
+    lastProcessedLength: int = Field(validation_alias="last_processed_length")
+    createdAt: datetime = Field(validation_alias="created_at")
+    updatedAt: datetime = Field(validation_alias="updated_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
-@router.get("/projects/{project_id}/notes", response_model=List[NoteResponse])
+class NoteSummary(BaseModel):
+    """List-view projection without content and backlinks"""
+    id: str
+    projectId: str | None = Field(validation_alias="project_id")
+    authorId: str | None = Field(validation_alias="author_id")
+    title: str
+    tags: List[str]
+    visibilityScope: str = Field(validation_alias="visibility_scope")
+    createdAt: datetime = Field(validation_alias="created_at")
+    updatedAt: datetime = Field(validation_alias="updated_at")
+    
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+@router.get("/projects/{project_id}/notes", response_model=List[NoteResponse] | List[NoteSummary] | List[Dict[str, Any]])
 async def get_project_notes(
     project_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    fields: str | None = Query(None, description="Comma-separated response fields, e.g. id,title"),
+    view: Literal["full", "summary"] = "full",
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
+    if not await verify_project_access(project_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    notes = db.query(Note).filter(Note.project_id == project_id).all()
+    field_names = parse_fields(fields, NoteResponse)
+    etag = None
+    if is_conditional(request):
+        etag = collection_etag(request, *await collection_version(db, Note, Note.project_id == project_id))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    query = select(Note).where(Note.project_id == project_id)
+    if field_names:
+        query = query.options(load_columns(Note, NoteResponse, field_names))
+    elif view == "summary":
+        query = query.options(load_columns(Note, NoteSummary))
+    
+    notes = await fetch_page(db, query, Note, page, response)
+    if etag:
+        set_etag(response, etag)
+    if field_names:
+        return select_fields(notes, NoteResponse, field_names)
+    if view == "summary":
+        return [NoteSummary.model_validate(row) for row in notes]
     return notes
 
+@router.get("/notes/{note_id}", response_model=NoteResponse)
+async def get_note(
+    note_id: str,
+    request: Request,
+    response: Response,
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if is_conditional(request):
+        updated_at = (await db.execute(
+            select(Note.updated_at).where(Note.id == note_id, access.note_filter())
+        )).scalar()
+        if updated_at is None:
+            raise HTTPException(status_code=403, detail="Access denied")
+        etag = item_etag(request, note_id, updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    note = await load_note(note_id, access)
+    if not note:
+        raise HTTPException(status_code=403, detail="Access denied")
+    set_etag(response, item_etag(request, note.id, note.updated_at))
+    return note
+
 @router.post("/projects/{project_id}/notes", response_model=NoteResponse)
 async def create_note(
     project_id: str,
     note: NoteCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
+    if not await verify_project_access(project_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
     new_note = Note(
         project_id=project_id,
         space_id=note.spaceId,
         workspace_id=note.workspaceId,
-        author_id=current_user.id,
+        author_id=access.user_id,
         title=note.title,
         content=note.content,
         tags=note.tags,
@@ -79,23 +150,20 @@ async def create_note(
         visibility_scope=note.visibilityScope
     )
     db.add(new_note)
-    db.commit()
-    db.refresh(new_note)
+    await db.commit()
+    await db.refresh(new_note)
     return new_note
 
 @router.put("/notes/{note_id}", response_model=NoteResponse)
 async def update_note(
     note_id: str,
     note_update: NoteUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_note_access(note_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = await load_note(note_id, access)
     if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
     if note_update.title is not None:
         note.title = note_update.title
@@ -108,23 +176,20 @@ async def update_note(
     if note_update.visibilityScope is not None:
         note.visibility_scope = note_update.visibilityScope
     
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    await db.refresh(note)
     return note
 
 @router.delete("/notes/{note_id}")
 async def delete_note(
     note_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_note_access(note_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = await load_note(note_id, access)
     if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
-    db.delete(note)
-    db.commit()
+    await db.delete(note)
+    await db.commit()
     return {"message": "Note deleted successfully"}
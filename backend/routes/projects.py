@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from backend.database import get_db
-from backend.models import Project, User
-from backend.dependencies import get_current_active_user
-from backend.utils.permissions import get_user_workspace_ids, get_user_space_ids, verify_project_access
-from pydantic import BaseModel
+from backend.database import get_async_db
+from backend.models import Project
+from backend.principal_cache import Principal
+from backend.dependencies import get_current_active_user, get_access_context
+from backend.utils.permissions import AccessContext, load_project
+from backend.utils.etag import (
+    collection_etag, collection_version, etag_matches, is_conditional, item_etag,
+    not_modified, rows_version, set_etag
+)
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
@@ -29,34 +35,44 @@ class ProjectResponse(BaseModel):
     name: str
     description: str | None
     color: str
-    spaceId: str | None
-    workspaceId: str | None
+    spaceId: str | None = Field(validation_alias="space_id")
+    workspaceId: str | None = Field(validation_alias="workspace_id")
     status: str
-    createdAt: datetime
-    updatedAt: datetime
+    createdAt: datetime = Field(validation_alias="created_at")
+    updatedAt: datetime = Field(validation_alias="updated_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_workspaces = get_user_workspace_ids(current_user.id, db)
-    user_spaces = get_user_space_ids(current_user.id, db)
+    user_workspaces = await access.workspace_ids()
+    user_spaces = await access.space_ids()
     
-    projects = db.query(Project).filter(
+    criteria = (
         Project.status == 'active',
         (Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))
-    ).all()
+    )
+    if is_conditional(request):
+        etag = collection_etag(request, *await collection_version(db, Project, *criteria))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    projects = (await db.execute(select(Project).where(*criteria))).scalars().all()
+    set_etag(response, collection_etag(request, *rows_version(projects)))
     return projects
 
 @router.post("/", response_model=ProjectResponse)
 async def create_project(
     project: ProjectCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_project = Project(
         name=project.name,
@@ -67,37 +83,44 @@ async def create_project(
         status=project.status
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
     return new_project
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
+    if is_conditional(request):
+        updated_at = (await db.execute(
+            select(Project.updated_at).where(Project.id == project_id, access.project_filter())
+        )).scalar()
+        if updated_at is None:
+            raise HTTPException(status_code=403, detail="Access denied")
+        etag = item_etag(request, project_id, updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await load_project(project_id, access)
     if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        raise HTTPException(status_code=403, detail="Access denied")
+    set_etag(response, item_etag(request, project.id, project.updated_at))
     return project
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: str, 
     project_update: ProjectUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await load_project(project_id, access)
     if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
     if project_update.name is not None:
         project.name = project_update.name
@@ -108,23 +131,20 @@ async def update_project(
     if project_update.status is not None:
         project.status = project_update.status
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await load_project(project_id, access)
     if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
     project.status = 'deleted'
-    db.commit()
+    await db.commit()
     return {"message": "Project deleted successfully"}
@@ -1,137 +1,325 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Dict, Any
-from backend.database import get_db
-from backend.models import Task, TimeEntry, Project, User
-from backend.dependencies import get_current_active_user
-from backend.utils.permissions import get_user_workspace_ids, get_user_space_ids, verify_project_access
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy import BigInteger, Date, String, and_, cast, distinct, func, literal, select, union_all
+from typing import List, Dict, Any, Literal
+from backend.database import get_async_sessionmaker
+from backend.models import Task, TimeEntry, TimeRollup, Project
+from backend.dependencies import get_access_context
+from backend.report_cache import report_cache, report_scopes, report_version
+from backend.report_snapshots import PRODUCTIVITY, load_snapshot
+from backend.utils.permissions import AccessContext, verify_project_access
+from backend.utils.sql import epoch, greatest, least
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
+TIME_STATS_MAX_DAYS = 366
+# Longest time entry that is still split correctly into a report window it
+# started before
+TIME_ENTRY_MAX_SPAN = timedelta(hours=24)
+
 class TaskStats(BaseModel):
     total: int
     completed: int
     inProgress: int
     todo: int
     byPriority: Dict[str, int]
+    byStatus: Dict[str, int]
 
 class TimeStats(BaseModel):
     totalMinutes: int
     entriesCount: int
-    byDay: List[Dict[str, Any]]
+    timezone: str
+    granularity: str
+    # Named byDay, byWeek or byMonth after the granularity
+    byDay: List[Dict[str, Any]] | None = None
+    byWeek: List[Dict[str, Any]] | None = None
+    byMonth: List[Dict[str, Any]] | None = None
 
 @router.get("/tasks/stats")
 async def get_task_stats(
     project_id: str | None = None,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    sessions: async_sessionmaker = Depends(get_async_sessionmaker)
 ):
-    user_workspaces = get_user_workspace_ids(current_user.id, db)
-    user_spaces = get_user_space_ids(current_user.id, db)
+    # Loading here also warms the ACL cache the report computation reads
+    await access.load()
+    if project_id and not await verify_project_access(project_id, access):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return await task_stats(access.user_id, project_id, sessions=sessions, cache_scopes=await report_scopes(access))
+
+# Always reported, even when no task has them
+TASK_STATUS_KEYS = {"done": "completed", "in_progress": "inProgress", "todo": "todo"}
+TASK_PRIORITIES = ("high", "medium", "low")
+
+def task_counts_query(workspace_ids: list[str], space_ids: list[str], project_id: str | None = None):
+    """Task counts per (status, priority) over the given workspaces and spaces"""
+    query = select(Task.status, Task.priority, func.count()).join(Project).where(
+        (Project.workspace_id.in_(workspace_ids)) | (Project.space_id.in_(space_ids))
+    ).group_by(Task.status, Task.priority)
+    if project_id:
+        query = query.where(Task.project_id == project_id)
+    return query
+
+def fold_task_counts(rows) -> dict:
+    """TaskStats from (status, priority, count) rows"""
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = dict.fromkeys(TASK_PRIORITIES, 0)
+    for status, priority, count in rows:
+        by_status[status] = by_status.get(status, 0) + count
+        by_priority[priority] = by_priority.get(priority, 0) + count
     
-    query = db.query(Task).join(Project).filter(
-        (Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))
-    )
+    stats = {"total": sum(by_status.values())}
+    for status, key in TASK_STATUS_KEYS.items():
+        stats[key] = by_status.get(status, 0)
+    stats["byPriority"] = by_priority
+    stats["byStatus"] = {**dict.fromkeys(TASK_STATUS_KEYS, 0), **by_status}
+    return stats
+
+@report_cache
+async def task_stats(user_id: str, project_id: str | None, sessions: async_sessionmaker):
+    # Runs on its own session: a stale-while-revalidate refresh may finish
+    # after the request that triggered it
+    async with sessions() as db:
+        access = AccessContext(user_id, db)
+        user_workspaces = await access.workspace_ids()
+        user_spaces = await access.space_ids()
+        
+        rows = (await db.execute(task_counts_query(user_workspaces, user_spaces, project_id))).all()
+    
+    return fold_task_counts(rows)
+
+def time_buckets(days: int, granularity: str, tz: ZoneInfo, now: datetime) -> list[tuple[str, int, int]]:
+    """
+    (label, start, end) of the day/week/month periods covering the last
+    `days` local calendar days up to now, as UTC epoch seconds. Periods
+    are clipped to that window; labels are the period's first local date.
+    """
+    today = now.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    first_day = today - timedelta(days=days - 1)
+    if granularity == "week":
+        period = first_day - timedelta(days=first_day.weekday())
+    elif granularity == "month":
+        period = first_day.replace(day=1)
+    else:
+        period = first_day
+    
+    def local_midnight(day: date) -> int:
+        return int(datetime.combine(day, time.min, tz).timestamp())
     
+    window_start, window_end = local_midnight(first_day), int(now.replace(tzinfo=timezone.utc).timestamp())
+    buckets = []
+    while period <= today:
+        if granularity == "week":
+            next_period = period + timedelta(days=7)
+        elif granularity == "month":
+            next_period = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            next_period = period + timedelta(days=1)
+        buckets.append((
+            period.isoformat(),
+            max(local_midnight(period), window_start),
+            min(local_midnight(next_period), window_end),
+        ))
+        period = next_period
+    return buckets
+
+def time_bucket_queries(buckets, workspace_ids: list[str], space_ids: list[str], project_id: str | None = None):
+    """
+    Seconds tracked per bucket, and the number of distinct entries in the
+    window. Each entry contributes its overlap with every bucket it spans,
+    so an entry crossing midnight is split between the two days.
+    """
+    periods = union_all(*(
+        select(
+            literal(label, String).label("label"),
+            literal(start, BigInteger).label("period_start"),
+            literal(end, BigInteger).label("period_end"),
+        )
+        for label, start, end in buckets
+    )).subquery("periods")
+    entry_start = epoch(TimeEntry.start_time)
+    entry_end = entry_start + TimeEntry.duration
+    overlap = least(entry_end, periods.c.period_end) - greatest(entry_start, periods.c.period_start)
+    
+    window_start = datetime.utcfromtimestamp(buckets[0][1])
+    window_end = datetime.utcfromtimestamp(buckets[-1][2])
+    query = select(TimeEntry.id).join(Task).join(Project).join(
+        periods, and_(entry_start < periods.c.period_end, entry_end > periods.c.period_start)
+    ).where(
+        (Project.workspace_id.in_(workspace_ids)) | (Project.space_id.in_(space_ids)),
+        # Index range on start_time; entries starting before the window
+        # are only looked at TIME_ENTRY_MAX_SPAN back
+        TimeEntry.start_time >= window_start - TIME_ENTRY_MAX_SPAN,
+        TimeEntry.start_time < window_end,
+    )
     if project_id:
-        if not verify_project_access(project_id, current_user.id, db):
-            raise HTTPException(status_code=403, detail="Access denied")
-        query = query.filter(Task.project_id == project_id)
+        query = query.where(Task.project_id == project_id)
     
-    tasks = query.all()
+    # sum() of bigint is numeric on Postgres
+    per_period = query.with_only_columns(periods.c.label, cast(func.sum(overlap), BigInteger)).group_by(
+        periods.c.label
+    ).order_by(periods.c.label)
+    # Entries are counted in the window they started in, like the rollups do
+    entries = query.where(TimeEntry.start_time >= window_start).with_only_columns(
+        func.count(distinct(TimeEntry.id))
+    )
+    return per_period, entries
+
+def is_utc_aligned(buckets) -> bool:
+    """Whether every period boundary but the final "now" is a UTC midnight"""
+    boundaries = [start for _, start, _ in buckets] + [end for _, _, end in buckets[:-1]]
+    return all(boundary % 86400 == 0 for boundary in boundaries)
+
+def rollup_bucket_queries(buckets, workspace_ids: list[str], space_ids: list[str], project_id: str | None = None):
+    """Same as time_bucket_queries, read from the daily rollups; needs UTC-aligned buckets"""
+    def utc_day(timestamp: int) -> date:
+        return datetime.utcfromtimestamp(timestamp).date()
     
-    stats = {
-        "total": len(tasks),
-        "completed": len([t for t in tasks if t.status == 'done']),
-        "inProgress": len([t for t in tasks if t.status == 'in_progress']),
-        "todo": len([t for t in tasks if t.status == 'todo']),
-        "byPriority": {
-            "high": len([t for t in tasks if t.priority == 'high']),
-            "medium": len([t for t in tasks if t.priority == 'medium']),
-            "low": len([t for t in tasks if t.priority == 'low'])
-        }
-    }
+    # Period ends are exclusive days; the last one ends after today
+    periods = union_all(*(
+        select(
+            literal(label, String).label("label"),
+            literal(utc_day(start), Date).label("period_start"),
+            literal(utc_day(end - 1) + timedelta(days=1), Date).label("period_end"),
+        )
+        for label, start, end in buckets
+    )).subquery("periods")
+    first_day = utc_day(buckets[0][1])
+    last_day = utc_day(buckets[-1][2] - 1)
+    query = select(TimeRollup.day).join(Project, Project.id == TimeRollup.project_id).where(
+        (Project.workspace_id.in_(workspace_ids)) | (Project.space_id.in_(space_ids)),
+        TimeRollup.day >= first_day,
+        TimeRollup.day <= last_day,
+    )
+    if project_id:
+        query = query.where(TimeRollup.project_id == project_id)
     
-    return stats
+    per_period = query.join(
+        periods, and_(TimeRollup.day >= periods.c.period_start, TimeRollup.day < periods.c.period_end)
+    ).with_only_columns(periods.c.label, cast(func.sum(TimeRollup.seconds), BigInteger)).group_by(
+        periods.c.label
+    ).order_by(periods.c.label)
+    entries = query.with_only_columns(func.coalesce(cast(func.sum(TimeRollup.entries), BigInteger), 0))
+    return per_period, entries
+
+def parse_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone {name!r}")
 
 @router.get("/time/stats")
 async def get_time_stats(
     project_id: str | None = None,
-    days: int = 7,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    days: int = Query(7, ge=1, le=TIME_STATS_MAX_DAYS),
+    granularity: Literal["day", "week", "month"] = "day",
+    tz: str = Query("UTC", description="IANA timezone the periods are cut in, e.g. Europe/Berlin"),
+    access: AccessContext = Depends(get_access_context),
+    sessions: async_sessionmaker = Depends(get_async_sessionmaker)
 ):
-    user_workspaces = get_user_workspace_ids(current_user.id, db)
-    user_spaces = get_user_space_ids(current_user.id, db)
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    query = db.query(TimeEntry).join(Task).join(Project).filter(
-        ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
-        TimeEntry.start_time >= start_date
+    parse_timezone(tz)
+    await access.load()
+    if project_id and not await verify_project_access(project_id, access):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return await time_stats(
+        access.user_id, project_id, days, granularity, tz, sessions=sessions, cache_scopes=await report_scopes(access)
     )
+
+@report_cache
+async def time_stats(
+    user_id: str,
+    project_id: str | None,
+    days: int,
+    granularity: str,
+    tz: str,
+    sessions: async_sessionmaker
+):
+    buckets = time_buckets(days, granularity, parse_timezone(tz), datetime.utcnow())
+    async with sessions() as db:
+        access = AccessContext(user_id, db)
+        user_workspaces = await access.workspace_ids()
+        user_spaces = await access.space_ids()
+        
+        # The rollups have UTC days; other timezones cut days in the middle
+        # and are summed from the entries
+        bucket_queries = rollup_bucket_queries if is_utc_aligned(buckets) else time_bucket_queries
+        per_period, entries = bucket_queries(buckets, user_workspaces, user_spaces, project_id)
+        rows = (await db.execute(per_period)).all()
+        entries_count = (await db.execute(entries)).scalar()
     
-    if project_id:
-        if not verify_project_access(project_id, current_user.id, db):
-            raise HTTPException(status_code=403, detail="Access denied")
-        query = query.filter(Task.project_id == project_id)
-    
-    entries = query.all()
-    
-    total_seconds = sum([e.duration for e in entries])
-    total_minutes = total_seconds // 60
-    
-    # Group by day
-    by_day = {}
-    for entry in entries:
-        day = entry.start_time.date().isoformat()
-        if day not in by_day:
-            by_day[day] = 0
-        by_day[day] += entry.duration // 60
-    
-    stats = {
-        "totalMinutes": total_minutes,
-        "entriesCount": len(entries),
-        "byDay": [{"date": k, "minutes": v} for k, v in sorted(by_day.items())]
+    total_seconds = sum(seconds for _, seconds in rows)
+    return {
+        "totalMinutes": total_seconds // 60,
+        "entriesCount": entries_count,
+        "timezone": tz,
+        "granularity": granularity,
+        f"by{granularity.capitalize()}": [
+            {"date": label, "minutes": seconds // 60} for label, seconds in rows
+        ],
     }
-    
-    return stats
 
 @router.get("/productivity")
 async def get_productivity_report(
     days: int = 30,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    sessions: async_sessionmaker = Depends(get_async_sessionmaker)
 ):
-    user_workspaces = get_user_workspace_ids(current_user.id, db)
-    user_spaces = get_user_space_ids(current_user.id, db)
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Tasks completed
-    completed_tasks = db.query(Task).join(Project).filter(
-        ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
-        Task.status == 'done',
-        Task.updated_at >= start_date
-    ).count()
-    
-    # Time tracked
-    total_time = db.query(func.sum(TimeEntry.duration)).join(Task).join(Project).filter(
-        ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
-        TimeEntry.start_time >= start_date
-    ).scalar() or 0
-    
-    # Active projects
-    active_projects = db.query(Project).filter(
-        ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
-        Project.status == 'active'
-    ).count()
-    
-    return {
-        "completedTasks": completed_tasks,
-        "totalTimeMinutes": total_time // 60,
-        "activeProjects": active_projects,
-        "period": f"Last {days} days"
-    }
+    scopes = await report_scopes(access)
+    async with sessions() as db:
+        snapshot = await load_snapshot(db, access.user_id, PRODUCTIVITY, days, await report_version(scopes))
+    if snapshot:
+        return {
+            **snapshot.data,
+            "period": f"Last {days} days",
+            "periodEnd": snapshot.period_end.isoformat(),
+            "generatedAt": snapshot.created_at.isoformat(),
+        }
+    return await productivity_report(access.user_id, days, sessions=sessions, cache_scopes=scopes)
+
+@report_cache
+async def productivity_report(user_id: str, days: int, sessions: async_sessionmaker):
+    async with sessions() as db:
+        access = AccessContext(user_id, db)
+        user_workspaces = await access.workspace_ids()
+        user_spaces = await access.space_ids()
+        now = datetime.utcnow()
+        start_date = now - timedelta(days=days)
+        
+        # Tasks completed
+        completed_tasks = (await db.execute(
+            select(func.count(Task.id)).join(Project).where(
+                ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
+                Task.status == 'done',
+                Task.updated_at >= start_date
+            )
+        )).scalar()
+        
+        # Time tracked, in whole UTC days
+        total_time = (await db.execute(
+            select(cast(func.sum(TimeRollup.seconds), BigInteger)).join(
+                Project, Project.id == TimeRollup.project_id
+            ).where(
+                ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
+                TimeRollup.day >= start_date.date()
+            )
+        )).scalar() or 0
+        
+        # Active projects
+        active_projects = (await db.execute(
+            select(func.count(Project.id)).where(
+                ((Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))),
+                Project.status == 'active'
+            )
+        )).scalar()
+        
+        return {
+            "completedTasks": completed_tasks,
+            "totalTimeMinutes": total_time // 60,
+            "activeProjects": active_projects,
+            "period": f"Last {days} days",
+            "periodEnd": now.isoformat(),
+            "generatedAt": now.isoformat(),
+        }
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal
+from backend.database import get_async_db
+from backend.dependencies import get_access_context
+from backend.search import SEARCH_KINDS, fts5_query, search_query
+from backend.utils.permissions import AccessContext
+from backend.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from pydantic import BaseModel, Field
+from datetime import datetime
+import base64
+import json
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+DEFAULT_SEARCH_LIMIT = 20
+
+class SearchResult(BaseModel):
+    type: Literal["note", "task"] = Field(validation_alias="kind")
+    id: str
+    title: str
+    projectId: str | None = Field(validation_alias="project_id")
+    updatedAt: datetime = Field(validation_alias="updated_at")
+    rank: float
+    
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+# Results are ordered by rank, which no index can seek into, so the cursor
+# carries an offset rather than a keyset position
+def _encode_offset(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode().rstrip("=")
+
+def _decode_offset(cursor: str) -> int:
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["offset"]
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError(offset)
+        return offset
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/search", response_model=List[SearchResult])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Literal["note", "task"] | None = Query(None, description="Only notes or only tasks"),
+    cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Notes and tasks matching q in every workspace and space the user can access, best first"""
+    if not fts5_query(q):
+        return []
+    
+    offset = _decode_offset(cursor) if cursor else 0
+    await access.load()
+    query = search_query(db.bind.dialect.name, q, access, (type,) if type else SEARCH_KINDS)
+    rows = (await db.execute(query.offset(offset).limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_offset(offset + limit)
+    return [SearchResult.model_validate(row) for row in rows]
@@ -1,22 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from backend.database import get_db
-from backend.models import Task, User
-from backend.dependencies import get_current_active_user
-from backend.utils.permissions import verify_project_access, verify_task_access
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Any, Dict, List, Literal, Union
+from backend.database import get_async_db
+from backend.models import Task, Project
+from backend.dependencies import get_access_context
+from backend.report_cache import mark_reports_dirty
+from backend.utils.permissions import AccessContext, verify_project_access, load_task
+from backend.utils.etag import (
+    collection_etag, collection_version, etag_matches, is_conditional, item_etag,
+    not_modified, set_etag
+)
+from backend.utils.pagination import PageParams, fetch_page
+from backend.utils.fieldsets import load_columns, parse_fields, select_fields
+from backend.utils.sql import json_contains_all
+from backend.utils.datetimes import UTCDateTime
+from pydantic import BaseModel, Field
 from datetime import datetime
+import os
 
 router = APIRouter(prefix="/api", tags=["tasks"])
 
+TASK_BATCH_MAX_OPERATIONS = int(os.getenv("TASK_BATCH_MAX_OPERATIONS", "500"))
+
 class TaskCreate(BaseModel):
     title: str
     description: str | None = None
     status: str = 'todo'
     priority: str = 'medium'
     assigneeId: str | None = None
-    dueDate: datetime | None = None
+    dueDate: UTCDateTime | None = None
     noteId: str | None = None
     tags: List[str] = []
 
@@ -26,47 +39,203 @@ class TaskUpdate(BaseModel):
     status: str | None = None
     priority: str | None = None
     assigneeId: str | None = None
-    dueDate: datetime | None = None
+    dueDate: UTCDateTime | None = None
     tags: List[str] | None = None
 
 class TaskResponse(BaseModel):
     id: str
-    projectId: str
-    noteId: str | None
+    projectId: str = Field(validation_alias="project_id")
+    noteId: str | None = Field(validation_alias="note_id")
     title: str
     description: str | None
     status: str
     priority: str
-    assigneeId: str | None
-    dueDate: datetime | None
+    assigneeId: str | None = Field(validation_alias="assignee_id")
+    dueDate: datetime | None = Field(validation_alias="due_date")
     tags: List[str]
-    seriesId: str | None
-    createdAt: datetime
-    updatedAt: datetime
+    seriesId: str | None = Field(validation_alias="series_id")
+    createdAt: datetime = Field(validation_alias="created_at")
+    updatedAt: datetime = Field(validation_alias="updated_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
+
+class TaskSummary(BaseModel):
+    """List-view projection without the description"""
+    id: str
+    projectId: str = Field(validation_alias="project_id")
+    title: str
+    status: str
+    priority: str
+    assigneeId: str | None = Field(validation_alias="assignee_id")
+    dueDate: datetime | None = Field(validation_alias="due_date")
+    tags: List[str]
+    createdAt: datetime = Field(validation_alias="created_at")
+    updatedAt: datetime = Field(validation_alias="updated_at")
+    
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+def _split(value: str | None) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+class TaskFilters:
+    """List filters, all applied in SQL; comma-separated values match any of them"""
+
+    def __init__(
+        self,
+        status: str | None = Query(None, description="e.g. todo,in_progress"),
+        priority: str | None = Query(None, description="e.g. high,urgent"),
+        assignee_id: str | None = Query(None, alias="assigneeId"),
+        due_after: UTCDateTime | None = Query(None, alias="dueAfter", description="Due on or after"),
+        due_before: UTCDateTime | None = Query(None, alias="dueBefore", description="Due before"),
+        tags: str | None = Query(None, description="Tasks carrying all of these tags"),
+        q: str | None = Query(None, description="Case-insensitive title search"),
+    ):
+        self.status = _split(status)
+        self.priority = _split(priority)
+        self.assignee_ids = _split(assignee_id)
+        self.due_after = due_after
+        self.due_before = due_before
+        self.tags = _split(tags)
+        self.q = q
 
-@router.get("/projects/{project_id}/tasks", response_model=List[TaskResponse])
+    def criteria(self) -> list:
+        criteria = []
+        if self.status:
+            criteria.append(Task.status.in_(self.status))
+        if self.priority:
+            criteria.append(Task.priority.in_(self.priority))
+        if self.assignee_ids:
+            criteria.append(Task.assignee_id.in_(self.assignee_ids))
+        if self.due_after:
+            criteria.append(Task.due_date >= self.due_after)
+        if self.due_before:
+            criteria.append(Task.due_date < self.due_before)
+        if self.tags:
+            criteria.append(json_contains_all(Task.tags, self.tags))
+        if self.q:
+            criteria.append(Task.title.icontains(self.q, autoescape=True))
+        return criteria
+
+# sort= value -> column; each is backed by a (project_id, column, id) index.
+# A leading "-" sorts descending.
+TASK_SORT_COLUMNS = {
+    "createdAt": Task.created_at,
+    "updatedAt": Task.updated_at,
+    "dueDate": Task.due_date,
+}
+TaskSort = Literal[tuple(f"{prefix}{name}" for name in TASK_SORT_COLUMNS for prefix in ("", "-"))]
+
+class TaskBatchCreate(BaseModel):
+    op: Literal["create"]
+    task: TaskCreate
+
+class TaskBatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: str
+    task: TaskUpdate
+
+class TaskBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: str
+
+class TaskBatchRequest(BaseModel):
+    operations: List[Annotated[
+        Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete],
+        Field(discriminator="op")
+    ]] = Field(min_length=1, max_length=TASK_BATCH_MAX_OPERATIONS)
+
+class TaskBatchResult(BaseModel):
+    index: int
+    op: str
+    id: str | None = None
+    status: Literal["ok", "error"]
+    error: str | None = None
+    task: TaskResponse | None = None
+
+class TaskBatchResponse(BaseModel):
+    results: List[TaskBatchResult]
+
+@router.get("/projects/{project_id}/tasks", response_model=List[TaskResponse] | List[TaskSummary] | List[Dict[str, Any]])
 async def get_project_tasks(
     project_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    fields: str | None = Query(None, description="Comma-separated response fields, e.g. id,title"),
+    view: Literal["full", "summary"] = "full",
+    filters: TaskFilters = Depends(),
+    sort: TaskSort = "createdAt",
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
+    if not await verify_project_access(project_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
+    field_names = parse_fields(fields, TaskResponse)
+    # The tag covers the whole project; filters and sort are part of the
+    # query string it is mixed with. Only conditional requests pay for it
+    etag = None
+    if is_conditional(request):
+        etag = collection_etag(request, *await collection_version(db, Task, Task.project_id == project_id))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    descending = sort.startswith("-")
+    sort_column = TASK_SORT_COLUMNS[sort.lstrip("-")]
+    query = select(Task).where(Task.project_id == project_id, *filters.criteria())
+    if field_names:
+        query = query.options(load_columns(Task, TaskResponse, field_names, sort_column.key))
+    elif view == "summary":
+        query = query.options(load_columns(Task, TaskSummary))
+    
+    tasks = await fetch_page(db, query, Task, page, response, sort_column, descending)
+    if etag:
+        set_etag(response, etag)
+    if field_names:
+        return select_fields(tasks, TaskResponse, field_names)
+    if view == "summary":
+        return [TaskSummary.model_validate(row) for row in tasks]
     return tasks
 
+@router.get("/tasks/{task_id}", response_model=TaskResponse)
+async def get_task(
+    task_id: str,
+    request: Request,
+    response: Response,
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if is_conditional(request):
+        updated_at = (await db.execute(
+            select(Task.updated_at).join(Project, Project.id == Task.project_id).where(
+                Task.id == task_id,
+                access.project_filter()
+            )
+        )).scalar()
+        if updated_at is None:
+            raise HTTPException(status_code=403, detail="Access denied")
+        etag = item_etag(request, task_id, updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    task = await load_task(task_id, access)
+    if not task:
+        raise HTTPException(status_code=403, detail="Access denied")
+    set_etag(response, item_etag(request, task.id, task.updated_at))
+    return task
+
 @router.post("/projects/{project_id}/tasks", response_model=TaskResponse)
 async def create_task(
     project_id: str,
     task: TaskCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_project_access(project_id, current_user.id, db):
+    if not await verify_project_access(project_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
     new_task = Task(
@@ -81,23 +250,149 @@ async def create_task(
         tags=task.tags
     )
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    await db.refresh(new_task)
     return new_task
 
+# TaskUpdate field -> Task column
+TASK_UPDATE_COLUMNS = {
+    "title": "title",
+    "description": "description",
+    "status": "status",
+    "priority": "priority",
+    "assigneeId": "assignee_id",
+    "dueDate": "due_date",
+    "tags": "tags",
+}
+
+@router.post("/projects/{project_id}/tasks/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    project_id: str,
+    batch: TaskBatchRequest,
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Apply create/update/delete operations to a project's tasks in one
+    transaction. Access is checked once for the project; operations on tasks
+    outside it fail individually while the rest are applied.
+    
+    Operations are applied grouped by kind, all creates, then all updates,
+    then all deletes, not in request order. So each task id may appear in at
+    most one operation; a batch repeating an id is rejected with 422.
+    Results are returned in request order.
+    """
+    if not await verify_project_access(project_id, access):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    operations = batch.operations
+    seen_ids, duplicate_ids = set(), []
+    for op in operations:
+        if op.op != "create":
+            if op.id in seen_ids:
+                duplicate_ids.append(op.id)
+            seen_ids.add(op.id)
+    if duplicate_ids:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Task ids may appear in only one operation per batch: {', '.join(sorted(set(duplicate_ids)))}"
+        )
+    results: list[TaskBatchResult | None] = [None] * len(operations)
+    
+    target_ids = {op.id for op in operations if op.op != "create"}
+    in_project = set()
+    if target_ids:
+        in_project = set((await db.execute(
+            select(Task.id).where(Task.id.in_(target_ids), Task.project_id == project_id)
+        )).scalars())
+    
+    creates, updates, deletes = [], [], []
+    for index, op in enumerate(operations):
+        if op.op != "create" and op.id not in in_project:
+            results[index] = TaskBatchResult(
+                index=index, op=op.op, id=op.id, status="error", error="Task not found in project"
+            )
+        elif op.op == "create":
+            creates.append(index)
+        elif op.op == "update":
+            updates.append(index)
+        else:
+            deletes.append(index)
+    
+    # Creates: one multi-row INSERT ... RETURNING, rows come back in parameter order
+    if creates:
+        created = (await db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [
+                {
+                    "project_id": project_id,
+                    "note_id": operations[index].task.noteId,
+                    "title": operations[index].task.title,
+                    "description": operations[index].task.description,
+                    "status": operations[index].task.status,
+                    "priority": operations[index].task.priority,
+                    "assignee_id": operations[index].task.assigneeId,
+                    "due_date": operations[index].task.dueDate,
+                    "tags": operations[index].task.tags,
+                }
+                for index in creates
+            ]
+        )).all()
+        for index, task in zip(creates, created):
+            results[index] = TaskBatchResult(
+                index=index, op="create", id=task.id, status="ok",
+                task=TaskResponse.model_validate(task)
+            )
+    
+    # Updates: executemany UPDATE by primary key, then one SELECT for the results
+    rows = []
+    for index in updates:
+        changes = operations[index].task.model_dump(exclude_none=True)
+        if changes:
+            rows.append({"id": operations[index].id, **{
+                TASK_UPDATE_COLUMNS[field]: value for field, value in changes.items()
+            }})
+    if rows:
+        await db.execute(update(Task), rows)
+    if updates:
+        updated = {
+            task.id: task
+            for task in (await db.scalars(
+                select(Task)
+                .where(Task.id.in_([operations[index].id for index in updates]))
+                .execution_options(populate_existing=True)
+            ))
+        }
+        for index in updates:
+            task = updated[operations[index].id]
+            results[index] = TaskBatchResult(
+                index=index, op="update", id=task.id, status="ok",
+                task=TaskResponse.model_validate(task)
+            )
+    
+    if deletes:
+        await db.execute(
+            delete(Task).where(Task.id.in_([operations[index].id for index in deletes])),
+            execution_options={"synchronize_session": False}
+        )
+        for index in deletes:
+            results[index] = TaskBatchResult(index=index, op="delete", id=operations[index].id, status="ok")
+    
+    if creates or rows or deletes:
+        mark_reports_dirty(db, project_ids=[project_id])
+    await db.commit()
+    return TaskBatchResponse(results=results)
+
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: str,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_task_access(task_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await load_task(task_id, access)
     if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
     if task_update.title is not None:
         task.title = task_update.title
@@ -114,23 +409,20 @@ async def update_task(
     if task_update.tags is not None:
         task.tags = task_update.tags
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return task
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
     task_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_task_access(task_id, current_user.id, db):
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await load_task(task_id, access)
     if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+        raise HTTPException(status_code=403, detail="Access denied")
     
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return {"message": "Task deleted successfully"}
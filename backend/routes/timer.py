@@ -1,72 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from backend.database import get_db
-from backend.models import ActiveTimer, TimeEntry, User, Task
-from backend.dependencies import get_current_active_user
-from backend.utils.permissions import verify_task_access
-from pydantic import BaseModel
+from backend.database import get_async_db
+from backend.models import ActiveTimer, TimeEntry, Task, Project
+from backend.dependencies import get_access_context
+from backend.utils.permissions import AccessContext, load_task, verify_task_access
+from backend.time_rollups import record_time
+from backend.utils.pagination import PageParams, fetch_page
+from backend.utils.datetimes import UTCDateTime
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 router = APIRouter(prefix="/api/timer", tags=["timer"])
 
 class TimerResponse(BaseModel):
     id: str
-    taskId: str
-    startTime: datetime
-    createdAt: datetime
+    taskId: str = Field(validation_alias="task_id")
+    startTime: datetime = Field(validation_alias="start_time")
+    createdAt: datetime = Field(validation_alias="created_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 class TimeEntryCreate(BaseModel):
     taskId: str
-    startTime: datetime
-    endTime: datetime | None = None
+    startTime: UTCDateTime
+    endTime: UTCDateTime | None = None
     duration: int
     description: str | None = None
 
 class TimeEntryResponse(BaseModel):
     id: str
-    taskId: str
-    startTime: datetime
-    endTime: datetime | None
+    taskId: str = Field(validation_alias="task_id")
+    startTime: datetime = Field(validation_alias="start_time")
+    endTime: datetime | None = Field(validation_alias="end_time")
     duration: int
     description: str | None
-    createdAt: datetime
+    createdAt: datetime = Field(validation_alias="created_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 @router.get("/active", response_model=TimerResponse | None)
 async def get_active_timer(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Get user's workspaces
-    from backend.utils.permissions import get_user_workspace_ids, get_user_space_ids
-    from backend.models import Project
-    user_workspaces = get_user_workspace_ids(current_user.id, db)
-    user_spaces = get_user_space_ids(current_user.id, db)
+    user_workspaces = await access.workspace_ids()
+    user_spaces = await access.space_ids()
     
     # Get active timer for user's tasks via project workspace
-    active_timer = db.query(ActiveTimer).join(Task).join(Project).filter(
+    result = await db.execute(select(ActiveTimer).join(Task).join(Project).where(
         (Project.workspace_id.in_(user_workspaces)) | (Project.space_id.in_(user_spaces))
-    ).first()
+    ).limit(1))
     
-    return active_timer
+    return result.scalars().first()
 
 @router.post("/start/{task_id}", response_model=TimerResponse)
 async def start_timer(
     task_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_task_access(task_id, current_user.id, db):
+    if not await verify_task_access(task_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Check if timer already running
-    existing = db.query(ActiveTimer).filter(ActiveTimer.task_id == task_id).first()
+    result = await db.execute(select(ActiveTimer).where(ActiveTimer.task_id == task_id).limit(1))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Timer already running for this task")
     
@@ -75,21 +80,23 @@ async def start_timer(
         start_time=datetime.utcnow()
     )
     db.add(new_timer)
-    db.commit()
-    db.refresh(new_timer)
+    await db.commit()
+    await db.refresh(new_timer)
     
     return new_timer
 
 @router.post("/stop/{task_id}")
 async def stop_timer(
     task_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_task_access(task_id, current_user.id, db):
+    task = await load_task(task_id, access)
+    if not task:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    timer = db.query(ActiveTimer).filter(ActiveTimer.task_id == task_id).first()
+    result = await db.execute(select(ActiveTimer).where(ActiveTimer.task_id == task_id).limit(1))
+    timer = result.scalars().first()
     if not timer:
         raise HTTPException(status_code=404, detail="No active timer found")
     
@@ -104,32 +111,35 @@ async def stop_timer(
         duration=duration
     )
     db.add(time_entry)
+    await record_time(db, task_id, task.project_id, timer.start_time, duration)
     
     # Delete active timer
-    db.delete(timer)
-    db.commit()
+    await db.delete(timer)
+    await db.commit()
     
     return {"message": "Timer stopped", "duration": duration}
 
 @router.get("/entries/{task_id}", response_model=List[TimeEntryResponse])
 async def get_task_time_entries(
     task_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_task_access(task_id, current_user.id, db):
+    if not await verify_task_access(task_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    entries = db.query(TimeEntry).filter(TimeEntry.task_id == task_id).all()
-    return entries
+    return await fetch_page(db, select(TimeEntry).where(TimeEntry.task_id == task_id), TimeEntry, page, response)
 
 @router.post("/entries", response_model=TimeEntryResponse)
 async def create_time_entry(
     entry: TimeEntryCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_task_access(entry.taskId, current_user.id, db):
+    task = await load_task(entry.taskId, access)
+    if not task:
         raise HTTPException(status_code=403, detail="Access denied")
     
     new_entry = TimeEntry(
@@ -140,7 +150,8 @@ async def create_time_entry(
         description=entry.description
     )
     db.add(new_entry)
-    db.commit()
-    db.refresh(new_entry)
+    await record_time(db, entry.taskId, task.project_id, entry.startTime, entry.duration)
+    await db.commit()
+    await db.refresh(new_entry)
     
     return new_entry
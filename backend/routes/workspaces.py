@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 from typing import List
-from backend.database import get_db
-from backend.models import Workspace, Membership, User, Space
-from backend.dependencies import get_current_active_user
-from backend.utils.permissions import get_user_workspace_ids, verify_workspace_access
-from pydantic import BaseModel
+from backend.database import get_async_db, get_sessionmaker
+from backend.models import Workspace, Membership, Space
+from backend.principal_cache import Principal
+from backend.dependencies import get_current_active_user, get_access_context
+from backend.utils.permissions import AccessContext, verify_workspace_access
+from backend.utils.pagination import PageParams, fetch_page
+from backend.workspace_export import iter_export
+from pydantic import BaseModel, Field
 from datetime import datetime
 import uuid
 
@@ -22,56 +28,59 @@ class WorkspaceUpdate(BaseModel):
 
 class WorkspaceResponse(BaseModel):
     id: str
-    spaceId: str
+    spaceId: str = Field(validation_alias="space_id")
     name: str
-    description: str | None
-    createdAt: datetime
-    updatedAt: datetime
+    description: str | None = None
+    createdAt: datetime = Field(validation_alias="created_at")
+    updatedAt: datetime = Field(validation_alias="updated_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 class MembershipResponse(BaseModel):
     id: str
-    workspaceId: str
-    userId: str
+    workspaceId: str = Field(validation_alias="workspace_id")
+    userId: str = Field(validation_alias="user_id")
     role: str
-    createdAt: datetime
+    createdAt: datetime = Field(validation_alias="created_at")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 @router.get("/", response_model=List[WorkspaceResponse])
 async def get_workspaces(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    workspace_ids = get_user_workspace_ids(current_user.id, db)
-    workspaces = db.query(Workspace).filter(Workspace.id.in_(workspace_ids)).all()
-    return workspaces
+    workspace_ids = await access.workspace_ids()
+    result = await db.execute(select(Workspace).where(Workspace.id.in_(workspace_ids)))
+    return result.scalars().all()
 
 @router.post("/", response_model=WorkspaceResponse)
 async def create_workspace(
     workspace: WorkspaceCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify user owns the space
-    space = db.query(Space).filter(
+    result = await db.execute(select(Space).where(
         Space.id == workspace.spaceId,
         Space.owner_id == current_user.id
-    ).first()
+    ))
+    space = result.scalars().first()
     
     if not space:
         raise HTTPException(status_code=403, detail="Access denied to space")
     
+    # Workspace has no description column yet, so it isn't persisted
     new_workspace = Workspace(
         space_id=workspace.spaceId,
-        name=workspace.name,
-        description=workspace.description
+        name=workspace.name
     )
     db.add(new_workspace)
-    db.flush()
+    await db.flush()
     
     # Create membership for creator
     membership = Membership(
@@ -80,21 +89,21 @@ async def create_workspace(
         role='admin'
     )
     db.add(membership)
-    db.commit()
-    db.refresh(new_workspace)
+    await db.commit()
+    await db.refresh(new_workspace)
     
     return new_workspace
 
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
 async def get_workspace(
     workspace_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_workspace_access(workspace_id, current_user.id, db):
+    if not await verify_workspace_access(workspace_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
     
@@ -104,13 +113,13 @@ async def get_workspace(
 async def update_workspace(
     workspace_id: str,
     workspace_update: WorkspaceUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_workspace_access(workspace_id, current_user.id, db):
+    if not await verify_workspace_access(workspace_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
     
@@ -119,20 +128,43 @@ async def update_workspace(
     if workspace_update.description is not None:
         workspace.description = workspace_update.description
     
-    db.commit()
-    db.refresh(workspace)
+    await db.commit()
+    await db.refresh(workspace)
     return workspace
 
 @router.get("/{workspace_id}/members", response_model=List[MembershipResponse])
 async def get_workspace_members(
     workspace_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(),
+    access: AccessContext = Depends(get_access_context),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not verify_workspace_access(workspace_id, current_user.id, db):
+    if not await verify_workspace_access(workspace_id, access):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    members = db.query(Membership).filter(
+    return await fetch_page(db, select(Membership).where(
         Membership.workspace_id == workspace_id
-    ).all()
-    return members
+    ), Membership, page, response)
+
+@router.get("/{workspace_id}/export")
+async def export_workspace(
+    workspace_id: str,
+    access: AccessContext = Depends(get_access_context),
+    sessions: sessionmaker = Depends(get_sessionmaker)
+):
+    if await access.role_in(workspace_id) not in ("owner", "admin"):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    def stream():
+        # Sync generator: Starlette runs it in a worker thread, and the
+        # session lives exactly as long as the stream
+        with sessions() as db:
+            yield from iter_export(db, workspace_id)
+    
+    filename = f"workspace-{workspace_id}-{datetime.utcnow():%Y%m%d%H%M%S}.tar.gz"
+    return StreamingResponse(
+        stream(),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,77 @@
+"""
+Full-text search over note titles/content and task titles/descriptions.
+
+On Postgres each table has a generated, weighted ``search_vector`` column
+(title A, body B) with a GIN index, matched with ``websearch_to_tsquery``
+and ranked with ``ts_rank``. On SQLite (tests) the same query runs against
+FTS5 tables ranked with ``bm25``. Both indexes are kept current by the
+database on write, see the DDL at the bottom of ``backend.models``.
+
+Access rules are applied inside each branch (``note_filter`` /
+``project_filter``), so only visible matches are ranked and counted
+towards a page.
+"""
+
+from sqlalchemy import Float, String, func, literal, literal_column, select, union_all
+from sqlalchemy.sql import column, table
+from backend.models import Note, Project, SEARCH_CONFIG, SEARCH_COLUMNS, Task
+from backend.utils.permissions import AccessContext
+import re
+
+SEARCH_KINDS = ("note", "task")
+
+def fts5_query(q: str) -> str:
+    """Quote every term so user input can't use FTS5 query syntax; terms are ANDed"""
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{term}"' for term in terms)
+
+def _fts_table(name: str):
+    return table(f"{name}_fts", column("rowid"), *(column(c) for c in SEARCH_COLUMNS[name]))
+
+def _postgresql_branches(q: str, access: AccessContext) -> dict:
+    query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    note_vector = literal_column("notes.search_vector")
+    task_vector = literal_column("tasks.search_vector")
+    return {
+        "note": select(
+            literal("note", String).label("kind"), Note.id, Note.title, Note.project_id,
+            Note.updated_at, func.ts_rank(note_vector, query).label("rank")
+        ).where(note_vector.op("@@")(query), access.note_filter()),
+        "task": select(
+            literal("task", String).label("kind"), Task.id, Task.title, Task.project_id,
+            Task.updated_at, func.ts_rank(task_vector, query).label("rank")
+        ).join(Project, Project.id == Task.project_id).where(
+            task_vector.op("@@")(query), access.project_filter()
+        ),
+    }
+
+def _sqlite_branches(q: str, access: AccessContext) -> dict:
+    match = fts5_query(q)
+    notes_fts, tasks_fts = _fts_table("notes"), _fts_table("tasks")
+    # bm25() is lower for better matches; negated so both dialects sort rank DESC
+    return {
+        "note": select(
+            literal("note", String).label("kind"), Note.id, Note.title, Note.project_id,
+            Note.updated_at, (-func.bm25(literal_column("notes_fts"), 2.0, 1.0, type_=Float)).label("rank")
+        ).select_from(notes_fts).join(Note, literal_column("notes.rowid") == notes_fts.c.rowid).where(
+            literal_column("notes_fts").op("MATCH")(match), access.note_filter()
+        ),
+        "task": select(
+            literal("task", String).label("kind"), Task.id, Task.title, Task.project_id,
+            Task.updated_at, (-func.bm25(literal_column("tasks_fts"), 2.0, 1.0, type_=Float)).label("rank")
+        ).select_from(tasks_fts).join(Task, literal_column("tasks.rowid") == tasks_fts.c.rowid).join(
+            Project, Project.id == Task.project_id
+        ).where(
+            literal_column("tasks_fts").op("MATCH")(match), access.project_filter()
+        ),
+    }
+
+def search_query(dialect: str, q: str, access: AccessContext, kinds=SEARCH_KINDS):
+    """Ranked union of visible matches; call access.load() first"""
+    if dialect == "postgresql":
+        branches = _postgresql_branches(q, access)
+    else:
+        branches = _sqlite_branches(q, access)
+    selected = [branches[kind] for kind in kinds]
+    results = union_all(*selected).subquery() if len(selected) > 1 else selected[0].subquery()
+    return select(results).order_by(results.c.rank.desc(), results.c.kind, results.c.id)
@@ -1 +1,4 @@
 # Celery tasks module
+
+# Workers write tasks, time and rollups; register the report cache invalidation
+import backend.report_cache  # noqa: F401
@@ -0,0 +1,277 @@
+"""
+Bulk task import from CSV or JSON uploads.
+
+The upload is parsed incrementally (csv.DictReader, or a streaming decoder
+for JSON arrays / JSON Lines), every row is validated with ``TaskCreate``
+and valid rows are inserted ``IMPORT_CHUNK_SIZE`` at a time with one
+executemany INSERT per chunk, so memory is bounded by the chunk size.
+
+After each committed chunk a checkpoint next to the upload records how
+many rows are done. A retried or resumed run starts from there, and task
+ids are derived from the import id and row number, so a chunk that was
+committed just before a crash is recognised and skipped, not inserted
+twice.
+
+Assignee and note ids are checked against the project's space/workspace
+before each INSERT; rows with unknown references fail individually. Row
+errors (up to IMPORT_MAX_ERRORS) are kept in the checkpoint, so a resumed
+run still reports the ones found earlier.
+
+The API writes the upload, manifest and checkpoint to IMPORT_UPLOAD_DIR and
+the worker reads them from there, so the directory must be the same shared
+filesystem (e.g. one volume mounted into both) on the API and every Celery
+worker. Both check at startup that it is writable, and a worker that can't
+find an upload fails the import with an error naming the directory.
+"""
+
+from backend.celery_app import celery_app
+from backend.database import SessionLocal
+from backend.models import Membership, Note, Project, Space, Task
+from backend.report_cache import mark_reports_dirty
+from backend.routes.tasks import TaskCreate
+from celery.signals import worker_init
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select, union
+from sqlalchemy.exc import OperationalError
+from typing import IO, Iterator
+import csv
+import json
+import os
+import re
+import uuid
+
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", "/tmp/task-imports")
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_ERRORS = 100
+
+_WHITESPACE = re.compile(r"[\s,]*")
+
+def upload_path(import_id: str, suffix: str) -> str:
+    return os.path.join(IMPORT_UPLOAD_DIR, f"{import_id}.{suffix}")
+
+def check_upload_dir():
+    """Create IMPORT_UPLOAD_DIR if needed and fail unless it is writable"""
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+    if not os.access(IMPORT_UPLOAD_DIR, os.W_OK | os.X_OK):
+        raise RuntimeError(f"IMPORT_UPLOAD_DIR {IMPORT_UPLOAD_DIR} is not writable")
+
+@worker_init.connect
+def _check_upload_dir_on_worker_start(**kwargs):
+    check_upload_dir()
+
+def read_manifest(import_id: str) -> dict | None:
+    """Who started an import, for which project, and its current Celery job id"""
+    try:
+        with open(upload_path(import_id, "meta.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_manifest(import_id: str, manifest: dict):
+    with open(upload_path(import_id, "meta.json"), "w") as f:
+        json.dump(manifest, f)
+
+def read_checkpoint(import_id: str) -> dict:
+    try:
+        with open(upload_path(import_id, "checkpoint")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"row": 0, "imported": 0, "failed": 0, "errors": []}
+
+def _write_checkpoint(import_id: str, checkpoint: dict):
+    path = upload_path(import_id, "checkpoint")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+def iter_json_items(stream: IO[str], read_size: int = 1 << 16) -> Iterator:
+    """
+    Yield the items of a top-level JSON array, or the values of a JSON Lines
+    file, while holding at most one read buffer plus one item in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    in_array = None
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if in_array is None and pos < len(buffer):
+            in_array = buffer[pos] == "["
+            pos += in_array
+            continue
+        if in_array and buffer.startswith("]", pos):
+            return
+        if pos < len(buffer):
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+                yield item
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            if in_array:
+                raise ValueError("Unterminated JSON array")
+            return
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+def iter_csv_items(stream: IO[str]) -> Iterator[dict]:
+    """CSV rows keyed by TaskCreate field names; empty cells are dropped, tags split on ; or ,"""
+    for row in csv.DictReader(stream):
+        item = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        if "tags" in item:
+            item["tags"] = [tag.strip() for tag in re.split(r"[;,]", item["tags"]) if tag.strip()]
+        yield item
+
+def iter_import_items(path: str, file_format: str) -> Iterator:
+    with open(path, newline="", encoding="utf-8-sig") as stream:
+        if file_format == "csv":
+            yield from iter_csv_items(stream)
+        else:
+            yield from iter_json_items(stream)
+
+def _reference_errors(db, project: Project, chunk: list[tuple[int, dict]]) -> dict[int, str]:
+    """
+    Rows whose assignee or note is outside the project's space/workspace, by
+    row number. Checked per chunk so one bad reference fails its row rather
+    than the INSERT (and with it every retry of the job).
+    """
+    assignee_ids = {row["assignee_id"] for _, row in chunk if row["assignee_id"]}
+    note_ids = {row["note_id"] for _, row in chunk if row["note_id"]}
+    members, notes = set(), set()
+    if assignee_ids:
+        candidates = []
+        if project.space_id:
+            candidates.append(select(Space.owner_id).where(
+                Space.id == project.space_id, Space.owner_id.in_(assignee_ids)
+            ))
+        if project.workspace_id:
+            candidates.append(select(Membership.user_id).where(
+                Membership.workspace_id == project.workspace_id, Membership.user_id.in_(assignee_ids)
+            ))
+        if candidates:
+            members = set(db.scalars(union(*candidates)))
+    if note_ids:
+        scope = [Note.project_id == project.id]
+        if project.space_id:
+            scope.append(Note.space_id == project.space_id)
+        if project.workspace_id:
+            scope.append(Note.workspace_id == project.workspace_id)
+        notes = set(db.scalars(select(Note.id).where(Note.id.in_(note_ids), or_(*scope))))
+
+    errors = {}
+    for row_number, row in chunk:
+        if row["assignee_id"] and row["assignee_id"] not in members:
+            errors[row_number] = "Assignee is not a member of the project's space or workspace"
+        elif row["note_id"] and row["note_id"] not in notes:
+            errors[row_number] = "Note not found in the project's space or workspace"
+    return errors
+
+def _flush(db, project: Project, chunk: list[tuple[int, dict]], checkpoint: dict) -> int:
+    """
+    Insert a chunk of (row number, row), skipping rows a previous attempt
+    already committed; rows with invalid references are recorded as errors
+    """
+    if not chunk:
+        return 0
+    invalid = _reference_errors(db, project, chunk)
+    for row_number, error in invalid.items():
+        _record_error(checkpoint, row_number, error)
+    rows = [row for row_number, row in chunk if row_number not in invalid]
+    if not rows:
+        return 0
+    existing = set(db.scalars(select(Task.id).where(Task.id.in_([row["id"] for row in rows]))))
+    rows = [row for row in rows if row["id"] not in existing]
+    if rows:
+        db.execute(insert(Task), rows)
+        mark_reports_dirty(db, project_ids=[project.id])
+    return len(rows)
+
+def _record_error(checkpoint: dict, row_number: int, error: str):
+    checkpoint["failed"] += 1
+    if len(checkpoint["errors"]) < IMPORT_MAX_ERRORS:
+        checkpoint["errors"].append({"row": row_number, "error": error})
+
+def run_import(db, import_id: str, project_id: str, file_format: str,
+               chunk_size: int = IMPORT_CHUNK_SIZE, progress=None) -> dict:
+    """
+    Import an uploaded file into a project, resuming from its checkpoint.
+    progress(checkpoint) is called after every committed chunk.
+    """
+    checkpoint = read_checkpoint(import_id)
+    # Checkpoints written before errors were kept in them
+    checkpoint.setdefault("errors", [])
+    project = db.get(Project, project_id)
+    chunk = []
+    row_number = checkpoint["row"]
+    namespace = uuid.UUID(import_id)
+
+    path = upload_path(import_id, file_format)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Upload for import {import_id} not found at {path}; IMPORT_UPLOAD_DIR must be "
+            "a directory shared by the API and the Celery workers"
+        )
+    items = iter_import_items(path, file_format)
+    for row_number, item in enumerate(items, start=1):
+        if row_number <= checkpoint["row"]:
+            continue
+        try:
+            task = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            _record_error(checkpoint, row_number, e.errors(include_url=False)[0]["msg"])
+        else:
+            chunk.append((row_number, {
+                "id": str(uuid.uuid5(namespace, str(row_number))),
+                "project_id": project_id,
+                "note_id": task.noteId,
+                "title": task.title,
+                "description": task.description,
+                "status": task.status,
+                "priority": task.priority,
+                "assignee_id": task.assigneeId,
+                "due_date": task.dueDate,
+                "tags": task.tags,
+            }))
+        if row_number % chunk_size == 0:
+            checkpoint["imported"] += _flush(db, project, chunk, checkpoint)
+            db.commit()
+            checkpoint["row"] = row_number
+            _write_checkpoint(import_id, checkpoint)
+            chunk = []
+            if progress:
+                progress({**checkpoint, "errors": list(checkpoint["errors"])})
+
+    checkpoint["imported"] += _flush(db, project, chunk, checkpoint)
+    db.commit()
+    checkpoint["row"] = max(row_number, checkpoint["row"])
+    _write_checkpoint(import_id, checkpoint)
+    return checkpoint
+
+@celery_app.task(
+    bind=True,
+    name="backend.tasks.import_tasks.import_tasks",
+    max_retries=3,
+    default_retry_delay=10,
+)
+def import_tasks(self, import_id: str, project_id: str, file_format: str):
+    """
+    Import an uploaded task file; progress is published as PROGRESS state
+    with the checkpoint as meta. Database errors retry from the last chunk.
+    """
+    db = SessionLocal()
+    try:
+        def report(checkpoint):
+            self.update_state(state="PROGRESS", meta=checkpoint)
+        result = run_import(db, import_id, project_id, file_format, progress=report)
+        # The manifest stays so the outcome can still be looked up
+        for suffix in (file_format, "checkpoint"):
+            os.remove(upload_path(import_id, suffix))
+        return result
+    except OperationalError as e:
+        db.rollback()
+        raise self.retry(exc=e)
+    finally:
+        db.close()
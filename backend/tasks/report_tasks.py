@@ -1,60 +1,155 @@
 from backend.celery_app import celery_app
 from backend.database import SessionLocal
-from backend.models import Task, TimeEntry, User, Project
+from backend.models import Membership, Project, Space, Task, TimeRollup, User
+from backend.report_cache import project_scopes, report_versions
+from backend.report_snapshots import PRODUCTIVITY, save_snapshots
+from backend.time_rollups import rebuild_rollups, task_id_batches
+from celery import chord, group
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import distinct, func, select, union
+import logging
+import os
+import time
+
+ROLLUP_REBUILD_BATCH_SIZE = int(os.getenv("ROLLUP_REBUILD_BATCH_SIZE", "500"))
+WEEKLY_REPORT_CHUNK_SIZE = int(os.getenv("WEEKLY_REPORT_CHUNK_SIZE", "1000"))
+WEEKLY_REPORT_DAYS = 7
+
+logger = logging.getLogger(__name__)
 
 @celery_app.task(name="backend.tasks.report_tasks.generate_weekly_reports")
 def generate_weekly_reports():
     """
-    Generate weekly productivity reports for all users
+    Generate weekly productivity reports for all users and store them as
+    report snapshots, which GET /api/reports/productivity?days=7 serves
+    while they are fresh. Active user ids are
+    streamed once to cut them into id ranges of WEEKLY_REPORT_CHUNK_SIZE;
+    each range is a weekly_report_chunk task, run as a chord whose callback
+    summarizes the run.
     """
+    period_end = datetime.utcnow()
+    period_start = period_end - timedelta(days=WEEKLY_REPORT_DAYS)
     db = SessionLocal()
     try:
-        users = db.query(User).filter(User.subscription_status == 'active').all()
-        reports_generated = 0
-        
-        for user in users:
-            # Generate report for this user
-            report = generate_user_weekly_report(user.id, db)
-            if report:
-                reports_generated += 1
-        
-        return {"reports_generated": reports_generated}
+        ranges = []
+        after_id = ""
+        user_ids = db.execute(
+            select(User.id).where(User.subscription_status == 'active').order_by(User.id)
+            .execution_options(yield_per=WEEKLY_REPORT_CHUNK_SIZE)
+        ).scalars()
+        for partition in user_ids.partitions():
+            ranges.append((after_id, partition[-1]))
+            after_id = partition[-1]
+    finally:
+        db.close()
+    
+    if not ranges:
+        return summarize_weekly_reports([], period_end.isoformat())
+    
+    header = group(
+        weekly_report_chunk.s(after_id, last_id, period_start.isoformat(), period_end.isoformat())
+        for after_id, last_id in ranges
+    )
+    result = chord(header)(summarize_weekly_reports.s(period_end.isoformat()))
+    return {"chunks": len(ranges), "summary_task_id": result.id}
+
+@celery_app.task(name="backend.tasks.report_tasks.weekly_report_chunk")
+def weekly_report_chunk(after_id: str, last_id: str, period_start: str, period_end: str):
+    """Weekly reports for the active users with after_id < id <= last_id, stored as snapshots"""
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        user_ids = select(User.id).where(
+            User.subscription_status == 'active', User.id > after_id, User.id <= last_id
+        )
+        start, end = datetime.fromisoformat(period_start), datetime.fromisoformat(period_end)
+        # Versions are read first: a write landing while the reports are
+        # computed makes the snapshot stale rather than wrongly current
+        versions = report_versions(user_report_scopes(db, user_ids))
+        reports = productivity_reports(db, user_ids, start)
+        save_snapshots(db, PRODUCTIVITY, start, end, reports, versions)
+        db.commit()
+        return {
+            "reports_generated": len(reports),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
     finally:
         db.close()
 
-def generate_user_weekly_report(user_id: str, db):
+@celery_app.task(name="backend.tasks.report_tasks.summarize_weekly_reports")
+def summarize_weekly_reports(results: list[dict], dispatched_at: str):
+    """Chord callback: totals over every chunk of a weekly report run"""
+    durations = [result["duration_ms"] for result in results]
+    summary = {
+        "reports_generated": sum(result["reports_generated"] for result in results),
+        "chunks": len(results),
+        "chunk_duration_ms_total": round(sum(durations), 1),
+        "chunk_duration_ms_max": max(durations, default=0),
+        "duration_s": round((datetime.utcnow() - datetime.fromisoformat(dispatched_at)).total_seconds(), 1),
+    }
+    logger.info("Weekly reports: %s", summary)
+    return summary
+
+def user_report_scopes(db, user_ids) -> dict[str, list[str]]:
+    """report_scopes of every user selected by the user_ids subquery"""
+    scopes = {user_id: [] for (user_id,) in _stream(db, user_ids)}
+    for user_id, workspace_id in _stream(db, select(Membership.user_id, Membership.workspace_id).where(
+        Membership.user_id.in_(user_ids)
+    )):
+        scopes[user_id].extend(project_scopes(workspace_id, None))
+    for user_id, space_id in _stream(db, select(Space.owner_id, Space.id).where(Space.owner_id.in_(user_ids))):
+        scopes[user_id].extend(project_scopes(None, space_id))
+    return scopes
+
+def productivity_reports(db, user_ids, period_start: datetime) -> dict[str, dict]:
     """
-    Generate weekly report for a specific user
+    The productivity report (see backend.routes.reports.productivity_report)
+    of every user selected by the user_ids subquery, from three grouped
+    queries over the projects each user can access.
     """
-    week_ago = datetime.utcnow() - timedelta(days=7)
+    reports = {}
+    for (user_id,) in _stream(db, user_ids):
+        reports[user_id] = {"completedTasks": 0, "totalTimeMinutes": 0, "activeProjects": 0}
+    
+    # Same access rule as project_access_clause: owned spaces and workspace
+    # memberships. UNION, so a project reachable both ways counts once
+    accessible = union(
+        select(Space.owner_id.label("user_id"), Project.id.label("project_id"), Project.status)
+        .join(Project, Project.space_id == Space.id)
+        .where(Space.owner_id.in_(user_ids)),
+        select(Membership.user_id, Project.id, Project.status)
+        .join(Project, Project.workspace_id == Membership.workspace_id)
+        .where(Membership.user_id.in_(user_ids)),
+    ).subquery()
     
-    # Get completed tasks
-    completed_tasks = db.query(Task).filter(
-        Task.assignee_id == user_id,
+    completed = select(accessible.c.user_id, func.count(Task.id)).join(
+        Task, Task.project_id == accessible.c.project_id
+    ).where(
         Task.status == 'done',
-        Task.updated_at >= week_ago
-    ).count()
+        Task.updated_at >= period_start
+    ).group_by(accessible.c.user_id)
+    for user_id, count in _stream(db, completed):
+        reports[user_id]["completedTasks"] = count
     
-    # Get time entries
-    time_entries = db.query(func.sum(TimeEntry.duration)).filter(
-        TimeEntry.start_time >= week_ago
-    ).scalar() or 0
+    # From the daily rollups, so whole UTC days like the live report
+    tracked = select(accessible.c.user_id, func.sum(TimeRollup.seconds)).join(
+        TimeRollup, TimeRollup.project_id == accessible.c.project_id
+    ).where(
+        TimeRollup.day >= period_start.date()
+    ).group_by(accessible.c.user_id)
+    for user_id, seconds in _stream(db, tracked):
+        reports[user_id]["totalTimeMinutes"] = int(seconds or 0) // 60
     
-    # Get active projects
-    active_projects = db.query(Project).filter(
-        Project.status == 'active'
-    ).count()
+    projects = select(
+        accessible.c.user_id, func.count(distinct(accessible.c.project_id))
+    ).where(accessible.c.status == 'active').group_by(accessible.c.user_id)
+    for user_id, count in _stream(db, projects):
+        reports[user_id]["activeProjects"] = count
     
-    return {
-        "user_id": user_id,
-        "period_start": week_ago.isoformat(),
-        "period_end": datetime.utcnow().isoformat(),
-        "completed_tasks": completed_tasks,
-        "total_time_minutes": time_entries,
-        "active_projects": active_projects
-    }
+    return reports
+
+def _stream(db, query):
+    return db.execute(query.execution_options(yield_per=WEEKLY_REPORT_CHUNK_SIZE))
 
 @celery_app.task(name="backend.tasks.report_tasks.generate_project_analytics")
 def generate_project_analytics(project_id: str):
@@ -82,3 +177,25 @@ def generate_project_analytics(project_id: str):
         }
     finally:
         db.close()
+
+@celery_app.task(name="backend.tasks.report_tasks.rebuild_time_rollups")
+def rebuild_time_rollups(task_ids: list[str] | None = None, batch_size: int = ROLLUP_REBUILD_BATCH_SIZE):
+    """
+    Backfill or repair the daily time rollups from the time entries, for
+    the given tasks or all of them. Each batch of tasks is rebuilt and
+    committed on its own, so the job can be stopped and rerun safely.
+    """
+    db = SessionLocal()
+    try:
+        rebuilt_tasks = rollup_rows = 0
+        if task_ids:
+            batches = (task_ids[i:i + batch_size] for i in range(0, len(task_ids), batch_size))
+        else:
+            batches = task_id_batches(db, batch_size)
+        for batch in batches:
+            rollup_rows += rebuild_rollups(db, batch)
+            db.commit()
+            rebuilt_tasks += len(batch)
+        return {"tasks": rebuilt_tasks, "rollups": rollup_rows}
+    finally:
+        db.close()
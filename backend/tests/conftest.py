@@ -1,9 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from backend.main import app
-from backend.database import Base, get_db
+from backend.database import Base, get_db, get_async_db, get_sessionmaker, get_async_sessionmaker
 from backend.models import User
 import os
 
@@ -15,6 +17,15 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async routes share the same SQLite file through aiosqlite. NullPool keeps
+# connections from outliving the event loop of each TestClient.
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db", poolclass=NullPool
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test"""
@@ -35,7 +46,14 @@ def client(db_session):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_sessionmaker] = lambda: TestingSessionLocal
+    app.dependency_overrides[get_async_sessionmaker] = lambda: TestingAsyncSessionLocal
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -68,3 +86,18 @@ def auth_headers(client, test_user):
     )
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def metrics_headers(monkeypatch):
+    """Configure a metrics token and return headers that send it"""
+    from backend import main
+    monkeypatch.setattr(main, "METRICS_TOKEN", "test-metrics-token")
+    return {"Authorization": "Bearer test-metrics-token"}
+
+@pytest.fixture
+def local_acl_tier(monkeypatch):
+    """Let ACL sets and principals use the in-process tier, as with CACHE_SINGLE_PROCESS=1"""
+    from backend import principal_cache
+    from backend.utils import permissions
+    monkeypatch.setattr(principal_cache, "LOCAL_TIER_COHERENT", True)
+    monkeypatch.setattr(permissions, "LOCAL_TIER_COHERENT", True)
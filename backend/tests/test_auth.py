@@ -67,3 +67,38 @@ def test_logout(client, auth_headers):
     """Test logout"""
     response = client.post("/api/auth/logout", headers=auth_headers)
     assert response.status_code == 200
+
+def test_login_rehashes_outdated_hash(client, db_session):
+    """Test that login upgrades a hash created with a different bcrypt cost"""
+    from passlib.hash import bcrypt
+    from backend.models import User
+
+    user = User(
+        email="legacy@example.com",
+        password=bcrypt.using(rounds=4).hash("legacypassword"),
+        subscription_plan="free",
+        subscription_status="active"
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "legacy@example.com", "password": "legacypassword"}
+    )
+    assert response.status_code == 200
+
+    db_session.refresh(user)
+    assert not user.password.startswith("$2b$04$")
+
+def test_login_returns_503_when_hashing_saturated(client, test_user, monkeypatch):
+    """Test that login fails fast when the hashing queue is full"""
+    from backend.utils import passwords
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
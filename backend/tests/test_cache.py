@@ -0,0 +1,135 @@
+import asyncio
+import random
+import time
+from backend.cache import (
+    LocalCache, cached, get_cached, set_cached, delete_cached, local_cache, refresh_early
+)
+
+def test_local_cache_evicts_least_recently_used():
+    """Test that the LRU drops the entry used longest ago"""
+    cache = LocalCache(max_entries=2)
+    cache.set("a", 1, 30)
+    cache.set("b", 2, 30)
+    cache.get("a")
+    cache.set("c", 3, 30)
+
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("b") != 2
+
+def test_local_cache_expires_entries(monkeypatch):
+    """Test that entries are not served past their TTL"""
+    cache = LocalCache(max_entries=10)
+    cache.set("a", 1, 5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+
+    assert cache.get("a") != 1
+    assert cache.stats()["expirations"] == 1
+
+def test_local_tier_serves_without_redis_and_is_invalidated():
+    """Test that local=True values are served from process memory until deleted"""
+    asyncio.run(set_cached("test:local", {"value": 1}, 60, local=True))
+    assert asyncio.run(get_cached("test:local", local=True)) == {"value": 1}
+
+    delete_cached("test:local")
+    assert asyncio.run(get_cached("test:local", local=True)) is None
+    assert local_cache.stats()["hits"] >= 1
+
+def test_metrics_exposes_cache_tiers(client, metrics_headers):
+    """Test that per-tier cache counters are exposed"""
+    response = client.get("/metrics", headers=metrics_headers)
+    assert response.status_code == 200
+    cache = response.json()["cache"]
+    assert "hitRatio" in cache["local"]
+    assert "hitRatio" in cache["redis"]
+
+def test_concurrent_misses_compute_once():
+    """Test that identical concurrent calls share a single computation"""
+    calls = []
+
+    @cached(ttl=60, key_prefix="test")
+    async def slow_report(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.05)
+        return {"user": user_id}
+
+    async def run():
+        return await asyncio.gather(*(slow_report("u1") for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert calls == ["u1"]
+    assert results == [{"user": "u1"}] * 10
+
+def test_refresh_early_more_likely_near_expiry(monkeypatch):
+    """Test that probabilistic early expiration depends on remaining lifetime"""
+    monkeypatch.setattr(random, "random", lambda: 0.5)
+    now = time.time()
+
+    assert not refresh_early({"x": now + 60, "d": 0.5}, beta=1.0)
+    assert refresh_early({"x": now + 0.1, "d": 0.5}, beta=1.0)
+    assert not refresh_early({"x": now + 0.1, "d": 0.5}, beta=0)
+
+def test_invalidation_on_event_loop_uses_async_client(monkeypatch):
+    """Test that delete_cached and invalidate_namespace don't call sync Redis on a running loop"""
+    from backend import cache
+
+    sent = []
+
+    class Pipeline:
+        def __init__(self):
+            self.commands = []
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def __getattr__(self, name):
+            return lambda *args: self.commands.append((name, *args))
+
+        async def execute(self):
+            sent.extend(self.commands)
+
+    class AsyncClient:
+        def pipeline(self, transaction=True):
+            return Pipeline()
+
+    class SyncClient:
+        def __getattr__(self, name):
+            raise AssertionError(f"sync Redis {name}() called on the event loop")
+
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(cache, "redis_client", SyncClient())
+    monkeypatch.setattr(cache, "async_redis_client", AsyncClient())
+
+    async def run():
+        cache.delete_cached("test:a", "test:b")
+        cache.invalidate_namespace("test")
+        await asyncio.gather(*cache._background_invalidations)
+
+    asyncio.run(run())
+    assert ("delete", "test:a", "test:b") in sent
+    assert ("incr", "gen:test") in sent
+    assert [command for command, *_ in sent].count("publish") == 2
+
+def test_scoped_key_follows_scope_generations():
+    """Test that bumping one scope changes the keys covering it and no others"""
+    from backend import cache
+    
+    async def keys():
+        return (
+            await cache.namespaced_key("t", "k", ["space:1", "workspace:2"]),
+            await cache.namespaced_key("t", "k", ["workspace:2"]),
+        )
+    
+    cache.local_cache.set("gen:t:space:1", 1, 30)
+    before = asyncio.run(keys())
+    cache.local_cache.set("gen:t:space:1", 2, 30)
+    after = asyncio.run(keys())
+    assert after[0] != before[0]
+    assert after[1] == before[1]
+    # Scope order doesn't matter
+    assert asyncio.run(cache.namespaced_key("t", "k", ["workspace:2", "space:1"])) == after[0]
@@ -0,0 +1,48 @@
+from datetime import date, datetime, timezone
+import pytest
+from backend import cache_codec
+from backend.cache_codec import JsonCodec, OrjsonCodec, decode, encode
+from backend.principal_cache import Principal
+from backend.routes.projects import ProjectResponse
+
+def make_project(index: int) -> ProjectResponse:
+    now = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    return ProjectResponse(
+        id=f"p{index}", name=f"Project {index}", description=None, color="#6366f1",
+        space_id="s1", workspace_id=None, status="active", created_at=now, updated_at=now
+    )
+
+@pytest.mark.parametrize("codec", [OrjsonCodec(), JsonCodec()], ids=lambda c: c.name)
+def test_round_trips_models_and_datetimes(monkeypatch, codec):
+    """Test that response models and datetimes come back as the same types"""
+    monkeypatch.setattr(cache_codec, "codec", codec)
+    value = {
+        "projects": [make_project(1), make_project(2)],
+        "at": datetime(2024, 5, 1, 8, 0),
+        "day": date(2024, 5, 1),
+    }
+
+    restored = decode(encode(value))
+    assert restored == value
+    assert isinstance(restored["projects"][0], ProjectResponse)
+    assert restored["projects"][0].createdAt.tzinfo is not None
+
+def test_compresses_large_payloads(monkeypatch):
+    """Test that payloads above the threshold are compressed and still decode"""
+    monkeypatch.setattr(cache_codec, "CACHE_COMPRESS_MIN_BYTES", 256)
+    small = Principal(
+        id="u1", email="a@example.com", first_name=None, last_name=None,
+        profile_image_url=None, subscription_plan="free", subscription_status="active"
+    )
+    large = [make_project(i) for i in range(50)]
+
+    assert encode(small)[:1] == b"\x00"
+    payload = encode(large)
+    assert payload[:1] == b"\x01"
+    assert len(payload) < len(cache_codec.codec.dumps(large))
+    assert decode(payload) == large
+
+def test_rejects_unknown_payloads():
+    """Test that foreign payloads are reported instead of misread"""
+    with pytest.raises(ValueError):
+        decode(b"\x07garbage")
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from backend.db_metrics import InstrumentedQueuePool, instrument_engine, pool_stats, query_stats
+
+def test_pool_stats_report_starvation():
+    """Test that checkouts, waits and timeouts show up in pool stats"""
+    engine = create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    stats = pool_stats(engine.pool)
+    assert stats["checkedOut"] == 1
+    assert stats["checkoutTimeouts"] == 1
+    assert stats["waitMs"]["count"] == 2
+    assert stats["waitMs"]["maxMs"] >= 50
+    held.close()
+
+def test_query_timing_recorded():
+    """Test that executed statements are timed"""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = query_stats()["durationMs"]["count"]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert query_stats()["durationMs"]["count"] == before + 1
+
+def test_metrics_exposes_database_stats(client, metrics_headers):
+    """Test that pool and query stats are exposed"""
+    response = client.get("/metrics", headers=metrics_headers)
+    assert response.status_code == 200
+    assert "async" in response.json()["database"]["pool"]
+
+def test_metrics_requires_token(client, metrics_headers, monkeypatch):
+    """Test that /metrics rejects callers without the token, and is off when none is configured"""
+    from backend import main
+    
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers=metrics_headers).status_code == 200
+    
+    monkeypatch.setattr(main, "METRICS_TOKEN", "")
+    assert client.get("/metrics", headers=metrics_headers).status_code == 404
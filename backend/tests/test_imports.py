@@ -0,0 +1,114 @@
+import io
+import json
+import uuid
+import pytest
+from backend.tasks import import_tasks
+from backend.tasks.import_tasks import iter_json_items, read_checkpoint, run_import, upload_path
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_tasks, "IMPORT_UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def project(db_session, test_user):
+    from backend.models import Space, Project
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Imports", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    return project
+
+def test_iter_json_items_streams_arrays_and_lines():
+    """Test that items are decoded across read buffer boundaries"""
+    items = [{"title": f"Task {i}", "tags": ["a", "b"]} for i in range(20)]
+    
+    array = io.StringIO(json.dumps(items, indent=2))
+    assert list(iter_json_items(array, read_size=7)) == items
+    
+    lines = io.StringIO("\n".join(json.dumps(item) for item in items) + "\n")
+    assert list(iter_json_items(lines, read_size=5)) == items
+
+def test_run_import_chunks_and_resumes(db_session, upload_dir, project):
+    """Test that invalid rows are reported and a resumed import doesn't duplicate rows"""
+    from backend.models import Task
+    
+    import_id = str(uuid.uuid4())
+    rows = ["title,priority,tags"] + [f"Task {i},high,a;b" for i in range(9)] + [",low,"]
+    with open(upload_path(import_id, "csv"), "w") as f:
+        f.write("\n".join(rows))
+    
+    progress = []
+    result = run_import(db_session, import_id, project.id, "csv", chunk_size=4, progress=progress.append)
+    assert result["imported"] == 9
+    assert result["failed"] == 1
+    assert result["errors"][0]["row"] == 10
+    assert [checkpoint["row"] for checkpoint in progress] == [4, 8]
+    assert db_session.query(Task).filter_by(project_id=project.id).count() == 9
+    assert db_session.query(Task).filter_by(title="Task 0").one().tags == ["a", "b"]
+    
+    # Pretend the run crashed after committing rows 5-8 but before checkpointing them
+    with open(upload_path(import_id, "checkpoint"), "w") as f:
+        json.dump({"row": 4, "imported": 4, "failed": 0}, f)
+    result = run_import(db_session, import_id, project.id, "csv", chunk_size=4)
+    assert result["imported"] == 4
+    assert read_checkpoint(import_id)["row"] == 10
+    assert db_session.query(Task).filter_by(project_id=project.id).count() == 9
+
+def test_run_import_reports_invalid_references(db_session, upload_dir, project, test_user):
+    """Test that unknown assignees and notes fail their rows instead of the chunk"""
+    from backend.models import Task
+    
+    import_id = str(uuid.uuid4())
+    items = [
+        {"title": "Mine", "assigneeId": test_user.id},
+        {"title": "Nobody", "assigneeId": str(uuid.uuid4())},
+        {"title": "No note", "noteId": str(uuid.uuid4())},
+        {"title": "Plain"},
+    ]
+    with open(upload_path(import_id, "json"), "w") as f:
+        f.write("\n".join(json.dumps(item) for item in items))
+    
+    result = run_import(db_session, import_id, project.id, "json", chunk_size=3)
+    assert result["imported"] == 2
+    assert result["failed"] == 2
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert read_checkpoint(import_id)["errors"] == result["errors"]
+    titles = {task.title for task in db_session.query(Task).filter_by(project_id=project.id)}
+    assert titles == {"Mine", "Plain"}
+
+def test_import_endpoint_validates_upload(client, auth_headers, db_session, project):
+    """Test that unsupported files and other users' projects are rejected before queueing"""
+    from backend.models import Space, Project, User
+    
+    response = client.post(
+        f"/api/projects/{project.id}/tasks/import",
+        files={"file": ("tasks.xlsx", b"data")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    
+    other = User(email="other@example.com", subscription_plan="free", subscription_status="active")
+    db_session.add(other)
+    db_session.commit()
+    space = Space(owner_id=other.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    foreign = Project(name="Foreign", space_id=space.id, status="active")
+    db_session.add(foreign)
+    db_session.commit()
+    response = client.post(
+        f"/api/projects/{foreign.id}/tasks/import",
+        files={"file": ("tasks.csv", b"title\nA")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 403
+
+def test_run_import_names_upload_dir_when_upload_missing(db_session, upload_dir, project):
+    """Test that a worker without the upload fails with an error pointing at the shared directory"""
+    import_id = str(uuid.uuid4())
+    with pytest.raises(FileNotFoundError, match="IMPORT_UPLOAD_DIR"):
+        run_import(db_session, import_id, project.id, "csv")
@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import event
+from backend.tests.conftest import async_engine
+
+@pytest.fixture
+def statements():
+    """Capture SQL statements issued by the async routes"""
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+def test_memberships_resolved_once_per_request(client, auth_headers, test_user, db_session, statements, local_acl_tier):
+    """Test that a request checking access twice loads memberships once"""
+    from backend.models import Space, Project
+
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Stats Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+
+    response = client.get(
+        f"/api/reports/tasks/stats?project_id={project.id}",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    membership_queries = [s for s in statements if "FROM memberships" in s]
+    assert len(membership_queries) == 1
+
+def test_project_access_denied_for_other_users_space(client, auth_headers, db_session):
+    """Test that projects in another user's space are rejected"""
+    from backend.models import User, Space, Project
+
+    other = User(email="other@example.com", subscription_plan="free", subscription_status="active")
+    db_session.add(other)
+    db_session.commit()
+    space = Space(owner_id=other.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Private", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+
+    response = client.get(f"/api/projects/{project.id}", headers=auth_headers)
+    assert response.status_code == 403
+
+def test_task_authorized_and_fetched_in_one_statement(client, auth_headers, test_user, db_session, statements):
+    """Test that deleting a task authorizes and loads it with a single SELECT"""
+    from backend.models import Space, Project, Task
+
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    task = Task(project_id=project.id, title="To Delete", status="todo", priority="low")
+    db_session.add(task)
+    db_session.commit()
+
+    response = client.delete(f"/api/tasks/{task.id}", headers=auth_headers)
+    assert response.status_code == 200
+
+    # Up to the DELETE; the report cache looks up the project's scopes after it
+    delete_at = next(i for i, s in enumerate(statements) if s.lstrip().startswith("DELETE"))
+    selects = [
+        s for s in statements[:delete_at]
+        if s.lstrip().startswith("SELECT") and "FROM users" not in s
+    ]
+    assert len(selects) == 1
+
+def test_membership_change_invalidates_acl_cache(client, auth_headers, test_user, db_session, monkeypatch):
+    """Test that creating a workspace drops the creator's cached ACL sets"""
+    from backend.models import Space
+    from backend.utils import permissions
+
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+
+    deleted = []
+    delete_cached = permissions.delete_cached
+
+    def record_delete(*keys):
+        deleted.extend(keys)
+        delete_cached(*keys)
+
+    monkeypatch.setattr(permissions, "delete_cached", record_delete)
+
+    response = client.post(
+        "/api/workspaces/",
+        headers=auth_headers,
+        json={"name": "Team", "spaceId": space.id}
+    )
+    assert response.status_code == 200
+    assert set(permissions.acl_cache_keys(test_user.id)) <= set(deleted)
+
+    response = client.get("/api/workspaces/", headers=auth_headers)
+    assert [w["name"] for w in response.json()] == ["Team"]
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from backend.principal_cache import get_principal, principal_cache_stats
+
+def test_principal_cached_after_first_request(client, auth_headers, test_user, local_acl_tier):
+    """Test that repeated requests are served from the principal cache"""
+    client.get("/api/projects/", headers=auth_headers)
+    assert asyncio.run(get_principal(test_user.id)) is not None
+
+    hits_before = principal_cache_stats()["hits"]
+    client.get("/api/projects/", headers=auth_headers)
+    assert principal_cache_stats()["hits"] > hits_before
+
+def test_user_update_invalidates_principal(client, auth_headers, test_user, db_session, local_acl_tier):
+    """Test that committing a User change drops the cached principal"""
+    response = client.get("/api/projects/", headers=auth_headers)
+    assert response.status_code != 400
+    assert asyncio.run(get_principal(test_user.id)) is not None
+
+    test_user.subscription_status = "canceled"
+    db_session.commit()
+
+    assert asyncio.run(get_principal(test_user.id)) is None
+    response = client.get("/api/projects/", headers=auth_headers)
+    assert response.status_code == 400
+
+def test_principal_cached_briefly_in_process_without_redis(client, auth_headers, test_user):
+    """Test that without Redis, or CACHE_SINGLE_PROCESS, principals stay in process for PRINCIPAL_LOCAL_TTL"""
+    import time
+    from backend.cache import local_cache
+    from backend.principal_cache import LOCAL_TIER_COHERENT, PRINCIPAL_LOCAL_TTL, principal_key
+    if LOCAL_TIER_COHERENT:
+        pytest.skip("Redis or CACHE_SINGLE_PROCESS keeps the local tier coherent")
+
+    client.get("/api/projects/", headers=auth_headers)
+    assert asyncio.run(get_principal(test_user.id)) is not None
+    expires_at, _ = local_cache._entries[principal_key(test_user.id)]
+    assert expires_at - time.monotonic() <= PRINCIPAL_LOCAL_TTL
+
+def test_metrics_exposes_principal_cache(client, metrics_headers):
+    """Test that cache counters are exposed"""
+    response = client.get("/metrics", headers=metrics_headers)
+    assert response.status_code == 200
+    assert "hit_ratio" in response.json()["principalCache"]
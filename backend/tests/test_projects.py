@@ -98,3 +98,31 @@ def test_delete_project(client, auth_headers, test_user, db_session):
     # Verify project is marked as deleted
     db_session.refresh(project)
     assert project.status == "deleted"
+
+def test_project_list_not_modified_skips_loading_rows(client, auth_headers, test_user, db_session):
+    """Test that a matching If-None-Match is answered from the aggregate query alone"""
+    from sqlalchemy import event
+    from backend.models import Space, Project
+    from backend.tests.conftest import async_engine
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    db_session.add(Project(name="Polled", space_id=space.id, status="active"))
+    db_session.commit()
+    
+    etag = client.get("/api/projects/", headers=auth_headers).headers["ETag"]
+    
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/api/projects/", headers={**auth_headers, "If-None-Match": etag})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    
+    assert response.status_code == 304
+    project_queries = [s for s in statements if "FROM projects" in s]
+    assert len(project_queries) == 1
+    assert "count(" in project_queries[0].lower()
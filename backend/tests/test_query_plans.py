@@ -0,0 +1,114 @@
+import re
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from backend.tests.conftest import async_engine
+
+# Tables that grow with usage; a full scan of any of them is a regression
+LARGE_TABLES = ("memberships", "projects", "notes", "tasks", "time_entries", "time_rollups", "report_snapshots", "active_timers")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(LARGE_TABLES)})\b")
+
+@pytest.fixture
+def seeded(db_session, test_user):
+    """The test user's workspace and space, among many other users' rows"""
+    from backend.models import (
+        User, Space, Workspace, Membership, Project, Note, Task, TimeEntry, ActiveTimer
+    )
+
+    def ids(count):
+        return [str(uuid.uuid4()) for _ in range(count)]
+
+    now = datetime(2024, 5, 1)
+    others = ids(200)
+    db_session.execute(insert(User), [
+        {"id": user_id, "email": f"{user_id}@example.com", "subscription_plan": "free",
+         "subscription_status": "active"}
+        for user_id in others
+    ])
+    owners = [test_user.id, *others]
+    spaces = ids(len(owners))
+    db_session.execute(insert(Space), [
+        {"id": space_id, "owner_id": owner, "type": "personal"} for space_id, owner in zip(spaces, owners)
+    ])
+    workspaces = ids(len(owners))
+    db_session.execute(insert(Workspace), [
+        {"id": workspace_id, "space_id": space_id, "name": "Team"}
+        for workspace_id, space_id in zip(workspaces, spaces)
+    ])
+    db_session.execute(insert(Membership), [
+        {"workspace_id": workspace_id, "user_id": owner, "role": "admin", "created_at": now}
+        for workspace_id, owner in zip(workspaces, owners)
+    ])
+    projects = ids(len(owners) * 2)
+    db_session.execute(insert(Project), [
+        {"id": project_id, "name": f"Project {i}", "status": "active" if i % 3 else "archived",
+         "workspace_id": workspaces[i // 2] if i % 2 else None,
+         "space_id": None if i % 2 else spaces[i // 2]}
+        for i, project_id in enumerate(projects)
+    ])
+    db_session.execute(insert(Note), [
+        {"project_id": projects[i % len(projects)], "workspace_id": workspaces[i % len(workspaces)],
+         "author_id": owners[i % len(owners)], "title": f"Note {i}", "visibility_scope": "workspace"}
+        for i in range(2000)
+    ])
+    tasks = ids(8000)
+    db_session.execute(insert(Task), [
+        {"id": task_id, "project_id": projects[i % len(projects)], "title": f"Task {i}",
+         "status": ("todo", "in_progress", "done")[i % 3], "priority": "medium",
+         "due_date": now + timedelta(days=i % 30), "tags": ["a"] if i % 2 else [],
+         "created_at": now, "updated_at": now}
+        for i, task_id in enumerate(tasks)
+    ])
+    db_session.execute(insert(TimeEntry), [
+        {"task_id": tasks[i], "start_time": now + timedelta(hours=i), "duration": 60, "created_at": now}
+        for i in range(4000)
+    ])
+    db_session.execute(insert(ActiveTimer), [
+        {"task_id": tasks[i], "start_time": now} for i in range(0, 8000, 40)
+    ])
+    db_session.commit()
+    db_session.connection().exec_driver_sql("ANALYZE")
+    db_session.commit()
+    return {"project_id": projects[0], "task_id": tasks[0]}
+
+@pytest.fixture
+def query_plans():
+    """EXPLAIN QUERY PLAN of every SELECT the routes run, as (sql, details)"""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[3] for row in cursor.fetchall()]))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", explain)
+    yield plans
+    event.remove(async_engine.sync_engine, "before_cursor_execute", explain)
+
+def test_hot_queries_use_indexes(client, auth_headers, seeded, query_plans):
+    """Test that list, detail, ACL and report queries never fully scan large tables"""
+    project_id, task_id = seeded["project_id"], seeded["task_id"]
+    paths = [
+        "/api/projects/",
+        f"/api/projects/{project_id}/tasks",
+        f"/api/projects/{project_id}/tasks?status=todo",
+        f"/api/projects/{project_id}/tasks?sort=-dueDate&view=summary",
+        f"/api/projects/{project_id}/tasks?tags=a",
+        f"/api/tasks/{task_id}",
+        f"/api/projects/{project_id}/notes",
+        f"/api/timer/entries/{task_id}",
+        "/api/timer/active",
+        "/api/reports/tasks/stats",
+        "/api/reports/time/stats",
+        "/api/reports/productivity",
+    ]
+    for path in paths:
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200, path
+
+    assert query_plans
+    scans = [
+        (sql, detail) for sql, details in query_plans for detail in details if FULL_SCAN.match(detail)
+    ]
+    assert not scans, "\n\n".join(f"{detail}\n{sql}" for sql, detail in scans)
@@ -0,0 +1,267 @@
+def test_task_stats_counts_every_status_and_priority(client, auth_headers, test_user, db_session):
+    """Test that grouped counts keep the TaskStats shape and include values outside the fixed set"""
+    from backend.models import Space, Project, Task
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Stats", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    db_session.add_all([
+        Task(project_id=project.id, title="A", status="done", priority="high"),
+        Task(project_id=project.id, title="B", status="done", priority="urgent"),
+        Task(project_id=project.id, title="C", status="todo", priority="urgent"),
+        Task(project_id=project.id, title="D", status="blocked", priority="low"),
+    ])
+    db_session.commit()
+    
+    response = client.get("/api/reports/tasks/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 4,
+        "completed": 2,
+        "inProgress": 0,
+        "todo": 1,
+        "byPriority": {"high": 1, "medium": 0, "low": 1, "urgent": 2},
+        "byStatus": {"done": 2, "in_progress": 0, "todo": 1, "blocked": 1},
+    }
+
+def test_task_writes_invalidate_cached_reports(client, auth_headers, test_user, db_session, monkeypatch):
+    """Test that committed task writes, single and bulk, bump only the scopes they touch"""
+    from backend.models import Space, Project, Task, User
+    from backend import report_cache
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    other_user = User(email="other@example.com", subscription_plan="free", subscription_status="active")
+    db_session.add_all([space, other_user])
+    db_session.commit()
+    other_space = Space(owner_id=other_user.id, type="personal")
+    db_session.add(other_space)
+    db_session.commit()
+    project = Project(name="Stats", space_id=space.id, status="active")
+    other_project = Project(name="Elsewhere", space_id=other_space.id, status="active")
+    db_session.add_all([project, other_project])
+    db_session.commit()
+    
+    bumps = []
+    invalidate_namespace = report_cache.invalidate_namespace
+    
+    def record_bump(*namespaces):
+        bumps.append(namespaces)
+        invalidate_namespace(*namespaces)
+    
+    monkeypatch.setattr(report_cache, "invalidate_namespace", record_bump)
+    
+    assert client.get("/api/reports/tasks/stats", headers=auth_headers).json()["total"] == 0
+    assert bumps == []
+    
+    response = client.post(f"/api/projects/{project.id}/tasks", headers=auth_headers, json={"title": "New"})
+    assert response.status_code == 200
+    assert bumps == [(f"reports:space:{space.id}",)]
+    assert client.get("/api/reports/tasks/stats", headers=auth_headers).json()["total"] == 1
+    
+    response = client.post(
+        f"/api/projects/{project.id}/tasks/batch", headers=auth_headers,
+        json={"operations": [{"op": "create", "task": {"title": "Bulk"}}]}
+    )
+    assert response.status_code == 200
+    assert bumps[1:] == [(f"reports:space:{space.id}",)]
+    assert client.get("/api/reports/tasks/stats", headers=auth_headers).json()["total"] == 2
+    
+    # Another user's write leaves this user's scopes alone
+    db_session.add(Task(project_id=other_project.id, title="Theirs"))
+    db_session.commit()
+    assert bumps[2:] == [(f"reports:space:{other_space.id}",)]
+
+def test_time_stats_split_across_local_midnight(client, auth_headers, test_user, db_session):
+    """Test that periods follow the requested timezone and entries crossing midnight are split"""
+    from backend.models import Space, Project, Task, TimeEntry
+    from datetime import datetime, time, timedelta, timezone
+    from zoneinfo import ZoneInfo
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Hours", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    task = Task(project_id=project.id, title="Tracked")
+    db_session.add(task)
+    db_session.commit()
+    
+    tz = ZoneInfo("America/New_York")
+    today = datetime.now(tz).date()
+    
+    def utc(day, hour, minute=0):
+        local = datetime.combine(day, time(hour, minute), tz)
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    two_days_ago, three_days_ago = today - timedelta(days=2), today - timedelta(days=3)
+    db_session.add_all([
+        # 23:30 -> 00:30 local: half on each day
+        TimeEntry(task_id=task.id, start_time=utc(two_days_ago, 23, 30), duration=3600),
+        TimeEntry(task_id=task.id, start_time=utc(three_days_ago, 10), duration=1200),
+        # Outside the window
+        TimeEntry(task_id=task.id, start_time=utc(today - timedelta(days=30), 10), duration=600),
+    ])
+    db_session.commit()
+    
+    response = client.get("/api/reports/time/stats", headers=auth_headers, params={"tz": "America/New_York"})
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["totalMinutes"] == 80
+    assert stats["entriesCount"] == 2
+    assert stats["byDay"] == [
+        {"date": three_days_ago.isoformat(), "minutes": 20},
+        {"date": two_days_ago.isoformat(), "minutes": 30},
+        {"date": (two_days_ago + timedelta(days=1)).isoformat(), "minutes": 30},
+    ]
+    
+    response = client.get(
+        "/api/reports/time/stats", headers=auth_headers,
+        params={"tz": "America/New_York", "granularity": "week", "days": 60}
+    )
+    weeks = response.json()["byWeek"]
+    assert sum(week["minutes"] for week in weeks) == 90
+    assert all(datetime.fromisoformat(week["date"]).weekday() == 0 for week in weeks)
+    
+    response = client.get("/api/reports/time/stats", headers=auth_headers, params={"tz": "Mars/Olympus"})
+    assert response.status_code == 400
+
+def test_time_rollups_maintained_on_write_and_rebuilt(client, auth_headers, test_user, db_session):
+    """Test that logged time lands in per-UTC-day rollups, which a rebuild reproduces and UTC stats read"""
+    from backend.models import Space, Project, Task, TimeRollup
+    from backend.time_rollups import rebuild_rollups
+    from datetime import datetime, time, timedelta
+    from sqlalchemy import select
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Hours", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    task = Task(project_id=project.id, title="Tracked")
+    db_session.add(task)
+    db_session.commit()
+    
+    two_days_ago = datetime.utcnow().date() - timedelta(days=2)
+    late = datetime.combine(two_days_ago, time(23, 30))
+    for start_time, duration in [(late, 3600), (late - timedelta(hours=5), 1200)]:
+        response = client.post("/api/timer/entries", headers=auth_headers, json={
+            "taskId": task.id, "startTime": start_time.isoformat(), "duration": duration
+        })
+        assert response.status_code == 200
+    
+    def rollups():
+        db_session.expire_all()
+        rows = db_session.execute(
+            select(TimeRollup.day, TimeRollup.seconds, TimeRollup.entries)
+            .where(TimeRollup.task_id == task.id).order_by(TimeRollup.day)
+        ).all()
+        return [tuple(row) for row in rows]
+    
+    recorded = rollups()
+    assert recorded == [(two_days_ago, 3000, 2), (two_days_ago + timedelta(days=1), 1800, 0)]
+    
+    rebuild_rollups(db_session, [task.id])
+    db_session.commit()
+    assert rollups() == recorded
+    
+    response = client.get("/api/reports/time/stats", headers=auth_headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["totalMinutes"] == 80
+    assert stats["entriesCount"] == 2
+    assert stats["byDay"] == [
+        {"date": two_days_ago.isoformat(), "minutes": 50},
+        {"date": (two_days_ago + timedelta(days=1)).isoformat(), "minutes": 30},
+    ]
+
+def test_weekly_reports_are_scoped_per_user_and_served_as_snapshots(client, auth_headers, db_session, test_user, monkeypatch):
+    """Test that a chunk's grouped queries count each user's projects, and the API serves the snapshot until a write"""
+    from backend.models import User, Space, Workspace, Membership, Project, Task, TimeEntry
+    from backend.report_snapshots import PRODUCTIVITY, save_snapshots
+    from backend.routes import reports as reports_routes
+    from backend.tasks.report_tasks import productivity_reports, summarize_weekly_reports, user_report_scopes
+    from backend.time_rollups import rebuild_rollups
+    from datetime import datetime, timedelta
+    from sqlalchemy import select
+    
+    other = User(email="other@example.com")
+    db_session.add(other)
+    db_session.commit()
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    workspace = Workspace(space_id=space.id, name="Team")
+    db_session.add(workspace)
+    db_session.commit()
+    db_session.add(Membership(workspace_id=workspace.id, user_id=other.id, role="member"))
+    own = Project(name="Own", space_id=space.id, status="active")
+    shared = Project(name="Shared", workspace_id=workspace.id, status="active")
+    archived = Project(name="Old", space_id=space.id, status="archived")
+    db_session.add_all([own, shared, archived])
+    db_session.commit()
+    
+    now = datetime.utcnow()
+    mine = Task(project_id=own.id, title="Mine", status="done")
+    theirs = Task(project_id=shared.id, title="Theirs", status="todo")
+    db_session.add_all([mine, theirs])
+    db_session.commit()
+    db_session.add_all([
+        TimeEntry(task_id=mine.id, start_time=now - timedelta(days=1), duration=1800),
+        TimeEntry(task_id=theirs.id, start_time=now - timedelta(days=2), duration=600),
+        TimeEntry(task_id=theirs.id, start_time=now - timedelta(days=30), duration=600),
+    ])
+    db_session.commit()
+    rebuild_rollups(db_session, [mine.id, theirs.id])
+    db_session.commit()
+    
+    period_start = now - timedelta(days=7)
+    user_ids = select(User.id).where(User.id.in_([test_user.id, other.id]))
+    assert user_report_scopes(db_session, user_ids) == {
+        test_user.id: [f"space:{space.id}"],
+        other.id: [f"workspace:{workspace.id}"],
+    }
+    reports = productivity_reports(db_session, user_ids, period_start)
+    assert reports == {
+        test_user.id: {"completedTasks": 1, "totalTimeMinutes": 30, "activeProjects": 1},
+        other.id: {"completedTasks": 0, "totalTimeMinutes": 10, "activeProjects": 1},
+    }
+    
+    # Stands in for the scope generations, which need Redis
+    version = {"current": "v1"}
+    
+    async def report_version(scopes):
+        return version["current"]
+    
+    monkeypatch.setattr(reports_routes, "report_version", report_version)
+    save_snapshots(db_session, PRODUCTIVITY, period_start, now, reports, {test_user.id: "v1", other.id: "v1"})
+    db_session.commit()
+    
+    response = client.get("/api/reports/productivity", headers=auth_headers, params={"days": 7})
+    snapshot = response.json()
+    assert snapshot.pop("generatedAt")
+    assert snapshot == {**reports[test_user.id], "period": "Last 7 days", "periodEnd": now.isoformat()}
+    
+    # A write bumps the version, and the snapshot is no longer served
+    db_session.add(Task(project_id=own.id, title="Later", status="done"))
+    db_session.commit()
+    version["current"] = "v2"
+    response = client.get("/api/reports/productivity", headers=auth_headers, params={"days": 7})
+    assert response.json()["completedTasks"] == 2
+    # No snapshot covers 30 days, so that period is computed live
+    response = client.get("/api/reports/productivity", headers=auth_headers, params={"days": 30})
+    assert response.json()["completedTasks"] == 2
+    
+    summary = summarize_weekly_reports(
+        [{"reports_generated": 2, "duration_ms": 5.0}, {"reports_generated": 1, "duration_ms": 7.5}],
+        now.isoformat()
+    )
+    assert summary["reports_generated"] == 3
+    assert summary["chunks"] == 2
+    assert summary["chunk_duration_ms_max"] == 7.5
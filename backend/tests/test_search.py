@@ -0,0 +1,73 @@
+import pytest
+
+@pytest.fixture
+def corpus(db_session, test_user):
+    """Notes and tasks in the user's space plus a stranger's space"""
+    from backend.models import Space, Project, Note, Task, User
+    
+    stranger = User(email="stranger@example.com", subscription_plan="free", subscription_status="active")
+    db_session.add(stranger)
+    db_session.commit()
+    
+    mine = Space(owner_id=test_user.id, type="personal")
+    theirs = Space(owner_id=stranger.id, type="personal")
+    db_session.add_all([mine, theirs])
+    db_session.commit()
+    
+    project = Project(name="Mine", space_id=mine.id, status="active")
+    foreign = Project(name="Theirs", space_id=theirs.id, status="active")
+    db_session.add_all([project, foreign])
+    db_session.commit()
+    
+    db_session.add_all([
+        Note(project_id=project.id, space_id=mine.id, author_id=test_user.id,
+             title="Quarterly roadmap", content="Migrate billing to the new invoicing service"),
+        Note(project_id=project.id, space_id=mine.id, author_id=test_user.id,
+             title="Meeting notes", content="Discussed the roadmap briefly"),
+        Note(project_id=foreign.id, space_id=theirs.id, author_id=stranger.id,
+             title="Secret roadmap", content="Not for you"),
+        Task(project_id=project.id, title="Draft roadmap slides", description="For the offsite"),
+        Task(project_id=project.id, title="Fix invoicing rounding", description="Billing totals off by a cent"),
+        Task(project_id=foreign.id, title="Roadmap review", description="Private"),
+    ])
+    db_session.commit()
+    return project
+
+def test_search_ranks_visible_notes_and_tasks(client, auth_headers, corpus):
+    """Test that results span notes and tasks, exclude inaccessible rows and rank title hits first"""
+    response = client.get("/api/search", headers=auth_headers, params={"q": "roadmap"})
+    assert response.status_code == 200
+    results = response.json()
+    
+    assert {(r["type"], r["title"]) for r in results} == {
+        ("note", "Quarterly roadmap"), ("note", "Meeting notes"), ("task", "Draft roadmap slides")
+    }
+    assert results[-1]["title"] == "Meeting notes"
+    assert all(r["projectId"] == corpus.id for r in results)
+    
+    response = client.get("/api/search", headers=auth_headers, params={"q": "billing invoicing", "type": "task"})
+    assert [r["title"] for r in response.json()] == ["Fix invoicing rounding"]
+
+def test_search_index_follows_writes_and_paginates(client, auth_headers, db_session, corpus):
+    """Test that updates and deletes are reflected and pages don't overlap"""
+    from backend.models import Note, Task
+    
+    note = db_session.query(Note).filter_by(title="Meeting notes").one()
+    note.content = "Nothing relevant any more"
+    db_session.query(Task).filter_by(title="Draft roadmap slides").delete()
+    db_session.commit()
+    
+    response = client.get("/api/search", headers=auth_headers, params={"q": "roadmap"})
+    assert [r["title"] for r in response.json()] == ["Quarterly roadmap"]
+    
+    first = client.get("/api/search", headers=auth_headers, params={"q": "billing", "limit": 1})
+    assert len(first.json()) == 1
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/api/search", headers=auth_headers, params={"q": "billing", "limit": 1, "cursor": cursor})
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+    assert first.json()[0]["id"] != second.json()[0]["id"]
+    
+    # FTS syntax in user input is treated as plain words
+    response = client.get("/api/search", headers=auth_headers, params={"q": 'roadmap" OR NEAR('})
+    assert response.status_code == 200
@@ -28,6 +28,14 @@ def test_create_task(client, auth_headers, test_user, db_session):
     data = response.json()
     assert data["title"] == "Test Task"
     assert data["priority"] == "high"
+    
+    response = client.post(
+        f"/api/projects/{project.id}/tasks",
+        headers=auth_headers,
+        json={"title": "Offset", "dueDate": "2024-05-01T12:00:00+02:00"}
+    )
+    assert response.status_code == 200
+    assert response.json()["dueDate"] == "2024-05-01T10:00:00"
 
 def test_get_project_tasks(client, auth_headers, test_user, db_session):
     """Test getting tasks for a project"""
@@ -121,3 +129,365 @@ def test_delete_task(client, auth_headers, test_user, db_session):
     from backend.models import Task
     deleted_task = db_session.query(Task).filter(Task.id == task.id).first()
     assert deleted_task is None
+
+def test_project_tasks_conditional_get(client, auth_headers, test_user, db_session):
+    """Test that an unchanged task list answers 304, a new task changes the ETag, and only conditional requests get one"""
+    from backend.models import Space, Project, Task
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    db_session.add(Task(project_id=project.id, title="First", status="todo", priority="medium"))
+    db_session.commit()
+    
+    # Unconditional page requests skip the version query and send no tag
+    response = client.get(f"/api/projects/{project.id}/tasks", headers=auth_headers)
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    
+    response = client.get(f"/api/projects/{project.id}/tasks", headers={**auth_headers, "If-None-Match": '"0"'})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    conditional = {**auth_headers, "If-None-Match": etag}
+    response = client.get(f"/api/projects/{project.id}/tasks", headers=conditional)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    
+    db_session.add(Task(project_id=project.id, title="Second", status="todo", priority="medium"))
+    db_session.commit()
+    
+    response = client.get(f"/api/projects/{project.id}/tasks", headers=conditional)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+def test_task_detail_conditional_get(client, auth_headers, test_user, db_session):
+    """Test ETag handling on the task detail route"""
+    from backend.models import Space, Project, Task
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    task = Task(project_id=project.id, title="Detail", status="todo", priority="medium")
+    db_session.add(task)
+    db_session.commit()
+    
+    response = client.get(f"/api/tasks/{task.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Detail"
+    
+    response = client.get(
+        f"/api/tasks/{task.id}",
+        headers={**auth_headers, "If-None-Match": f'W/{response.headers["ETag"]}'}
+    )
+    assert response.status_code == 304
+
+def test_project_tasks_cursor_pagination(client, auth_headers, test_user, db_session):
+    """Test that following X-Next-Cursor walks every task exactly once"""
+    from backend.models import Space, Project, Task
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Big Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    # Same created_at second for all rows, so the id tiebreaker matters
+    db_session.add_all([
+        Task(project_id=project.id, title=f"Task {i}", status="todo", priority="medium")
+        for i in range(5)
+    ])
+    db_session.commit()
+    
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/api/projects/{project.id}/tasks", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        seen.extend(task["id"] for task in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert pages == 3
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+def test_invalid_cursor_rejected(client, auth_headers, test_user, db_session):
+    """Test that a malformed cursor is a 400, not a server error"""
+    from backend.models import Space, Project
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    response = client.get(
+        f"/api/projects/{project.id}/tasks",
+        headers=auth_headers,
+        params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+def test_project_tasks_filters(client, auth_headers, test_user, db_session):
+    """Test that status, priority, assignee, due range, tag and title filters combine"""
+    from backend.models import Space, Project, Task
+    from datetime import datetime
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Filtered", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    db_session.add_all([
+        Task(project_id=project.id, title="Fix login 100%", status="todo", priority="urgent",
+             assignee_id=test_user.id, due_date=datetime(2024, 5, 2), tags=["bug", "auth"]),
+        Task(project_id=project.id, title="Fix logout", status="done", priority="urgent",
+             assignee_id=test_user.id, due_date=datetime(2024, 5, 3), tags=["bug"]),
+        Task(project_id=project.id, title="Write docs", status="todo", priority="low",
+             due_date=datetime(2024, 6, 1), tags=["docs"]),
+        Task(project_id=project.id, title="Triage", status="in_progress", priority="urgent", tags=[]),
+    ])
+    db_session.commit()
+    
+    def titles(**params):
+        response = client.get(f"/api/projects/{project.id}/tasks", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        return sorted(task["title"] for task in response.json())
+    
+    assert titles(status="todo,in_progress") == ["Fix login 100%", "Triage", "Write docs"]
+    assert titles(priority="urgent", assigneeId=test_user.id) == ["Fix login 100%", "Fix logout"]
+    assert titles(dueAfter="2024-05-02T00:00:00", dueBefore="2024-06-01T00:00:00") == ["Fix login 100%", "Fix logout"]
+    # Offsets are converted to UTC: 2024-05-02T01:00+02:00 is 2024-05-01T23:00 UTC
+    assert titles(dueAfter="2024-05-02T01:00:00+02:00", dueBefore="2024-05-03T00:00:00") == ["Fix login 100%"]
+    assert titles(tags="bug") == ["Fix login 100%", "Fix logout"]
+    assert titles(tags="auth,bug") == ["Fix login 100%"]
+    assert titles(tags="bug,docs") == []
+    assert titles(q="FIX", status="done") == ["Fix logout"]
+    assert titles(q="100%") == ["Fix login 100%"]
+
+def test_project_tasks_sorted_by_due_date(client, auth_headers, test_user, db_session):
+    """Test that sorted pages keep their order across cursors, undated tasks last"""
+    from backend.models import Space, Project, Task
+    from datetime import datetime
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Sorted", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    due_dates = [datetime(2024, 5, 3), None, datetime(2024, 5, 1), None, datetime(2024, 5, 3), datetime(2024, 5, 2)]
+    db_session.add_all([
+        Task(project_id=project.id, title=f"Task {i}", due_date=due)
+        for i, due in enumerate(due_dates)
+    ])
+    db_session.commit()
+    
+    def walk(sort):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "sort": sort, "fields": "title", **({"cursor": cursor} if cursor else {})}
+            response = client.get(f"/api/projects/{project.id}/tasks", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            seen.extend(task["title"] for task in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return seen
+    
+    ascending = walk("dueDate")
+    assert len(set(ascending)) == 6
+    assert ascending[:2] == ["Task 2", "Task 5"]
+    assert set(ascending[2:4]) == {"Task 0", "Task 4"}
+    assert set(ascending[4:]) == {"Task 1", "Task 3"}
+    assert walk("-dueDate") == ascending[::-1]
+    
+    response = client.get(f"/api/projects/{project.id}/tasks", headers=auth_headers, params={"sort": "title"})
+    assert response.status_code == 422
+
+def test_project_tasks_sparse_fields(client, auth_headers, test_user, db_session):
+    """Test fields= and view=summary projections of the task list"""
+    from backend.models import Space, Project, Task
+    from backend.tests.conftest import async_engine
+    from sqlalchemy import event
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    db_session.add(Task(
+        project_id=project.id, title="Long", description="x" * 5000,
+        status="todo", priority="medium"
+    ))
+    db_session.commit()
+    
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(
+            f"/api/projects/{project.id}/tasks",
+            headers=auth_headers,
+            params={"fields": "title,status"}
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "title", "status"}
+    task_select = [s for s in statements if "FROM tasks" in s and "count(" not in s.lower()]
+    assert "description" not in task_select[-1]
+    
+    response = client.get(
+        f"/api/projects/{project.id}/tasks",
+        headers=auth_headers,
+        params={"view": "summary"}
+    )
+    assert response.status_code == 200
+    assert "description" not in response.json()[0]
+    assert response.json()[0]["title"] == "Long"
+    
+    response = client.get(
+        f"/api/projects/{project.id}/tasks",
+        headers=auth_headers,
+        params={"fields": "title,secret"}
+    )
+    assert response.status_code == 400
+
+def test_batch_tasks_single_transaction(client, auth_headers, test_user, db_session):
+    """Test mixed create/update/delete operations with per-item results"""
+    from backend.models import Space, Project, Task
+    from backend.tests.conftest import async_engine
+    from sqlalchemy import event
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    other = Project(name="Other Project", space_id=space.id, status="active")
+    db_session.add_all([project, other])
+    db_session.commit()
+    
+    existing = Task(project_id=project.id, title="Old title", status="todo", priority="low")
+    doomed = Task(project_id=project.id, title="Doomed", status="todo", priority="low")
+    foreign = Task(project_id=other.id, title="Elsewhere", status="todo", priority="low")
+    db_session.add_all([existing, doomed, foreign])
+    db_session.commit()
+    
+    operations = [{"op": "create", "task": {"title": f"New {i}"}} for i in range(50)]
+    operations += [
+        {"op": "update", "id": existing.id, "task": {"title": "New title", "status": "done"}},
+        {"op": "delete", "id": doomed.id},
+        {"op": "delete", "id": foreign.id},
+    ]
+    
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.post(
+            f"/api/projects/{project.id}/tasks/batch",
+            headers=auth_headers,
+            json={"operations": operations}
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == list(range(53))
+    assert all(r["status"] == "ok" for r in results[:52])
+    assert results[0]["task"]["title"] == "New 0"
+    assert results[49]["task"]["title"] == "New 49"
+    assert results[50]["task"]["title"] == "New title"
+    assert results[52]["status"] == "error"
+    
+    inserts = [s for s in statements if s.startswith("INSERT INTO tasks")]
+    assert len(inserts) == 1
+    
+    db_session.expire_all()
+    assert db_session.query(Task).filter_by(project_id=project.id).count() == 51
+    assert db_session.get(Task, foreign.id) is not None
+
+def test_batch_tasks_rejects_oversized_batches(client, auth_headers, test_user, db_session):
+    """Test that the operation count is capped"""
+    from backend.models import Space, Project
+    from backend.routes.tasks import TASK_BATCH_MAX_OPERATIONS
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    
+    response = client.post(
+        f"/api/projects/{project.id}/tasks/batch",
+        headers=auth_headers,
+        json={"operations": [{"op": "create", "task": {"title": "x"}}] * (TASK_BATCH_MAX_OPERATIONS + 1)}
+    )
+    assert response.status_code == 422
+
+def test_batch_tasks_rejects_duplicate_ids(client, auth_headers, test_user, db_session):
+    """Test that a task id targeted by more than one operation rejects the whole batch"""
+    from backend.models import Space, Project, Task
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    project = Project(name="Test Project", space_id=space.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    task = Task(project_id=project.id, title="Keep", status="todo", priority="low")
+    db_session.add(task)
+    db_session.commit()
+    
+    for operations in (
+        [{"op": "update", "id": task.id, "task": {"title": "Gone"}}, {"op": "delete", "id": task.id}],
+        [{"op": "update", "id": task.id, "task": {"title": "A"}},
+         {"op": "update", "id": task.id, "task": {"title": "B"}}],
+    ):
+        response = client.post(
+            f"/api/projects/{project.id}/tasks/batch",
+            headers=auth_headers,
+            json={"operations": [{"op": "create", "task": {"title": "New"}}, *operations]}
+        )
+        assert response.status_code == 422
+        assert task.id in response.json()["detail"]
+    
+    db_session.expire_all()
+    assert db_session.get(Task, task.id).title == "Keep"
+    assert db_session.query(Task).filter(Task.project_id == project.id).count() == 1
@@ -0,0 +1,101 @@
+import io
+import json
+import tarfile
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from backend.database import Base
+from backend.workspace_export import import_workspace, iter_export
+
+@pytest.fixture
+def workspace(db_session, test_user):
+    """A workspace with a project, note, tasks, subtask and time entry"""
+    from backend.models import Space, Workspace, Membership, Project, Note, Task, Subtask, TimeEntry
+    from datetime import datetime
+    
+    space = Space(owner_id=test_user.id, type="personal")
+    db_session.add(space)
+    db_session.commit()
+    workspace = Workspace(space_id=space.id, name="Team")
+    db_session.add(workspace)
+    db_session.commit()
+    db_session.add(Membership(workspace_id=workspace.id, user_id=test_user.id, role="admin"))
+    project = Project(name="Exported", workspace_id=workspace.id, status="active")
+    db_session.add(project)
+    db_session.commit()
+    note = Note(project_id=project.id, workspace_id=workspace.id, space_id=space.id,
+                author_id=test_user.id, title="Spec")
+    db_session.add(note)
+    db_session.commit()
+    tasks = [Task(project_id=project.id, note_id=note.id, title=f"Task {i}", assignee_id=test_user.id) for i in range(7)]
+    db_session.add_all(tasks)
+    db_session.commit()
+    db_session.add(Subtask(parent_task_id=tasks[0].id, title="Step"))
+    db_session.add(TimeEntry(task_id=tasks[0].id, start_time=datetime(2024, 5, 1, 9), duration=1800))
+    db_session.commit()
+    return workspace
+
+def test_export_endpoint_streams_ndjson_parts(client, auth_headers, workspace):
+    """Test that the export is a tar.gz of NDJSON parts split by EXPORT_PART_ROWS"""
+    response = client.get(f"/api/workspaces/{workspace.id}/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    
+    with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as tar:
+        names = tar.getnames()
+        manifest = json.load(tar.extractfile("manifest.json"))
+        tasks = [json.loads(line) for line in tar.extractfile("tasks/part-00000.ndjson")]
+    
+    assert manifest["workspaceId"] == workspace.id
+    assert names[0] == "manifest.json"
+    assert len(tasks) == 7
+    assert {"projects/part-00000.ndjson", "time_entries/part-00000.ndjson"} <= set(names)
+
+def test_export_requires_workspace_admin(client, auth_headers, db_session, workspace):
+    """Test that members without an admin role cannot export"""
+    from backend.models import Membership
+    
+    membership = db_session.query(Membership).filter_by(workspace_id=workspace.id).one()
+    membership.role = "member"
+    db_session.commit()
+    
+    response = client.get(f"/api/workspaces/{workspace.id}/export", headers=auth_headers)
+    assert response.status_code == 403
+
+def test_import_round_trip_in_batches(db_session, workspace):
+    """Test that an export restores into an empty database"""
+    from backend.models import Space, Workspace, Membership, Task, Note, TimeEntry, TimeRollup, User
+    
+    member = User(email="member@example.com", subscription_plan="free", subscription_status="active")
+    db_session.add(member)
+    db_session.commit()
+    db_session.add(Membership(workspace_id=workspace.id, user_id=member.id, role="member"))
+    db_session.commit()
+    
+    archive = io.BytesIO(b"".join(iter_export(db_session, workspace.id, part_rows=3)))
+    
+    target = create_engine("sqlite://")
+    Base.metadata.create_all(bind=target)
+    with sessionmaker(bind=target)() as db:
+        owner = User(email="owner@example.com", subscription_plan="free", subscription_status="active")
+        db.add_all([owner, User(id=member.id, email=member.email, subscription_plan="free", subscription_status="active")])
+        db.commit()
+        space = Space(owner_id=owner.id, type="personal")
+        db.add(space)
+        db.commit()
+        
+        counts = import_workspace(db, archive, space_id=space.id, batch_size=2)
+        
+        assert counts["tasks"] == 7
+        assert counts["subtasks"] == 1
+        assert db.scalar(select(func.count(Task.id))) == 7
+        assert db.scalar(select(TimeEntry.start_time)).hour == 9
+        # The exporting user doesn't exist here, so references to them are cleared
+        assert db.scalar(select(Note.author_id)) is None
+        # Memberships come along, except those of users missing here
+        assert counts["memberships"] == 1
+        assert db.execute(select(Membership.user_id, Membership.role)).all() == [(member.id, "member")]
+        # Every space reference points at the target space
+        assert db.scalar(select(Workspace.space_id)) == space.id
+        assert db.scalar(select(Note.space_id)) == space.id
+        assert db.scalar(select(TimeRollup.seconds)) == 1800
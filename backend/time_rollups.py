@@ -0,0 +1,99 @@
+"""
+Daily time rollups.
+
+``time_rollups`` holds seconds tracked per (task, UTC day), so reports sum
+one row per task and day instead of every time entry. Writers that create
+time entries call ``record_time`` in the same transaction; an entry
+crossing UTC midnight is split between the days it covers.
+``rebuild_rollups`` recomputes the rollups of a batch of tasks from their
+entries, for the backfill / repair Celery task and after bulk imports;
+``task_id_batches`` walks the tasks to rebuild without listing them all.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.models import Task, TimeEntry, TimeRollup
+from backend.report_cache import mark_reports_dirty
+
+def split_by_day(start_time: datetime, duration: int) -> list[tuple[date, int]]:
+    """(UTC day, seconds) covered by [start_time, start_time + duration)"""
+    if start_time.tzinfo is not None:
+        start_time = start_time.astimezone(timezone.utc).replace(tzinfo=None)
+    end_time = start_time + timedelta(seconds=duration)
+    parts = []
+    day_start = datetime.combine(start_time.date(), time.min)
+    while True:
+        day_end = day_start + timedelta(days=1)
+        parts.append((day_start.date(), int((min(end_time, day_end) - max(start_time, day_start)).total_seconds())))
+        if end_time <= day_end:
+            return parts
+        day_start = day_end
+
+def rollup_rows(task_id: str, project_id: str, start_time: datetime, duration: int) -> list[dict]:
+    return [
+        {"task_id": task_id, "project_id": project_id, "day": day, "seconds": seconds,
+         "entries": 1 if index == 0 else 0}
+        for index, (day, seconds) in enumerate(split_by_day(start_time, duration))
+    ]
+
+def upsert_rollups(dialect: str, rows: list[dict]):
+    """INSERT ... ON CONFLICT (task_id, day) DO UPDATE adding to the stored totals"""
+    stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(TimeRollup).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[TimeRollup.task_id, TimeRollup.day],
+        set_={
+            "seconds": TimeRollup.seconds + stmt.excluded.seconds,
+            "entries": TimeRollup.entries + stmt.excluded.entries,
+            "project_id": stmt.excluded.project_id,
+        },
+    )
+
+async def record_time(db: AsyncSession, task_id: str, project_id: str, start_time: datetime, duration: int):
+    """Add a new time entry to the rollups; the caller commits"""
+    await db.execute(upsert_rollups(db.bind.dialect.name, rollup_rows(task_id, project_id, start_time, duration)))
+    mark_reports_dirty(db, project_ids=[project_id])
+
+def task_id_batches(db: Session, batch_size: int, *criteria):
+    """Ids of the tasks matching criteria in batches, by keyset on id so batches stay cheap however far in"""
+    last_id = ""
+    while True:
+        batch = db.scalars(
+            select(Task.id).where(Task.id > last_id, *criteria).order_by(Task.id).limit(batch_size)
+        ).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+def rebuild_rollups(db: Session, task_ids: list[str], yield_per: int = 5000) -> int:
+    """Recompute the rollups of the given tasks from their time entries; the caller commits"""
+    if not task_ids:
+        return 0
+    mark_reports_dirty(db, project_ids=db.scalars(
+        select(Task.project_id).where(Task.id.in_(task_ids)).distinct()
+    ).all())
+    db.execute(delete(TimeRollup).where(TimeRollup.task_id.in_(task_ids)))
+    totals: dict[tuple[str, date], dict] = defaultdict(lambda: {"seconds": 0, "entries": 0})
+    projects = {}
+    entries = db.execute(
+        select(TimeEntry.task_id, Task.project_id, TimeEntry.start_time, TimeEntry.duration)
+        .join(Task, Task.id == TimeEntry.task_id)
+        .where(TimeEntry.task_id.in_(task_ids))
+        .execution_options(yield_per=yield_per)
+    )
+    for task_id, project_id, start_time, duration in entries:
+        projects[task_id] = project_id
+        for row in rollup_rows(task_id, project_id, start_time, duration):
+            total = totals[task_id, row["day"]]
+            total["seconds"] += row["seconds"]
+            total["entries"] += row["entries"]
+    if totals:
+        db.execute(insert(TimeRollup), [
+            {"task_id": task_id, "day": day, "project_id": projects[task_id], **total}
+            for (task_id, day), total in totals.items()
+        ])
+    return len(totals)
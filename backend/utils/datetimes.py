@@ -0,0 +1,20 @@
+"""
+Incoming datetimes as naive UTC.
+
+Timestamp columns are ``TIMESTAMP WITHOUT TIME ZONE`` holding UTC. Clients
+send ISO strings with offsets, which asyncpg refuses to bind to those
+columns and SQLite stores with the offset silently dropped. Request models
+and query parameters use ``UTCDateTime`` so values are converted before
+they reach the ORM or a filter.
+"""
+
+from datetime import datetime, timezone
+from pydantic import AfterValidator
+from typing import Annotated
+
+def to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+UTCDateTime = Annotated[datetime, AfterValidator(to_naive_utc)]
@@ -0,0 +1,70 @@
+"""
+Conditional GET support.
+
+ETags are derived from row versions rather than response bodies: a
+collection is identified by its row count and newest ``updated_at``, a
+single resource by its id and ``updated_at``. The request's query string
+is mixed in so different views of the same rows get different tags.
+
+When a request carries ``If-None-Match`` the route first runs a cheap
+version query and answers 304 on a match, without loading rows or
+building response models. Unpaginated routes otherwise compute the tag
+from the rows they load anyway. Paginated ones need the aggregate, since a
+page doesn't cover the whole collection, so they only run it and send an
+ETag when the request is conditional: a polling client opts in by sending
+``If-None-Match`` with the tag it has, or any placeholder on its first poll.
+"""
+
+from datetime import datetime
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable
+import hashlib
+
+# Clients must revalidate before reusing a response, and shared caches must
+# not store per-user data
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(request: Request, *parts) -> str:
+    digest = hashlib.sha1(
+        ":".join(str(part) for part in (*parts, request.url.query)).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+def collection_etag(request: Request, count: int, last_updated: datetime | None) -> str:
+    return make_etag(request, "collection", count, last_updated and last_updated.isoformat())
+
+def item_etag(request: Request, item_id: str, updated_at: datetime) -> str:
+    return make_etag(request, "item", item_id, updated_at.isoformat())
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored"""
+    header = request.headers.get("if-none-match", "")
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+async def collection_version(db: AsyncSession, model, *criteria) -> tuple[int, datetime | None]:
+    """Row count and newest updated_at of a collection, in one aggregate query"""
+    result = await db.execute(
+        select(func.count(), func.max(model.updated_at)).select_from(model).where(*criteria)
+    )
+    count, last_updated = result.one()
+    return count, last_updated
+
+def rows_version(rows: Iterable) -> tuple[int, datetime | None]:
+    """Same as collection_version, for rows that are already loaded"""
+    rows = list(rows)
+    return len(rows), max((row.updated_at for row in rows), default=None)
@@ -0,0 +1,47 @@
+"""
+Sparse fieldsets for list routes.
+
+``fields=title,updatedAt`` names response fields; only the matching columns
+are selected (``load_only``), and the rows are returned as plain dicts
+holding just those fields plus ``id``. Summary views work the same way
+with a fixed, lightweight response model instead of a field list.
+"""
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+def field_attributes(response_model: type[BaseModel]) -> dict[str, str]:
+    """Response field name -> ORM attribute it is read from"""
+    return {
+        name: field.validation_alias or name
+        for name, field in response_model.model_fields.items()
+    }
+
+def parse_fields(fields: str | None, response_model: type[BaseModel]) -> list[str] | None:
+    """Validate a fields= parameter against a response model; None when absent"""
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    known = field_attributes(response_model)
+    unknown = [name for name in requested if name not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id", *dict.fromkeys(name for name in requested if name != "id")]
+
+def load_columns(
+    model,
+    response_model: type[BaseModel],
+    field_names: list[str] | None = None,
+    sort_column: str = "created_at",
+):
+    """Loader option selecting only the columns behind the given response fields"""
+    attributes = field_attributes(response_model)
+    names = field_names or list(attributes)
+    # The sort column is always needed to build the pagination cursor
+    columns = {attributes[name] for name in names} | {sort_column}
+    return load_only(*(getattr(model, column) for column in columns))
+
+def select_fields(rows, response_model: type[BaseModel], field_names: list[str]) -> list[dict]:
+    attributes = field_attributes(response_model)
+    return [{name: getattr(row, attributes[name]) for name in field_names} for row in rows]
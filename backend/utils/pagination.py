@@ -0,0 +1,110 @@
+"""
+Keyset pagination ordered by (created_at, id), or by (sort column, id).
+
+Pages are fetched with ``WHERE (created_at, id) > (:after_created, :after_id)``
+instead of OFFSET, so every page is an index range scan of ``limit`` rows
+however deep into the collection it is. The cursor is an opaque token for
+the last row of the previous page; the next one travels in the
+``X-Next-Cursor`` response header so list bodies keep their shape.
+"""
+
+from datetime import datetime
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    """Query parameters shared by paginated list routes"""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+def encode_cursor(row, column: str = "created_at") -> str:
+    value = getattr(row, column)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([value, row.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, is_datetime: bool = True) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if is_datetime and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_after(model, cursor: str, sort_column=None, descending: bool = False):
+    """
+    Predicate selecting rows that sort after the cursor row. NULLs of a
+    nullable sort column come last in ascending order; descending order is
+    the exact reverse, which is also how a btree index scans backwards.
+    """
+    sort_column = sort_column if sort_column is not None else model.created_at
+    value, row_id = decode_cursor(cursor, isinstance(sort_column.type, DateTime))
+    if value is None:
+        if descending:
+            return or_(sort_column.is_not(None), model.id < row_id)
+        return and_(sort_column.is_(None), model.id > row_id)
+
+    # Compare against the cursor row's stored value when it still exists:
+    # SQLite keeps func.now() defaults without microseconds, so a bound
+    # datetime would not compare equal to the value it was read from
+    stored = select(sort_column).where(model.id == row_id).scalar_subquery()
+    after = tuple_(sort_column, model.id)
+    cursor_key = tuple_(func.coalesce(stored, value), row_id)
+    if descending:
+        return after < cursor_key
+    if sort_column.nullable:
+        return or_(after > cursor_key, sort_column.is_(None))
+    return after > cursor_key
+
+def order_by_keyset(model, sort_column=None, descending: bool = False) -> list:
+    sort_column = sort_column if sort_column is not None else model.created_at
+    if descending:
+        order = [sort_column.desc(), model.id.desc()]
+        if sort_column.nullable:
+            order[0] = order[0].nulls_first()
+    else:
+        order = [sort_column.asc(), model.id.asc()]
+        if sort_column.nullable:
+            order[0] = order[0].nulls_last()
+    return order
+
+async def fetch_page(
+    db: AsyncSession,
+    query,
+    model,
+    page: PageParams,
+    response: Response,
+    sort_column=None,
+    descending: bool = False,
+) -> list:
+    """
+    Run a keyset-paginated query ordered by sort_column (created_at by
+    default) and id; sets X-Next-Cursor when more rows follow
+    """
+    if page.cursor:
+        query = query.where(keyset_after(model, page.cursor, sort_column, descending))
+    query = query.order_by(*order_by_keyset(model, sort_column, descending)).limit(page.limit + 1)
+
+    rows = (await db.execute(query)).scalars().all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        column = sort_column.key if sort_column is not None else "created_at"
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1], column)
+    return rows
@@ -0,0 +1,95 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow, so hashing inline in an ``async def`` route
+stalls every other request on the worker. Hashing runs on a dedicated,
+bounded executor instead; once too many operations are pending callers get
+a fast 503 rather than queueing behind a login burst.
+"""
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import os
+
+# "thread" works well because bcrypt releases the GIL; "process" isolates the
+# CPU cost entirely; "inline" hashes on the event loop (old behaviour, only
+# useful for comparison benchmarks).
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Hashes with a different cost than BCRYPT_ROUNDS are reported as needing an
+# update, which lets login transparently upgrade (or downgrade) stored hashes.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_executor: Executor | None = None
+_pending = 0
+
+def _get_executor() -> Executor | None:
+    global _executor
+    if PASSWORD_HASH_EXECUTOR == "inline":
+        return None
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _executor
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed)
+
+async def _run(func, *args):
+    global _pending
+    executor = _get_executor()
+    if executor is None:
+        return func(*args)
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication is temporarily overloaded, please retry",
+            headers={"Retry-After": "1"},
+        )
+    # Only touched from the event loop thread, so no lock is needed
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    finally:
+        _pending -= 1
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the hashing executor"""
+    return await _run(_hash, password)
+
+async def verify_password(password: str, hashed: str | None) -> tuple[bool, str | None]:
+    """
+    Verify a password on the hashing executor.
+    Returns (valid, new_hash); new_hash is set when the stored hash should be
+    replaced because its cost no longer matches BCRYPT_ROUNDS.
+    """
+    if not hashed:
+        return False, None
+    return await _run(_verify_and_update, password, hashed)
+
+def password_hash_stats() -> dict:
+    return {
+        "executor": PASSWORD_HASH_EXECUTOR,
+        "workers": PASSWORD_HASH_WORKERS,
+        "pending": _pending,
+        "maxPending": PASSWORD_HASH_MAX_PENDING,
+    }
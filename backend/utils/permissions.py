@@ -1,74 +1,224 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import String, and_, cast, event, exists, inspect, null, or_, select, union_all, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession
+from backend.cache import LOCAL_TIER_COHERENT, get_cached_sets, set_cached_sets, delete_cached
 from backend.models import Project, Task, Note, Workspace, Membership, Space
+import os
 
-def get_user_workspace_ids(user_id: str, db: Session) -> list[str]:
-    """Get all workspace IDs the user has access to"""
-    memberships = db.query(Membership).filter(Membership.user_id == user_id).all()
-    return [m.workspace_id for m in memberships]
+ACL_CACHE_TTL = int(os.getenv("ACL_CACHE_TTL", "300"))
 
-def get_user_space_ids(user_id: str, db: Session) -> list[str]:
-    """Get all space IDs the user owns"""
-    spaces = db.query(Space).filter(Space.owner_id == user_id).all()
-    return [s.id for s in spaces]
+def acl_cache_keys(user_id: str) -> tuple[str, str]:
+    """Redis SET keys holding a user's memberships ("workspace_id:role") and owned spaces"""
+    return f"acl:{user_id}:memberships", f"acl:{user_id}:spaces"
 
-def verify_project_access(project_id: str, user_id: str, db: Session) -> bool:
-    """Verify if user has access to a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        return False
-    
-    user_workspaces = get_user_workspace_ids(user_id, db)
-    user_spaces = get_user_space_ids(user_id, db)
-    
-    return (
-        project.workspace_id in user_workspaces or
-        project.space_id in user_spaces
+def invalidate_acl(*user_ids: str):
+    """Drop cached membership/space sets for the given users"""
+    keys = [key for user_id in user_ids for key in acl_cache_keys(user_id)]
+    delete_cached(*keys)
+
+class AccessContext:
+    """
+    Request-scoped view of what a user can reach.
+    Workspace memberships, roles and owned spaces are loaded with a single
+    query on first use and memoized for the rest of the request.
+    """
+
+    def __init__(self, user_id: str, db: AsyncSession):
+        self.user_id = user_id
+        self.db = db
+        self._roles: dict[str, str] | None = None
+        self._space_ids: list[str] = []
+
+    async def load(self):
+        if self._roles is not None:
+            return
+
+        cached = await get_cached_sets(list(acl_cache_keys(self.user_id)), local=LOCAL_TIER_COHERENT)
+        if cached is not None:
+            membership_entries, space_ids = cached
+            self._roles = dict(entry.split(":", 1) for entry in membership_entries)
+            self._space_ids = list(space_ids)
+            return
+
+        memberships = select(
+            Membership.workspace_id.label("workspace_id"),
+            Membership.role.label("role"),
+            cast(null(), String).label("space_id")
+        ).where(Membership.user_id == self.user_id)
+        owned_spaces = select(
+            cast(null(), String),
+            literal("owner", String),
+            Space.id
+        ).where(Space.owner_id == self.user_id)
+
+        result = await self.db.execute(union_all(memberships, owned_spaces))
+        roles = {}
+        for workspace_id, role, space_id in result:
+            if workspace_id is not None:
+                roles[workspace_id] = role
+            if space_id is not None:
+                self._space_ids.append(space_id)
+        self._roles = roles
+
+        membership_key, spaces_key = acl_cache_keys(self.user_id)
+        await set_cached_sets({
+            membership_key: [f"{workspace_id}:{role}" for workspace_id, role in roles.items()],
+            spaces_key: self._space_ids,
+        }, ACL_CACHE_TTL, local=LOCAL_TIER_COHERENT)
+
+    async def workspace_ids(self) -> list[str]:
+        """Get all workspace IDs the user has access to"""
+        await self.load()
+        return list(self._roles)
+
+    async def space_ids(self) -> list[str]:
+        """Get all space IDs the user owns"""
+        await self.load()
+        return list(self._space_ids)
+
+    async def role_in(self, workspace_id: str) -> str | None:
+        """Get user's role in a workspace"""
+        await self.load()
+        return self._roles.get(workspace_id)
+
+    def project_filter(self):
+        """
+        Project access predicate. Uses the memoized ids once they are loaded,
+        otherwise EXISTS subqueries so a single check needs no extra round trip.
+        """
+        if self._roles is None:
+            return project_access_clause(self.user_id)
+        return or_(
+            Project.workspace_id.in_(list(self._roles)),
+            Project.space_id.in_(self._space_ids)
+        )
+
+    def note_filter(self):
+        """Note visibility predicate, see project_filter"""
+        if self._roles is None:
+            return note_access_clause(self.user_id)
+        return or_(
+            Note.author_id == self.user_id,
+            and_(Note.visibility_scope == 'workspace', Note.workspace_id.in_(list(self._roles))),
+            and_(Note.visibility_scope == 'space', Note.space_id.in_(self._space_ids))
+        )
+
+def project_access_clause(user_id: str):
+    """SQL predicate: the Project is in a workspace the user belongs to or a space they own"""
+    return or_(
+        exists().where(
+            Membership.workspace_id == Project.workspace_id,
+            Membership.user_id == user_id
+        ),
+        exists().where(
+            Space.id == Project.space_id,
+            Space.owner_id == user_id
+        )
+    )
+
+def note_access_clause(user_id: str):
+    """SQL predicate mirroring the note visibility rules"""
+    return or_(
+        Note.author_id == user_id,
+        and_(
+            Note.visibility_scope == 'workspace',
+            exists().where(
+                Membership.workspace_id == Note.workspace_id,
+                Membership.user_id == user_id
+            )
+        ),
+        and_(
+            Note.visibility_scope == 'space',
+            exists().where(
+                Space.id == Note.space_id,
+                Space.owner_id == user_id
+            )
+        )
     )
 
-def verify_task_access(task_id: str, user_id: str, db: Session) -> bool:
+async def load_project(project_id: str, access: AccessContext) -> Project | None:
+    """Fetch a project the user can access in one statement, None otherwise"""
+    result = await access.db.execute(
+        select(Project).where(
+            Project.id == project_id,
+            access.project_filter()
+        )
+    )
+    return result.scalars().first()
+
+async def load_task(task_id: str, access: AccessContext) -> Task | None:
+    """Fetch a task whose project the user can access in one statement, None otherwise"""
+    result = await access.db.execute(
+        select(Task).join(Project, Project.id == Task.project_id).where(
+            Task.id == task_id,
+            access.project_filter()
+        )
+    )
+    return result.scalars().first()
+
+async def load_note(note_id: str, access: AccessContext) -> Note | None:
+    """Fetch a note visible to the user in one statement, None otherwise"""
+    result = await access.db.execute(
+        select(Note).where(
+            Note.id == note_id,
+            access.note_filter()
+        )
+    )
+    return result.scalars().first()
+
+async def verify_project_access(project_id: str, access: AccessContext) -> bool:
+    """Verify if user has access to a project"""
+    return await load_project(project_id, access) is not None
+
+async def verify_task_access(task_id: str, access: AccessContext) -> bool:
     """Verify if user has access to a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        return False
-    
-    return verify_project_access(task.project_id, user_id, db)
+    return await load_task(task_id, access) is not None
 
-def verify_note_access(note_id: str, user_id: str, db: Session) -> bool:
+async def verify_note_access(note_id: str, access: AccessContext) -> bool:
     """Verify if user has access to a note"""
-    note = db.query(Note).filter(Note.id == note_id).first()
-    if not note:
-        return False
-    
-    # Check if user is the author
-    if note.author_id == user_id:
-        return True
-    
-    # Check workspace/space access
-    user_workspaces = get_user_workspace_ids(user_id, db)
-    user_spaces = get_user_space_ids(user_id, db)
-    
-    # Check visibility scope
-    if note.visibility_scope == 'private':
-        return note.author_id == user_id
-    elif note.visibility_scope == 'workspace':
-        return note.workspace_id in user_workspaces
-    elif note.visibility_scope == 'space':
-        return note.space_id in user_spaces
-    
-    return False
-
-def verify_workspace_access(workspace_id: str, user_id: str, db: Session) -> bool:
+    return await load_note(note_id, access) is not None
+
+async def verify_workspace_access(workspace_id: str, access: AccessContext) -> bool:
     """Verify if user has access to a workspace"""
-    membership = db.query(Membership).filter(
-        Membership.workspace_id == workspace_id,
-        Membership.user_id == user_id
-    ).first()
-    return membership is not None
+    return await access.role_in(workspace_id) is not None
 
-def get_user_role_in_workspace(workspace_id: str, user_id: str, db: Session) -> str | None:
+async def get_user_role_in_workspace(workspace_id: str, access: AccessContext) -> str | None:
     """Get user's role in a workspace"""
-    membership = db.query(Membership).filter(
-        Membership.workspace_id == workspace_id,
-        Membership.user_id == user_id
-    ).first()
-    return membership.role if membership else None
+    return await access.role_in(workspace_id)
+
+# ACL cache invalidation: collect affected users during flush, drop their
+# cached sets once the transaction commits
+
+def mark_acl_dirty(session, *user_ids):
+    """Record users whose memberships or spaces changed outside the unit of work, e.g. bulk inserts"""
+    if session is not None:
+        session.info.setdefault("dirty_acl_users", set()).update(
+            user_id for user_id in user_ids if user_id
+        )
+
+def _mark_acl_dirty(target, *user_ids):
+    mark_acl_dirty(OrmSession.object_session(target), *user_ids)
+
+@event.listens_for(Membership, "after_insert")
+@event.listens_for(Membership, "after_update")
+@event.listens_for(Membership, "after_delete")
+def _membership_changed(mapper, connection, target):
+    previous = inspect(target).attrs.user_id.history.deleted or ()
+    _mark_acl_dirty(target, target.user_id, *previous)
+
+@event.listens_for(Space, "after_insert")
+@event.listens_for(Space, "after_update")
+@event.listens_for(Space, "after_delete")
+def _space_changed(mapper, connection, target):
+    previous = inspect(target).attrs.owner_id.history.deleted or ()
+    _mark_acl_dirty(target, target.owner_id, *previous)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_dirty_acls(session):
+    user_ids = session.info.pop("dirty_acl_users", None)
+    if user_ids:
+        invalidate_acl(*user_ids)
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_dirty_acls(session):
+    session.info.pop("dirty_acl_users", None)
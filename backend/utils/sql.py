@@ -0,0 +1,86 @@
+"""
+Portable SQL expressions that need different syntax per dialect.
+
+``json_contains_all(column, values)`` is true when a JSON array column holds
+every value in ``values``. Postgres compiles it to JSONB containment
+(``@>``), which the GIN index on the casted column can answer; other
+dialects (SQLite in tests) fall back to the JSON1 ``json_each`` table
+function.
+
+``epoch``, ``least`` and ``greatest`` give integer time arithmetic that
+compiles to ``EXTRACT(EPOCH ...)`` / ``LEAST`` / ``GREATEST`` on Postgres
+and ``strftime('%s', ...)`` / ``min`` / ``max`` on SQLite.
+"""
+
+from sqlalchemy import BigInteger, Boolean, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+import json
+
+class json_contains_all(FunctionElement):
+    type = Boolean()
+    name = "json_contains_all"
+    inherit_cache = True
+
+    def __init__(self, column, values):
+        super().__init__(column, literal(json.dumps(list(values))))
+
+@compiles(json_contains_all, "postgresql")
+def _json_contains_all_postgresql(element, compiler, **kw):
+    column, values = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"CAST({column} AS JSONB) @> CAST({values} AS JSONB)"
+
+@compiles(json_contains_all)
+def _json_contains_all_default(element, compiler, **kw):
+    column, values = (compiler.process(clause, **kw) for clause in element.clauses)
+    return (
+        f"(NOT EXISTS (SELECT 1 FROM json_each({values}) AS wanted "
+        f"WHERE wanted.value NOT IN (SELECT held.value FROM json_each({column}) AS held)))"
+    )
+
+class epoch(FunctionElement):
+    """Seconds since 1970-01-01 of a naive UTC timestamp, as an integer"""
+    type = BigInteger()
+    name = "epoch"
+    inherit_cache = True
+
+@compiles(epoch, "postgresql")
+def _epoch_postgresql(element, compiler, **kw):
+    return f"CAST(EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)}) AS BIGINT)"
+
+@compiles(epoch)
+def _epoch_default(element, compiler, **kw):
+    return f"CAST(strftime('%s', {compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+class least(FunctionElement):
+    """Smallest argument; LEAST on Postgres, the multi-argument min() on SQLite"""
+    name = "least"
+    inherit_cache = True
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.type = args[0].type
+
+class greatest(FunctionElement):
+    name = "greatest"
+    inherit_cache = True
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.type = args[0].type
+
+@compiles(least)
+def _least_default(element, compiler, **kw):
+    return f"LEAST({compiler.process(element.clauses, **kw)})"
+
+@compiles(greatest)
+def _greatest_default(element, compiler, **kw):
+    return f"GREATEST({compiler.process(element.clauses, **kw)})"
+
+@compiles(least, "sqlite")
+def _least_sqlite(element, compiler, **kw):
+    return f"min({compiler.process(element.clauses, **kw)})"
+
+@compiles(greatest, "sqlite")
+def _greatest_sqlite(element, compiler, **kw):
+    return f"max({compiler.process(element.clauses, **kw)})"
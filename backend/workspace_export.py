@@ -0,0 +1,245 @@
+"""
+Streaming workspace export and import.
+
+An export is a tar.gz holding ``manifest.json`` followed by NDJSON parts
+per entity (``tasks/part-00000.ndjson`` ...), in foreign-key order. Rows
+are read through server-side cursors (``yield_per``) and each part holds
+at most ``EXPORT_PART_ROWS`` rows, so a part is the most that is ever
+buffered: memory stays flat however large the workspace is, and the
+archive can be streamed as it is produced. On Postgres every query runs
+in one REPEATABLE READ, read-only transaction, so the archive is a
+consistent snapshot even while the workspace is being written to.
+
+The importer reads the archive as a stream too and bulk-inserts every
+``IMPORT_BATCH_SIZE`` rows. Row ids are kept, so the target database must
+not already contain the exported rows. References to users that don't
+exist in the target are cleared, and memberships of such users are
+dropped. With a target space every ``space_id``
+(workspace, projects, notes) is pointed at it. Daily time rollups are
+derived data: they aren't exported, and are rebuilt for the imported
+workspace's tasks.
+
+    python -m backend.workspace_export export <workspace_id> -o backup.tar.gz
+    python -m backend.workspace_export import backup.tar.gz [--space-id ID]
+"""
+
+from datetime import datetime
+from sqlalchemy import DateTime, insert, or_, select
+from sqlalchemy.orm import Session
+from typing import IO, Iterator
+from backend.models import (
+    Workspace, Membership, Project, Note, Task, Subtask, TimeEntry, Attachment, BoardColumn,
+    TaskBoardPosition, User
+)
+from backend.report_cache import mark_reports_dirty
+from backend.time_rollups import rebuild_rollups, task_id_batches
+from backend.utils.permissions import mark_acl_dirty
+import io
+import json
+import os
+import tarfile
+import time
+
+EXPORT_FORMAT_VERSION = 1
+EXPORT_PART_ROWS = int(os.getenv("EXPORT_PART_ROWS", "5000"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+def export_queries(workspace_id: str) -> list[tuple[str, object]]:
+    """(entity name, SELECT of its table rows) in an order that satisfies foreign keys"""
+    project_ids = select(Project.id).where(Project.workspace_id == workspace_id)
+    task_ids = select(Task.id).where(Task.project_id.in_(project_ids))
+    note_ids = select(Note.id).where(
+        or_(Note.workspace_id == workspace_id, Note.project_id.in_(project_ids))
+    )
+    return [
+        ("workspaces", select(Workspace.__table__).where(Workspace.id == workspace_id)),
+        ("memberships", select(Membership.__table__).where(Membership.workspace_id == workspace_id)),
+        ("projects", select(Project.__table__).where(Project.id.in_(project_ids))),
+        ("notes", select(Note.__table__).where(Note.id.in_(note_ids))),
+        ("tasks", select(Task.__table__).where(Task.id.in_(task_ids))),
+        ("subtasks", select(Subtask.__table__).where(Subtask.parent_task_id.in_(task_ids))),
+        ("time_entries", select(TimeEntry.__table__).where(TimeEntry.task_id.in_(task_ids))),
+        ("attachments", select(Attachment.__table__).where(
+            or_(Attachment.task_id.in_(task_ids), Attachment.note_id.in_(note_ids))
+        )),
+        ("board_columns", select(BoardColumn.__table__).where(BoardColumn.project_id.in_(project_ids))),
+        ("task_board_positions", select(TaskBoardPosition.__table__).where(
+            TaskBoardPosition.task_id.in_(task_ids)
+        )),
+    ]
+
+TABLES = {
+    table.name: table
+    for table in (
+        Workspace.__table__, Membership.__table__, Project.__table__, Note.__table__, Task.__table__,
+        Subtask.__table__, TimeEntry.__table__, Attachment.__table__,
+        BoardColumn.__table__, TaskBoardPosition.__table__,
+    )
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+class _ChunkSink:
+    """Write-only file object that hands tarfile's output back to the generator"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _add_member(tar: tarfile.TarFile, name: str, data: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+def _ndjson_parts(db: Session, query, part_rows: int) -> Iterator[bytes]:
+    result = db.execute(query.execution_options(yield_per=part_rows))
+    for rows in result.partitions():
+        yield b"".join(
+            json.dumps(dict(row._mapping), default=_json_default).encode() + b"\n"
+            for row in rows
+        )
+
+def iter_export(db: Session, workspace_id: str, part_rows: int = EXPORT_PART_ROWS) -> Iterator[bytes]:
+    """Yield a workspace export as tar.gz chunks; db must not have started a transaction"""
+    if db.bind.dialect.name == "postgresql":
+        # Pins the isolation level of the transaction every query below runs in
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+    sink = _ChunkSink()
+    queries = export_queries(workspace_id)
+    with tarfile.open(fileobj=sink, mode="w|gz") as tar:
+        manifest = {
+            "format": EXPORT_FORMAT_VERSION,
+            "workspaceId": workspace_id,
+            "exportedAt": datetime.utcnow().isoformat(),
+            "entities": [name for name, _ in queries],
+        }
+        _add_member(tar, "manifest.json", json.dumps(manifest).encode())
+        yield sink.drain()
+        for name, query in queries:
+            for index, part in enumerate(_ndjson_parts(db, query, part_rows)):
+                _add_member(tar, f"{name}/part-{index:05d}.ndjson", part)
+                yield sink.drain()
+    yield sink.drain()
+
+def _user_columns(table) -> list[str]:
+    return [
+        column.name for column in table.columns
+        if any(fk.column.table.name == User.__tablename__ for fk in column.foreign_keys)
+    ]
+
+def _insert_batch(db: Session, table, rows: list[dict]) -> list[dict]:
+    """Insert rows and return the ones inserted"""
+    # Clear references to users that don't exist in the target database, and
+    # drop rows that can't exist without one (memberships)
+    user_columns = _user_columns(table)
+    if user_columns:
+        referenced = {row[c] for row in rows for c in user_columns if row.get(c)}
+        existing = set(db.scalars(select(User.id).where(User.id.in_(referenced)))) if referenced else set()
+        required = [column for column in user_columns if not table.c[column].nullable]
+        rows = [row for row in rows if all(row.get(column) in existing for column in required)]
+        for row in rows:
+            for column in user_columns:
+                if row.get(column) not in existing:
+                    row[column] = None
+    if rows:
+        db.execute(insert(table), rows)
+    return rows
+
+def _import_batch(db: Session, table, batch: list[dict], counts: dict[str, int]):
+    inserted = _insert_batch(db, table, batch)
+    counts[table.name] = counts.get(table.name, 0) + len(inserted)
+    if table is Membership.__table__:
+        # Bulk inserts bypass the ORM events that drop cached ACL sets
+        mark_acl_dirty(db, *(row["user_id"] for row in inserted))
+
+def import_workspace(
+    db: Session,
+    archive: IO[bytes],
+    space_id: str | None = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict[str, int]:
+    """
+    Restore an export read from a binary stream, in one transaction.
+    space_id re-parents the workspace and everything in it that references
+    a space, e.g. when the original space doesn't exist in the target
+    database. Returns rows imported per entity.
+    """
+    counts: dict[str, int] = {}
+    workspace_id = None
+    with tarfile.open(fileobj=archive, mode="r|gz") as tar:
+        for member in tar:
+            if member.name == "manifest.json":
+                manifest = json.load(tar.extractfile(member))
+                if manifest.get("format") != EXPORT_FORMAT_VERSION:
+                    raise ValueError(f"Unsupported export format {manifest.get('format')!r}")
+                workspace_id = manifest["workspaceId"]
+                continue
+            name = member.name.split("/", 1)[0]
+            table = TABLES.get(name)
+            if table is None or not member.isfile():
+                raise ValueError(f"Unexpected archive member {member.name!r}")
+
+            datetime_columns = [c.name for c in table.columns if isinstance(c.type, DateTime)]
+            remap_space = space_id and "space_id" in table.columns
+            batch = []
+            for line in tar.extractfile(member):
+                row = json.loads(line)
+                for column in datetime_columns:
+                    if row.get(column):
+                        row[column] = datetime.fromisoformat(row[column])
+                if remap_space and row.get("space_id"):
+                    row["space_id"] = space_id
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    _import_batch(db, table, batch, counts)
+                    batch = []
+            if batch:
+                _import_batch(db, table, batch, counts)
+    imported_projects = select(Project.id).where(Project.workspace_id == workspace_id)
+    mark_reports_dirty(db, project_ids=db.scalars(imported_projects).all())
+    for task_ids in task_id_batches(db, batch_size, Task.project_id.in_(imported_projects)):
+        rebuild_rollups(db, task_ids)
+    db.commit()
+    return counts
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from backend.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Workspace export / import")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="Write a workspace archive")
+    export.add_argument("workspace_id")
+    export.add_argument("-o", "--output", help="Archive path (default: stdout)")
+    export.add_argument("--part-rows", type=int, default=EXPORT_PART_ROWS)
+    restore = subcommands.add_parser("import", help="Load a workspace archive")
+    restore.add_argument("archive", help="Archive path, or - for stdin")
+    restore.add_argument("--space-id", help="Attach the workspace to this space")
+    restore.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.command == "export":
+            output = open(args.output, "wb") if args.output else sys.stdout.buffer
+            with output:
+                for chunk in iter_export(db, args.workspace_id, args.part_rows):
+                    output.write(chunk)
+        else:
+            source = sys.stdin.buffer if args.archive == "-" else open(args.archive, "rb")
+            with source:
+                counts = import_workspace(db, source, args.space_id, args.batch_size)
+            for name, count in counts.items():
+                print(f"{name}: {count}")